@@ -0,0 +1,88 @@
+"""
+Times the startup of short-lived jobs: each scenario runs in a fresh interpreter, which imports what it needs and
+  does a small query, e.g.
+
+    python -m benchmarks.import_time --repeat 5
+
+The time of the scenario (imports included, interpreter startup excluded) is the fastest of the runs, and the heavy
+  modules it loaded are listed, since formulations and solver adapters are only imported once they are used.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["numpy", "ortools.sat.python.cp_model", "ortools.linear_solver.pywraplp"]
+
+SCENARIOS = {
+    "parse": """
+from source import lib
+lib.get_tbn_from_filename("examples/tbn.txt")
+""",
+    "cp": """
+from source import lib
+lib.get_stable_config("examples/tbn.txt")
+""",
+    "ip": """
+from source import lib
+from source.solver import SolverMethod
+lib.get_stable_config("examples/tbn.txt", solver_method=SolverMethod.INTEGER_PROGRAMMING)
+""",
+    "heuristic": """
+from source import lib
+from source.solver import SolverMethod
+lib.get_stable_config("examples/tbn.txt", solver_method=SolverMethod.HEURISTIC)
+""",
+}
+
+# runs a scenario, and prints its time and the heavy modules it loaded as JSON
+RUNNER = """
+import json, sys, timeit
+tic = timeit.default_timer()
+exec({scenario!r})
+elapsed_time = timeit.default_timer() - tic
+print(json.dumps({{"seconds": elapsed_time, "modules": [name for name in {heavy_modules!r} if name in sys.modules]}}))
+"""
+
+
+def main() -> None:
+    args = get_command_line_arguments()
+    scenario_names = args.scenarios if args.scenarios else list(SCENARIOS)
+
+    print(f"{'scenario':12} {'seconds':>9}  modules")
+    for scenario_name in scenario_names:
+        runner = RUNNER.format(scenario=SCENARIOS[scenario_name], heavy_modules=HEAVY_MODULES)
+        results = [
+            json.loads(subprocess.run(
+                [sys.executable, "-c", runner], stdout=subprocess.PIPE, check=True, universal_newlines=True
+            ).stdout)
+            for _ in range(args.repeat)
+        ]
+        print(
+            f"{scenario_name:12} {min(result['seconds'] for result in results):9.3f}  "
+            f"{', '.join(results[0]['modules']) or '-'}"
+        )
+
+
+def get_command_line_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help=f"scenarios to run, of {', '.join(SCENARIOS)} (all by default)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of runs of each scenario (each in a new interpreter); the fastest is reported",
+    )
+    args = parser.parse_args()
+    for scenario_name in args.scenarios:
+        if scenario_name not in SCENARIOS:
+            parser.error(f"unknown scenario {scenario_name}, expected one of {', '.join(SCENARIOS)}")
+    return args
+
+
+if __name__ == "__main__":
+    main()
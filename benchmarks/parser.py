@@ -0,0 +1,88 @@
+"""
+Times loading a large generated tbn file with lib.get_tbn_from_filename, e.g.
+
+    python -m benchmarks.parser --lines 1000000
+
+The fastest of the loads is reported.
+"""
+import argparse
+import os
+import random
+import tempfile
+import timeit
+
+from source import lib
+
+
+def main() -> None:
+    args = get_command_line_arguments()
+    with tempfile.TemporaryDirectory() as directory:
+        tbn_filename = os.path.join(directory, "generated_tbn.txt")
+        write_generated_tbn(tbn_filename, args.lines, args.domains, args.seed)
+
+        elapsed_times = []
+        for _ in range(args.repeat):
+            tic = timeit.default_timer()
+            tbn = lib.get_tbn_from_filename(tbn_filename)
+            elapsed_times.append(timeit.default_timer() - tic)
+
+    elapsed_time = min(elapsed_times)
+    print(f"{'lines':>9} {'monomer types':>14} {'monomers':>9} {'seconds':>9} {'lines/s':>10}")
+    print(
+        f"{args.lines:9} {len(list(tbn.monomer_types())):14} {tbn.number_of_monomers():9} "
+        f"{elapsed_time:9.3f} {args.lines / elapsed_time:10.0f}"
+    )
+
+
+def write_generated_tbn(tbn_filename: str, number_of_lines: int, number_of_domains: int, seed: int) -> None:
+    # mostly plain lines of domains, with some counts, repeated domains and repeated lines mixed in
+    random_generator = random.Random(seed)
+    domains = [f"d{k}" for k in range(number_of_domains)]
+    with open(tbn_filename, "w") as tbn_file:
+        for line_number in range(number_of_lines):
+            composition = " ".join(
+                random_generator.choice(domains) + random_generator.choice(["", "*"])
+                for _ in range(random_generator.randint(2, 8))
+            )
+            style = line_number % 10
+            if style == 0:
+                tbn_file.write(f"{random_generator.randint(2, 9)}[{composition} >M{line_number}]\n")
+            elif style == 1:
+                tbn_file.write(f"2({random_generator.choice(domains)}) {composition} >M{line_number}\n")
+            elif style == 2:
+                tbn_file.write(f"{composition}\n")
+            else:
+                tbn_file.write(f"{composition} >M{line_number}\n")
+
+
+def get_command_line_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--lines",
+        type=int,
+        default=100000,
+        help="number of lines of the generated tbn file",
+    )
+    parser.add_argument(
+        "--domains",
+        type=int,
+        default=1000,
+        help="number of distinct domain names in the generated tbn file",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="random seed for generating the tbn file",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of runs; the fastest is reported",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
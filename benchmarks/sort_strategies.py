@@ -0,0 +1,66 @@
+"""
+Compares the symmetry-breaking strategies of the matrix formulations, e.g.
+
+    python -m benchmarks.sort_strategies examples/tbn_gg_multicopy.txt examples/stablegen_example_3.txt
+"""
+import argparse
+import timeit
+
+from source import lib
+from source.constraints import SortStrategy
+from source.solver import Solver, SolverMethod, SolverFormulation
+
+
+def main() -> None:
+    args = get_command_line_arguments()
+    solver_method = SolverMethod.INTEGER_PROGRAMMING if args.ip else SolverMethod.CONSTRAINT_PROGRAMMING
+    formulation = SolverFormulation[args.formulation]
+    solver = Solver(method=solver_method)
+
+    print(f"{'tbn':40} {'strategy':10} {'merges':>7} {'seconds':>9}")
+    for tbn_filename in args.tbn_filenames:
+        tbn = lib.get_tbn_from_filename(tbn_filename)
+        for sort_strategy in SortStrategy:
+            user_constraints = lib.get_constraints_from_filename(None).with_sort_strategy(sort_strategy)
+            elapsed_times = []
+            for _ in range(args.repeat):
+                tic = timeit.default_timer()
+                configuration = solver.stable_config(tbn, user_constraints, formulation=formulation)
+                elapsed_times.append(timeit.default_timer() - tic)
+            print(
+                f"{tbn_filename:40} {sort_strategy.name:10} {configuration.number_of_merges():7} "
+                f"{min(elapsed_times):9.3f}"
+            )
+
+
+def get_command_line_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "tbn_filenames",
+        metavar="tbn_filename",
+        type=str,
+        nargs="+",
+        help="filenames for tbn text files",
+    )
+    parser.add_argument(
+        "--ip",
+        action="store_true",
+        help="use integer programming (instead of constraint programming)",
+    )
+    parser.add_argument(
+        "--formulation",
+        type=str,
+        default=SolverFormulation.POLYMER_UNBOUNDED_MATRIX.name,
+        help=f"one of: {', '.join(SolverFormulation.__members__)}",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of runs per strategy; the fastest is reported",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
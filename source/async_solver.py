@@ -0,0 +1,149 @@
+"""
+asyncio counterparts of Solver.stable_config and Solver.stable_configs, for services with an event loop.  Every call
+  runs its own solver, either in a thread (of the given executor, or of the default executor of the event loop) or in
+  a new process.  Enumerated configurations are passed on as the search finds them (see the streaming option of the
+  solver).
+
+When the awaiting task is cancelled (or an async for loop over stable_configs is left early), the solve is stopped:
+  in a thread through Solver.stop_search, which stops CP-SAT searches, and in a process by terminating the process.
+  Integer programming holds the interpreter lock while it solves, so it blocks the event loop in a thread and cannot
+  be stopped there; use processes with it.
+"""
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+import asyncio
+import functools
+import multiprocessing
+
+from source.tbn import Tbn
+from source.configuration import Configuration
+from source.constraints import Constraints
+from source.solver import Solver, SolverMethod, SolverFormulation
+
+# ends the configurations of stable_configs
+_END = "end"
+
+
+class AsyncSolver:
+    def __init__(
+            self,
+            method: SolverMethod = SolverMethod.CONSTRAINT_PROGRAMMING,
+            time_limit: Optional[float] = None,  # only used by the heuristic; its default time limit if None
+            executor: Optional[Executor] = None,  # a thread pool; the default executor of the event loop if None
+            use_processes: bool = False,  # if True, every call runs in a new process instead of a thread
+    ):
+        self.__solver_arguments = {"method": method, "time_limit": time_limit}
+        self.__executor = executor
+        self.__use_processes = use_processes
+
+    async def stable_config(self,
+                            tbn: Tbn,
+                            user_constraints: Constraints = Constraints(),
+                            formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                            bond_weighting_factor: Optional[float] = None,
+                            hint: Optional[Configuration] = None,
+                            ) -> Configuration:
+        arguments = {
+            "tbn": tbn,
+            "user_constraints": user_constraints,
+            "formulation": formulation,
+            "bond_weighting_factor": bond_weighting_factor,
+            "hint": hint,
+        }
+        if self.__use_processes:
+            messages = self.__in_process("stable_config", arguments)
+            try:
+                kind, configuration = await messages.__anext__()
+            finally:
+                await messages.aclose()
+            return configuration
+
+        solver = Solver(**self.__solver_arguments)
+        try:
+            return await self.__in_thread(functools.partial(solver.stable_config, **arguments))
+        except asyncio.CancelledError:
+            solver.stop_search()
+            raise
+
+    async def stable_configs(self,
+                             tbn: Tbn,
+                             user_constraints: Constraints = Constraints(),
+                             formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                             bond_weighting_factor: Optional[float] = None,
+                             ) -> AsyncIterator[Configuration]:
+        arguments = {
+            "tbn": tbn,
+            "user_constraints": user_constraints,
+            "formulation": formulation,
+            "bond_weighting_factor": bond_weighting_factor,
+        }
+        if self.__use_processes:
+            messages = self.__in_process("stable_configs", arguments)
+            try:
+                async for kind, configuration in messages:
+                    if kind == _END:
+                        break
+                    yield configuration
+            finally:
+                await messages.aclose()
+            return
+
+        solver = Solver(**self.__solver_arguments, streaming=True)
+        finished = False
+        try:
+            configurations = await self.__in_thread(lambda: iter(solver.stable_configs(**arguments)))
+            while True:
+                configuration = await self.__in_thread(functools.partial(next, configurations, _END))
+                if configuration is _END:
+                    break
+                yield configuration
+            finished = True
+        finally:
+            if not finished:  # cancelled, or the caller stopped iterating
+                solver.stop_search()
+
+    async def __in_thread(self, function: Callable[[], Any]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, function)
+
+    async def __in_process(self, method_name: str, arguments: Dict[str, Any]) -> AsyncIterator[Any]:
+        # yields the (kind, value) messages of the process, and terminates it unless it has finished
+        connection, child_connection = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=call_in_process,
+            args=(child_connection, self.__solver_arguments, method_name, arguments),
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()  # so that receiving fails once the process has exited
+        try:
+            while True:
+                # connection.recv blocks, so it is run in the default executor (the pipe cannot go to a process pool)
+                kind, value = await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+                if kind == "error":
+                    raise value
+                yield kind, value
+                if kind in ["result", _END]:
+                    break
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            connection.close()
+
+
+def call_in_process(connection: Any, solver_arguments: Dict[str, Any], method_name: str, arguments: Dict[str, Any]) \
+        -> None:
+    # runs in the process of an AsyncSolver call, and sends ("result", configuration) for stable_config, or
+    #  ("configuration", configuration) for each configuration and then (_END, None) for stable_configs; an
+    #  exception is sent as ("error", exception)
+    try:
+        if method_name == "stable_configs":
+            for configuration in Solver(**solver_arguments, streaming=True).stable_configs(**arguments):
+                connection.send(("configuration", configuration))
+            connection.send((_END, None))
+        else:
+            connection.send(("result", Solver(**solver_arguments).stable_config(**arguments)))
+    except Exception as error:
+        connection.send(("error", error))
+    finally:
+        connection.close()
@@ -0,0 +1,64 @@
+from typing import Dict, Iterable, Union
+from math import inf as infinity
+
+from source.tbn import Tbn
+from source.monomer import Monomer
+from source.domain import Domain
+
+
+class Bounds:
+    """
+    Bounding presolve: upper bounds on the composition of any single polymer, computed from the net counts of the
+      monomer types on the limiting domain types.
+
+    A copy of a non-limiting monomer that binds no limiting site can be split off into a singleton without
+      breaking saturation, so in a stable configuration every such copy binds at least one limiting site.  When
+      `tighten` is False, this argument is not used, and only the trivial bounds are reported.
+    """
+    def __init__(
+            self,
+            tbn: Tbn,
+            limiting_monomer_types: Iterable[Monomer],
+            upper_bound_on_monomers_in_polymer: Union[int, float] = infinity,
+            tighten: bool = True,
+    ):
+        self.__limiting_domain_types = list(tbn.limiting_domain_types())
+        self.__limiting_monomer_types = set(limiting_monomer_types)
+
+        # total number of each limiting site in the whole tbn
+        self.__limiting_site_counts: Dict[Domain, Union[int, float]] = {}
+        for domain in self.__limiting_domain_types:
+            self.__limiting_site_counts[domain] = sum(
+                tbn.count(monomer) * monomer.net_count(domain)
+                for monomer in tbn.monomer_types()
+                if monomer.net_count(domain) > 0
+            )
+
+        self.__max_copies_in_polymer: Dict[Monomer, Union[int, float]] = {}
+        for monomer in tbn.monomer_types():
+            max_copies = min(tbn.count(monomer), upper_bound_on_monomers_in_polymer)
+            if tighten and monomer not in self.__limiting_monomer_types:
+                max_copies = min(max_copies, self.__max_limiting_sites_bound_by(monomer))
+            self.__max_copies_in_polymer[monomer] = max_copies
+
+        self.__max_monomers_in_polymer = min(
+            upper_bound_on_monomers_in_polymer,
+            sum(self.__max_copies_in_polymer.values())
+        )
+
+    def __max_limiting_sites_bound_by(self, monomer: Monomer) -> Union[int, float]:
+        # every copy of the monomer must bind one of the limiting sites that it is complementary to
+        return sum(
+            self.__limiting_site_counts[domain]
+            for domain in self.__limiting_domain_types
+            if monomer.net_count(domain) < 0
+        )
+
+    def max_copies_in_polymer(self, monomer: Monomer) -> Union[int, float]:
+        return self.__max_copies_in_polymer.get(monomer, 0)
+
+    def max_monomers_in_polymer(self) -> Union[int, float]:
+        return self.__max_monomers_in_polymer
+
+    def limiting_site_count(self, domain: Domain) -> Union[int, float]:
+        return self.__limiting_site_counts.get(domain, 0)
@@ -0,0 +1,83 @@
+from typing import List, Tuple
+import hashlib
+import json
+import os
+import time
+
+
+class Checkpoint:
+    """
+    Saves the solutions of an enumeration to a file as they are found, so that an interrupted enumeration can be
+      resumed: the search is run again with the saved solutions excluded (by the solver adapter, with no-good
+      constraints), and only the remaining solutions are searched for.
+
+    The file is written in JSON lines: a header with the fingerprint of the model, one line per solution (the values
+      of the variables to keep), and a last line once the enumeration is complete.  Solutions are appended at most
+      every interval seconds (and whenever the checkpoint is closed), so an interruption loses at most the solutions
+      of the last interval.  A checkpoint written for a different model is not resumed.
+    """
+    DEFAULT_INTERVAL = 30.0
+    VERSION = 1
+
+    def __init__(self, filename: str, interval: float = DEFAULT_INTERVAL):
+        self.__filename = filename
+        self.__interval = interval
+        self.__unsaved_rows: List[List[int]] = []
+        self.__last_save_time = time.monotonic()
+
+    @staticmethod
+    def fingerprint(model_as_bytes: bytes) -> str:
+        return hashlib.sha256(model_as_bytes).hexdigest()
+
+    def resume(self, fingerprint: str) -> Tuple[List[List[int]], bool]:
+        """
+        returns the saved solutions, and whether the enumeration was complete; starts a new checkpoint file if there
+          is none yet
+        """
+        if not os.path.exists(self.__filename) or os.path.getsize(self.__filename) == 0:
+            self.__write_lines([{"version": self.VERSION, "fingerprint": fingerprint}], mode="w")
+            return [], False
+
+        rows = []
+        complete = False
+        with open(self.__filename, "rb") as checkpoint_file:
+            header_line = checkpoint_file.readline()
+            header = json.loads(header_line) if header_line.endswith(b"\n") else {}
+            if header.get("version") != self.VERSION or header.get("fingerprint") != fingerprint:
+                raise AssertionError(
+                    f"Checkpoint '{self.__filename}' was written for a different tbn, formulation or constraints"
+                )
+            valid_length = len(header_line)
+            for line in checkpoint_file:
+                if not line.endswith(b"\n"):
+                    break  # interrupted while this line was written
+                valid_length += len(line)
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    complete = record.get("complete", False)
+                else:
+                    rows.append(record)
+        if os.path.getsize(self.__filename) > valid_length:
+            os.truncate(self.__filename, valid_length)
+        return rows, complete
+
+    def record(self, row: List[int]) -> None:
+        self.__unsaved_rows.append(row)
+        if time.monotonic() - self.__last_save_time >= self.__interval:
+            self.save()
+
+    def save(self) -> None:
+        if self.__unsaved_rows:
+            self.__write_lines(self.__unsaved_rows)
+            self.__unsaved_rows = []
+        self.__last_save_time = time.monotonic()
+
+    def complete(self) -> None:
+        self.save()
+        self.__write_lines([{"complete": True}])
+
+    def __write_lines(self, records: List, mode: str = "a") -> None:
+        with open(self.__filename, mode) as checkpoint_file:
+            checkpoint_file.write("".join(json.dumps(record) + "\n" for record in records))
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
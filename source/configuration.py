@@ -46,6 +46,9 @@ class Configuration:
     def __eq__(self, other: "Configuration") -> bool:
         return self.full_str() == other.full_str()
 
+    def items(self):
+        return self.__polymer_counts.items()
+
     def flatten(self) -> Tbn:
         monomer_counts = {}
         for polymer, polymer_count in self.__polymer_counts.items():
@@ -1,8 +1,16 @@
 import re
+from enum import Enum, auto
 from math import inf as infinity
 from copy import copy
 
 
+class SortStrategy(Enum):
+    CHAIN = auto()  # lexicographic order, one tiebreaker per monomer type
+    LEX = auto()  # lexicographic order, one tiebreaker per block of monomer types with a mixed-radix signature
+    SIGNATURE = auto()  # non-increasing order of a weighted signature; breaks most, but not all, symmetries
+    SOLVER = auto()  # no ordering constraints; rely on the symmetry detection of the solver
+
+
 class Constraints:
     """
     User-defined constraints are placed into this container class
@@ -15,8 +23,11 @@ class Constraints:
         self._max_energy = infinity
         self._min_energy = -infinity
         self._sort = True
+        self._sort_strategy = SortStrategy.CHAIN
         self._optimize = True
+        self._iterative = False
         self._bond_weight = 2.0
+        self._library_directory = None
 
     @classmethod
     def from_string(cls, text: str) -> "Constraints":
@@ -39,10 +50,20 @@ class Constraints:
             self._optimize = True
         elif re.match("NO\\s+OPTIMIZE", line):
             self._optimize = False
+        elif re.match("SORT\\s+\\w+", line):
+            strategy_name = line.split()[1]
+            if strategy_name not in SortStrategy.__members__:
+                raise AssertionError(f"Did not recognize sort strategy '{strategy_name}' in constraints file")
+            self._sort = True
+            self._sort_strategy = SortStrategy[strategy_name]
         elif re.match("SORT", line):
             self._sort = True
         elif re.match("NO\\s+SORT", line):
             self._sort = False
+        elif re.match("ITERATIVE", line):
+            self._iterative = True
+        elif re.match("NO\\s+ITERATIVE", line):
+            self._iterative = False
         else:
             still_searching = True
             search_results = re.match(f"MAX ENERGY ({floating_point_regex})", line)
@@ -104,6 +125,23 @@ class Constraints:
         this._optimize = False
         return this
 
+    def with_sort_strategy(self, sort_strategy: SortStrategy) -> "Constraints":
+        this = copy(self)
+        this._sort = True
+        this._sort_strategy = sort_strategy
+        return this
+
+    def with_iterative_flag(self) -> "Constraints":
+        this = copy(self)
+        this._iterative = True
+        return this
+
+    def with_library_directory(self, library_directory: str) -> "Constraints":
+        # where the polymer libraries of the SET_PARTITIONING formulation are saved, to be reused by later runs
+        this = copy(self)
+        this._library_directory = library_directory
+        return this
+
     def max_polymers(self):
         return self._max_polymers
 
@@ -125,8 +163,17 @@ class Constraints:
     def sort(self):
         return self._sort
 
+    def sort_strategy(self):
+        return self._sort_strategy
+
     def optimize(self):
         return self._optimize
 
+    def iterative(self):
+        return self._iterative
+
     def bond_weight(self):
         return self._bond_weight
+
+    def library_directory(self):
+        return self._library_directory
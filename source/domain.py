@@ -1,5 +1,6 @@
 import re
 from copy import deepcopy
+from typing import Dict, Optional
 
 
 class Domain:
@@ -7,18 +8,20 @@ class Domain:
     optional_star_regex = r"(?:\*|)"
     optional_assigned_name_regex = r"(?:\:[A-Za-z0-9_]+|)"
 
+    __pattern = re.compile(f"^({name_regex})({optional_star_regex}){optional_assigned_name_regex}$")
+
     def __init__(self, domain_as_string: str):
         # alphanumerics with underscores and an optional star.
         # for backwards compatibility with StableGen, also allows a colon and an assigned name (which are ignored)
 
-        search_pattern = f"^({self.name_regex})({self.optional_star_regex}){self.optional_assigned_name_regex}$"
-        name_search_result = re.match(search_pattern, domain_as_string)
+        name_search_result = self.__pattern.match(domain_as_string)
         if not name_search_result:
             parsing_error_message = f"could not parse domain: '{domain_as_string}', format must be '{self.regex()}'"
             raise AssertionError(parsing_error_message)
 
         self.__name, optional_star = name_search_result.groups()
         self.__starred = True if optional_star == "*" else False
+        self.__hash = hash(str(self))  # domains are hashed very often, e.g. while parsing
 
     def __str__(self) -> str:
         if self.__starred:
@@ -38,7 +41,19 @@ class Domain:
             return False
 
     def __hash__(self) -> int:
-        return hash(str(self))
+        return self.__hash
+
+    @classmethod
+    def from_string(cls, domain_as_string: str, interned_domains: Optional[Dict[str, "Domain"]] = None) -> "Domain":
+        # like the constructor; if interned_domains is given (e.g. by Tbn.from_lines, for the length of one parse),
+        #  repeated strings return the same (immutable) domain object from it, and new domains are added to it
+        if interned_domains is None:
+            return cls(domain_as_string)
+        domain = interned_domains.get(domain_as_string)
+        if domain is None:
+            domain = cls(domain_as_string)
+            interned_domains[domain_as_string] = domain
+        return domain
 
     def is_starred(self) -> bool:
         return self.__starred
@@ -46,6 +61,7 @@ class Domain:
     def complement(self) -> "Domain":
         new_domain = deepcopy(self)
         new_domain.__starred = not self.__starred
+        new_domain.__hash = hash(str(new_domain))
         return new_domain
 
     @classmethod
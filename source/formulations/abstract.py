@@ -5,6 +5,7 @@ from source.tbn import Tbn
 from source.configuration import Configuration
 from source.constraints import Constraints
 from source.solver_adapters.abstract import SolverAdapter
+from source.metrics import measure
 
 
 class Formulation(ABC):
@@ -12,22 +13,67 @@ class Formulation(ABC):
         self.tbn = tbn
         self.solver = solver
         self.user_constraints = user_constraints
-        self.model = self.solver.model()
-        self._populate_model()
+        self._build_model()
 
     def get_configuration(self, verbose: bool = False) -> Configuration:
-        solution_status = self.solver.solve(self.model, self._variables_to_keep(), verbose=verbose)
+        with measure(self.solver.metrics, "solve"):
+            solution_status = self.solver.solve(self.model, self._variables_to_keep(), verbose=verbose)
         self._assert_completed_status(solution_status)
-        variable_to_value_dictionary = {
-            var: self.solver.value(var) for var in self._variables_to_keep()
-        }
-        return self._interpret_solution(variable_to_value_dictionary)
+        with measure(self.solver.metrics, "interpret_solution"):
+            variable_to_value_dictionary = {
+                var: self.solver.value(var) for var in self._variables_to_keep()
+            }
+            return self._interpret_solution(variable_to_value_dictionary)
 
     def get_all_configurations(self, verbose: bool = False) -> Iterator[Configuration]:
-        for variable_to_value_dictionary in self.solver.solve_all(
-                self.model, self._variables_to_keep(), verbose=verbose
-        ):
-            yield self._interpret_solution(variable_to_value_dictionary)
+        # a streaming enumeration searches while its solutions are iterated over, so that is timed as solving too
+        with measure(self.solver.metrics, "solve"):
+            solutions = iter(self.solver.solve_all(self.model, self._variables_to_keep(), verbose=verbose))
+        while True:
+            with measure(self.solver.metrics, "solve"):
+                variable_to_value_dictionary = next(solutions, None)
+            if variable_to_value_dictionary is None:
+                return
+            with measure(self.solver.metrics, "interpret_solution"):
+                configuration = self._interpret_solution(variable_to_value_dictionary)
+            yield configuration
+
+    def add_hint(self, configuration: Configuration) -> None:
+        """
+        suggests the configuration (e.g. from the heuristic) to the solver as a starting solution, replacing any
+          previous hint
+        """
+        raise NotImplementedError(f"Not implemented to give solution hints to {type(self).__module__}")
+
+    def update_tbn(self, tbn: Tbn) -> bool:
+        """
+        changes the tbn of the formulation; returns True if the existing model could be updated in place, and False
+          if it had to be rebuilt (along with any hint)
+        """
+        self.tbn = tbn
+        self._build_model()
+        return False
+
+    def get_relaxation_bound(self, verbose: bool = False) -> float:
+        """
+        solves the model (built by a relaxed integer programming adapter) with the objective of the formulation
+          replaced by the quantity that it bounds, and returns a lower bound on the number of merges (or on the
+          energy, for formulations which minimize energy)
+        """
+        self.model.minimize(self._bounded_quantity())
+        with measure(self.solver.metrics, "solve"):
+            solution_status = self.solver.solve(self.model, [], verbose=verbose)
+        self._assert_completed_status(solution_status)
+        return self.solver.objective_value(self.model)
+
+    def _build_model(self) -> None:
+        self.model = self.solver.model()
+        with measure(self.solver.metrics, "populate_model"):
+            self._populate_model()
+        self.solver.record_model_size(self.model)
+
+    def _bounded_quantity(self) -> Any:
+        raise NotImplementedError(f"Not implemented to bound the linear relaxation of {type(self).__module__}")
 
     def _assert_completed_status(self, status: int):
         if status == self.model.INFEASIBLE:
@@ -84,6 +84,9 @@ class Formulation(AbstractFormulation):
     def _apply_objective_function(self) -> None:
         self.model.maximize(self.number_of_polymers)
 
+    def _bounded_quantity(self) -> Any:
+        return self.total_number_of_monomers - self.number_of_polymers
+
     def _variables_to_keep(self) -> List[Any]:
         return list(self.grouping_vars.values())
 
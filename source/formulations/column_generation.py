@@ -0,0 +1,351 @@
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+from math import inf as infinity, floor, ceil
+
+from source.formulations.abstract import Formulation as AbstractFormulation
+from source.solver_adapters import constraint_programming, integer_programming
+from source.bounds import Bounds
+from source.polymer import Polymer
+from source.configuration import Configuration
+from source.metrics import measure
+
+
+class Formulation(AbstractFormulation):
+    """
+    Branch-and-price.  The master problem chooses (fractional) multiplicities for a restricted set of polymer types
+      under monomer conservation, and is solved as a linear program.  A pricing subproblem over the composition of a
+      single saturated polymer then finds the polymer types whose reduced cost (with respect to the duals of the
+      master) is negative; these are added as new columns until none are left.  If the multiplicities are still
+      fractional, the search branches on the most fractional one.
+
+    The pricing subproblem is solved with CP-SAT, so the dual values are scaled and rounded to integers.  The columns
+      already in the master are forbidden in the pricing subproblem, so that branching bounds on them are respected.
+    """
+    PRICING_SCALE = 10 ** 6
+    TOLERANCE = 1e-6
+
+    def get_configuration(self, verbose: bool = False) -> Configuration:
+        with measure(self.solver.metrics, "solve"):
+            column_values = self._branch_and_price(verbose=verbose)
+        if self.solver.metrics is not None:
+            self.solver.metrics.record_search({"solver": "branch-and-price", **self.statistics})
+        if column_values is None:
+            raise AssertionError(f"Could not find solution to tbn, was reported infeasible")
+        if verbose:
+            print(self.statistics)
+        with measure(self.solver.metrics, "interpret_solution"):
+            return self._interpret_solution(column_values)
+
+    def get_all_configurations(self, verbose: bool = False) -> Iterator[Configuration]:
+        raise NotImplementedError("Column generation only finds a single stable configuration")
+
+    def _populate_model(self) -> None:
+        """
+        populates self.model with the master problem, and prepares the pricing subproblem
+        """
+        self._construct_lists_and_calculate_constants()
+        self._run_asserts()
+        self.model = integer_programming.IpModel(relaxed=True)
+        self.pricing_solver = constraint_programming.Solver(metrics=self.solver.metrics)
+        self.statistics = {
+            'columns_generated': 0,
+            'pricing_rounds': 0,
+            'nodes': 0,
+            'root_lower_bound': None,
+        }
+        self._add_master_constraints()
+        self._add_initial_columns()
+
+    def _construct_lists_and_calculate_constants(self) -> None:
+        self.ordered_monomer_types = list(self.tbn.monomer_types())
+        self.monomer_counts = [self.tbn.count(monomer) for monomer in self.ordered_monomer_types]
+        self.total_number_of_monomers = sum(self.monomer_counts)
+        self.limiting_domain_types = list(self.tbn.limiting_domain_types())
+        self.limiting_monomer_types = list(self.tbn.limiting_monomer_types())
+        # upper bound on how many total monomers can be in non-singleton polymers
+        self.upper_bound_on_total_monomers_in_complexes = min(
+            sum(
+                self.tbn.count(monomer_type) * (1 + abs(monomer_type.net_count(domain_type)))
+                for monomer_type in self.limiting_monomer_types
+                for domain_type in self.limiting_domain_types
+            ),
+            self.total_number_of_monomers
+        )
+        bounds = Bounds(
+            self.tbn,
+            self.limiting_monomer_types,
+            upper_bound_on_monomers_in_polymer=self.upper_bound_on_total_monomers_in_complexes,
+            tighten=self.user_constraints.min_merges() == 0 and self.user_constraints.max_polymers() == infinity,
+        )
+        self.max_monomer_counts_in_polymer = [
+            min(self.monomer_counts[i], bounds.max_copies_in_polymer(monomer))
+            for i, monomer in enumerate(self.ordered_monomer_types)
+        ]
+        # the cost of leaving a limiting monomer uncovered; any solution which does so is infeasible
+        self.artificial_cost = self.upper_bound_on_total_monomers_in_complexes + 1
+
+    def _add_master_constraints(self) -> None:
+        # monomer conservation; must use all limiting monomers, and cannot exceed the count of other monomers
+        self.conservation_constraints = {}
+        self.artificial_vars = []
+        for i, monomer in enumerate(self.ordered_monomer_types):
+            if monomer in self.limiting_monomer_types:
+                constraint = self.model.Constraint(self.monomer_counts[i], self.monomer_counts[i])
+                artificial_var = self.model.NumVar(0, self.monomer_counts[i], f'artificial_{i}')
+                constraint.SetCoefficient(artificial_var, 1)
+                self.model.Objective().SetCoefficient(artificial_var, self.artificial_cost)
+                self.artificial_vars.append(artificial_var)
+            elif self.monomer_counts[i] < infinity:
+                constraint = self.model.Constraint(0, self.monomer_counts[i])
+            else:
+                continue
+            self.conservation_constraints[i] = constraint
+
+        # bounds on the number of merges
+        min_merges = self.user_constraints.min_merges()
+        max_merges = self.user_constraints.max_merges()
+        if self.user_constraints.max_polymers() != infinity:
+            min_merges = max(min_merges, self.total_number_of_monomers - self.user_constraints.max_polymers())
+        if self.user_constraints.min_polymers() > 0:
+            max_merges = min(max_merges, self.total_number_of_monomers - self.user_constraints.min_polymers())
+        self.merges_constraint = None
+        if min_merges > 0 or max_merges != infinity:
+            self.merges_constraint = self.model.Constraint(
+                min_merges, max_merges if max_merges != infinity else self.model.infinity()
+            )
+            artificial_var = self.model.NumVar(0, self.model.infinity(), 'artificial_merges')
+            self.merges_constraint.SetCoefficient(artificial_var, 1)
+            self.model.Objective().SetCoefficient(artificial_var, self.artificial_cost)
+            self.artificial_vars.append(artificial_var)
+
+        self.model.Objective().SetMinimization()
+        self.columns = []
+        self.column_vars = []
+        self.column_upper_bounds = []
+
+    def _add_initial_columns(self) -> None:
+        # a trivial column for every limiting monomer type that is saturated on its own
+        for i, monomer in enumerate(self.ordered_monomer_types):
+            if monomer in self.limiting_monomer_types and \
+                    all(monomer.net_count(domain) <= 0 for domain in self.limiting_domain_types):
+                column = tuple(1 if k == i else 0 for k in range(len(self.ordered_monomer_types)))
+                self._add_column(column)
+
+    def _add_column(self, column: Tuple[int, ...]) -> None:
+        upper_bound = min(
+            [self.upper_bound_on_total_monomers_in_complexes] + [
+                self.monomer_counts[i] // column[i]
+                for i in range(len(self.ordered_monomer_types))
+                if column[i] > 0 and self.monomer_counts[i] < infinity
+            ]
+        )
+        p = len(self.columns)
+        column_var = self.model.NumVar(0, upper_bound, f'multiplicity_{p}')
+        self.model.Objective().SetCoefficient(column_var, sum(column) - 1)
+        for i, constraint in self.conservation_constraints.items():
+            if column[i] > 0:
+                constraint.SetCoefficient(column_var, column[i])
+        if self.merges_constraint is not None:
+            self.merges_constraint.SetCoefficient(column_var, sum(column) - 1)
+
+        self.columns.append(column)
+        self.column_vars.append(column_var)
+        self.column_upper_bounds.append(upper_bound)
+        self.statistics['columns_generated'] += 1
+
+    def _solve_master(self) -> Optional[float]:
+        """
+        returns the optimal value of the restricted master problem, or None if it is infeasible; only the branching
+          bounds can make it infeasible, since every limiting monomer type can be covered by an artificial variable
+        """
+        status = self.model.Solve()
+        if status == self.model.INFEASIBLE:
+            return None
+        if status != self.model.OPTIMAL:
+            raise AssertionError(f"could not solve the master problem, got code {status} instead")
+        return self.model.Objective().Value()
+
+    def _price(self) -> List[Tuple[int, ...]]:
+        """
+        returns new columns with negative reduced cost, or an empty list if there are none
+        """
+        duals = {i: constraint.dual_value() for i, constraint in self.conservation_constraints.items()}
+        merges_dual = self.merges_constraint.dual_value() if self.merges_constraint is not None else 0.0
+        # reduced cost of a column v is (1 - merges_dual) * (|v| - 1) - sum_i duals[i] * v_i
+        costs = [1 - merges_dual - duals.get(i, 0.0) for i in range(len(self.ordered_monomer_types))]
+        constant_cost = -(1 - merges_dual)
+
+        pricing_model = constraint_programming.CpModel()
+        composition_vars = [
+            pricing_model.int_var(0, int(self.max_monomer_counts_in_polymer[i]), f'composition_{i}')
+            for i in range(len(self.ordered_monomer_types))
+        ]
+        for domain in self.limiting_domain_types:
+            pricing_model.add_constraint(
+                sum(
+                    monomer.net_count(domain) * composition_vars[i]
+                    for i, monomer in enumerate(self.ordered_monomer_types)
+                ) <= 0
+            )
+        pricing_model.add_constraint(
+            sum(
+                composition_vars[i]
+                for i, monomer in enumerate(self.ordered_monomer_types)
+                if monomer in self.limiting_monomer_types
+            ) >= 1
+        )
+        if self.columns:
+            pricing_model.AddForbiddenAssignments(composition_vars, self.columns)
+
+        scaled_objective = sum(
+            round(self.PRICING_SCALE * cost) * composition_vars[i] for i, cost in enumerate(costs)
+        )
+        pricing_model.add_constraint(scaled_objective < round(-self.PRICING_SCALE * constant_cost))
+        pricing_model.minimize(scaled_objective)
+
+        self.statistics['pricing_rounds'] += 1
+        status, found_solutions = self.pricing_solver.solve_with_intermediate_solutions(
+            pricing_model, composition_vars
+        )
+        if status == pricing_model.INFEASIBLE:
+            return []
+
+        new_columns = []
+        for solution in found_solutions:
+            column = tuple(solution[var] for var in composition_vars)
+            reduced_cost = constant_cost + sum(cost * count for cost, count in zip(costs, column))
+            if reduced_cost < -self.TOLERANCE and column not in new_columns:
+                new_columns.append(column)
+        return new_columns
+
+    def _generate_columns(self) -> Optional[float]:
+        # new columns only add variables, so a master problem that is feasible stays feasible, and one that is
+        #  infeasible (because of its branching bounds) cannot be repaired by pricing
+        lower_bound = self._solve_master()
+        if lower_bound is None:
+            return None
+        new_columns = self._price()
+        while new_columns:
+            for column in new_columns:
+                self._add_column(column)
+            lower_bound = self._solve_master()
+            new_columns = self._price()
+        return lower_bound
+
+    def _column_values(self) -> Dict[int, float]:
+        return {p: column_var.solution_value() for p, column_var in enumerate(self.column_vars)}
+
+    def _restricted_integer_master(self) -> Optional[Dict[int, int]]:
+        # a feasible integer solution over the columns generated so far, as an upper bound for branching
+        integer_model = constraint_programming.CpModel()
+        multiplicity_vars = [
+            integer_model.int_var(0, int(upper_bound), f'multiplicity_{p}')
+            for p, upper_bound in enumerate(self.column_upper_bounds)
+        ]
+        for i, monomer in enumerate(self.ordered_monomer_types):
+            number_of_monomers_used = sum(
+                column[i] * multiplicity_vars[p] for p, column in enumerate(self.columns) if column[i] > 0
+            )
+            if monomer in self.limiting_monomer_types:
+                integer_model.add_constraint(number_of_monomers_used == self.monomer_counts[i])
+            elif self.monomer_counts[i] < infinity:
+                integer_model.add_constraint(number_of_monomers_used <= self.monomer_counts[i])
+        number_of_merges = sum((sum(column) - 1) * multiplicity_vars[p] for p, column in enumerate(self.columns))
+        if self.merges_constraint is not None:
+            integer_model.add_constraint(number_of_merges >= int(self.merges_constraint.lb()))
+            if self.merges_constraint.ub() < self.model.infinity():
+                integer_model.add_constraint(number_of_merges <= int(self.merges_constraint.ub()))
+        integer_model.minimize(number_of_merges)
+
+        status = self.pricing_solver.solve(integer_model, multiplicity_vars)
+        if status != integer_model.OPTIMAL:
+            return None
+        return {p: self.pricing_solver.value(var) for p, var in enumerate(multiplicity_vars)}
+
+    def _branch_and_price(self, verbose: bool = False) -> Optional[Dict[int, int]]:
+        incumbent = None
+        incumbent_merges = infinity
+
+        # each node is a dictionary of branching bounds: column index -> (lower bound, upper bound)
+        stack = [{}]
+        while stack:
+            branching_bounds = stack.pop()
+            self.statistics['nodes'] += 1
+            for p, column_var in enumerate(self.column_vars):
+                column_var.SetBounds(*branching_bounds.get(p, (0, self.column_upper_bounds[p])))
+
+            lower_bound = self._generate_columns()
+            if lower_bound is None:
+                continue  # the branching bounds are infeasible
+            if any(artificial_var.solution_value() > self.TOLERANCE for artificial_var in self.artificial_vars):
+                continue  # infeasible node
+            if self.statistics['root_lower_bound'] is None:
+                self.statistics['root_lower_bound'] = lower_bound
+                restricted_solution = self._restricted_integer_master()
+                if restricted_solution is not None:
+                    incumbent = restricted_solution
+                    incumbent_merges = self._number_of_merges(incumbent)
+            if ceil(lower_bound - self.TOLERANCE) >= incumbent_merges:
+                continue  # cannot improve on the incumbent
+
+            column_values = self._column_values()
+            fractional_columns = [
+                (p, value) for p, value in column_values.items() if abs(value - round(value)) > self.TOLERANCE
+            ]
+            if not fractional_columns:
+                incumbent = {p: int(round(value)) for p, value in column_values.items()}
+                incumbent_merges = self._number_of_merges(incumbent)
+                continue
+
+            p, value = max(fractional_columns, key=lambda item: min(item[1] - floor(item[1]), ceil(item[1]) - item[1]))
+            lower, upper = branching_bounds.get(p, (0, self.column_upper_bounds[p]))
+            stack.append({**branching_bounds, p: (lower, floor(value))})
+            stack.append({**branching_bounds, p: (ceil(value), upper)})  # explored first
+
+            if verbose:
+                print(f"node {self.statistics['nodes']}: lower bound {lower_bound}, incumbent {incumbent_merges}")
+
+        return incumbent
+
+    def _number_of_merges(self, column_values: Dict[int, int]) -> int:
+        return sum((sum(self.columns[p]) - 1) * value for p, value in column_values.items())
+
+    def _variables_to_keep(self) -> List[Any]:
+        return self.column_vars
+
+    def _interpret_solution(self, variable_to_value_dictionary: Dict[Any, int]) -> Configuration:
+        """
+        converts the multiplicities of the columns (indexed by column number) into the corresponding configuration
+        """
+        this_configuration_dict = {}
+        for p, multiplicity in variable_to_value_dictionary.items():
+            if multiplicity > 0:
+                this_polymer = Polymer({
+                    monomer: self.columns[p][i]
+                    for i, monomer in enumerate(self.ordered_monomer_types)
+                    if self.columns[p][i] > 0
+                })
+                this_configuration_dict[this_polymer] = multiplicity + this_configuration_dict.get(this_polymer, 0)
+
+        partial_configuration = Configuration(this_configuration_dict)
+
+        difference_tbn = self.tbn - partial_configuration.flatten()
+
+        for monomer_type in difference_tbn.monomer_types():
+            singleton_polymer = Polymer({monomer_type: 1})
+            this_configuration_dict[singleton_polymer] = \
+                difference_tbn.count(monomer_type) + this_configuration_dict.get(singleton_polymer, 0)
+
+        return Configuration(this_configuration_dict)
+
+    def _run_asserts(self) -> None:
+        if self.user_constraints.max_energy() != infinity:
+            raise NotImplementedError(
+                f"Not implemented to use this formulation with max energy: {self.user_constraints.max_energy()}"
+            )
+        if self.user_constraints.min_energy() != -infinity:
+            raise NotImplementedError(
+                f"Not implemented to use this formulation with min energy: {self.user_constraints.min_energy()}"
+            )
+        if self.user_constraints.max_polymers() != infinity:
+            if self.total_number_of_monomers == infinity:
+                raise AssertionError("Tbn has infinitely many monomers but only a finite max_polymers was specified")
@@ -0,0 +1,156 @@
+from typing import List, Any, Dict
+from math import inf as infinity
+
+from source.formulations.abstract import Formulation as AbstractFormulation
+from source.configuration import Configuration
+from source.polymer import Polymer
+
+
+class Formulation(AbstractFormulation):
+    """
+    Each (labelled) monomer is assigned to a polymer by an integer polymer index variable, which is channeled to one
+      boolean per allowed polymer.  Polymer p can only be opened by the p-th limiting monomer ("first monomer opens
+      polymer"), so limiting monomer k may only join the polymers 0..k, and every partition of the monomers has
+      exactly one assignment.  Non-limiting monomers may also be left out of every polymer, as singletons.  The
+      model has one row per monomer rather than one per pair of monomers.
+    """
+    def _populate_model(self) -> None:
+        """
+        populates self.model with the variables and constraints needed to solve a formulation
+        """
+        self._construct_lists_and_calculate_constants()
+        self._run_asserts()
+        self._add_variables()
+        self._add_constraints()
+        self._apply_counting_constraints()
+        if self.user_constraints.optimize():
+            self._apply_objective_function()
+
+    def _construct_lists_and_calculate_constants(self) -> None:
+        self.limiting_domain_types = list(self.tbn.limiting_domain_types())
+        limiting_monomer_types = set(
+            monomer for monomer in self.tbn.monomer_types()
+            if any(monomer.net_count(domain) > 0 for domain in self.limiting_domain_types)
+        )
+        # limiting monomers come first, so that the first number_of_polymer_slots monomers each open one polymer
+        all_monomers = list(self.tbn.monomer_types(flatten=True))
+        self.ordered_monomers = \
+            [monomer for monomer in all_monomers if monomer in limiting_monomer_types] + \
+            [monomer for monomer in all_monomers if monomer not in limiting_monomer_types]
+        self.total_number_of_monomers = len(self.ordered_monomers)
+        self.number_of_polymer_slots = sum(1 for monomer in all_monomers if monomer in limiting_monomer_types)
+        # a non-limiting monomer with this polymer index is a singleton
+        self.singleton_index = self.number_of_polymer_slots
+
+        self.model.set_big_m(self.total_number_of_monomers)
+
+    def _allowed_polymer_indices(self, k: int) -> range:
+        if k < self.number_of_polymer_slots:
+            return range(k + 1)
+        else:
+            return range(self.number_of_polymer_slots + 1)  # includes the singleton index
+
+    def _add_variables(self) -> None:
+        # index_vars[k] = index of the polymer that monomer k is assigned to
+        self.index_vars = {}
+        # assignment_vars[k, p] = 1 if monomer k is assigned to polymer p, 0 else
+        self.assignment_vars = {}
+        for k in range(self.total_number_of_monomers):
+            allowed_polymer_indices = self._allowed_polymer_indices(k)
+            self.index_vars[k] = self.model.int_var(0, allowed_polymer_indices[-1], f'polymer_index_{k}')
+            for p in allowed_polymer_indices:
+                self.assignment_vars[k, p] = self.model.bool_var(f'assignment_{k}_{p}')
+
+        # polymer p is open exactly when the monomer that opens it is assigned to it
+        self.open_vars = {p: self.assignment_vars[p, p] for p in range(self.number_of_polymer_slots)}
+
+    def _add_constraints(self) -> None:
+        self._add_channeling_constraints()
+        self._add_opening_constraints()
+        self._add_saturation_constraints()
+
+    def _add_channeling_constraints(self) -> None:
+        # each monomer is assigned to exactly one of its allowed polymers, and the index variable agrees
+        for k in range(self.total_number_of_monomers):
+            allowed_polymer_indices = self._allowed_polymer_indices(k)
+            self.model.add_constraint(sum(self.assignment_vars[k, p] for p in allowed_polymer_indices) == 1)
+            self.model.add_constraint(
+                self.index_vars[k] == sum(p * self.assignment_vars[k, p] for p in allowed_polymer_indices)
+            )
+
+    def _add_opening_constraints(self) -> None:
+        # a monomer can only join a polymer that has been opened
+        for k in range(self.total_number_of_monomers):
+            for p in self._allowed_polymer_indices(k):
+                if p != k and p != self.singleton_index:
+                    self.model.add_constraint(self.assignment_vars[k, p] <= self.open_vars[p])
+
+    def _add_saturation_constraints(self) -> None:
+        # saturation constraint: limiting sites must be in the minority in any polymer
+        for p in range(self.number_of_polymer_slots):
+            for domain in self.limiting_domain_types:
+                self.model.add_constraint(
+                    sum(
+                        self.ordered_monomers[k].net_count(domain) * self.assignment_vars[k, p]
+                        for k in range(p, self.total_number_of_monomers)
+                    ) <= 0
+                )
+
+    def _apply_counting_constraints(self) -> None:
+        number_of_singletons = sum(
+            self.assignment_vars[k, self.singleton_index]
+            for k in range(self.number_of_polymer_slots, self.total_number_of_monomers)
+        )
+        self.number_of_polymers = sum(self.open_vars.values()) + number_of_singletons
+        self.number_of_merges = self.total_number_of_monomers - self.number_of_polymers
+
+        if self.user_constraints.max_polymers() != infinity:
+            self.model.add_constraint(self.number_of_polymers <= self.user_constraints.max_polymers())
+        if self.user_constraints.min_polymers() > 0:
+            self.model.add_constraint(self.number_of_polymers >= self.user_constraints.min_polymers())
+
+        if self.user_constraints.max_merges() != infinity:
+            self.model.add_constraint(self.number_of_merges <= self.user_constraints.max_merges())
+        if self.user_constraints.min_merges() > 0:
+            self.model.add_constraint(self.number_of_merges >= self.user_constraints.min_merges())
+
+    def _apply_objective_function(self) -> None:
+        self.model.maximize(self.number_of_polymers)
+
+    def _bounded_quantity(self) -> Any:
+        return self.number_of_merges
+
+    def _variables_to_keep(self) -> List[Any]:
+        return list(self.index_vars.values())
+
+    def _interpret_solution(self, variable_to_value_dictionary: Dict[Any, int]) -> Configuration:
+        """
+        uses the provided dictionary to convert solution variables into solution values and from this,
+          converts the solutions values into the corresponding configuration
+        """
+        polymer_dicts = [{} for _ in range(self.number_of_polymer_slots)]
+        this_configuration_dict = {}
+        for k, monomer in enumerate(self.ordered_monomers):
+            polymer_index = variable_to_value_dictionary[self.index_vars[k]]
+            if polymer_index == self.singleton_index:
+                singleton_polymer = Polymer({monomer: 1})
+                this_configuration_dict[singleton_polymer] = 1 + this_configuration_dict.get(singleton_polymer, 0)
+            else:
+                polymer_dicts[polymer_index][monomer] = 1 + polymer_dicts[polymer_index].get(monomer, 0)
+
+        for this_polymer_dict in polymer_dicts:
+            if this_polymer_dict:
+                this_polymer = Polymer(this_polymer_dict)
+                this_configuration_dict[this_polymer] = 1 + this_configuration_dict.get(this_polymer, 0)
+
+        return Configuration(this_configuration_dict)
+
+    def _run_asserts(self) -> None:
+        if self.user_constraints.max_energy() != infinity:
+            raise NotImplementedError(
+                f"Not implemented to use this formulation with max energy: {self.user_constraints.max_energy()}"
+            )
+        if self.user_constraints.min_energy() != -infinity:
+            raise NotImplementedError(
+                f"Not implemented to use this formulation with min energy: {self.user_constraints.min_energy()}"
+            )
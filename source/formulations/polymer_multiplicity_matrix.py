@@ -0,0 +1,185 @@
+from typing import List, Dict, Any, Tuple
+from math import inf as infinity
+
+from source.formulations.polymer_unbounded_matrix import Formulation as UnboundedFormulation
+from source.constraints import SortStrategy
+from source.polymer import Polymer
+from source.configuration import Configuration
+
+
+class Formulation(UnboundedFormulation):
+    """
+    Each column of the matrix is a slot for a distinct polymer type, together with the number of copies of that
+      polymer type in the configuration.  The size of the model scales with the number of distinct polymer types
+      rather than with the number of monomers.  This formulation always runs in iterative mode, growing the number
+      of slots until the optimum is proven.
+    """
+    def _construct_lists_and_calculate_constants(self) -> None:
+        super()._construct_lists_and_calculate_constants()
+        # every polymer contains a limiting monomer, so this also bounds the copies of any one polymer type
+        self.max_multiplicity = self.upper_bound_on_number_of_polymers
+
+    def _get_exact_number_of_columns(self) -> int:
+        # the distinct polymer types are bounded by the number of polymers, and also by the number of merges
+        #  plus the number of limiting singletons
+        exact_number_of_slots = self.max_polymers
+        if self.user_constraints.max_merges() != infinity:
+            exact_number_of_slots = min(
+                exact_number_of_slots,
+                self.user_constraints.max_merges() + len(self.limiting_monomer_types)
+            )
+        return exact_number_of_slots
+
+    def _iterative(self) -> bool:
+        return True
+
+    def _add_variables(self) -> None:
+        super()._add_variables()
+
+        # multiplicity_vars[j] = number of copies of the polymer in slot j
+        self.multiplicity_vars = {}
+        for j in range(self.max_polymers):
+            self.multiplicity_vars[j] = self.model.int_var(0, self.max_multiplicity, f'multiplicity_{j}')
+
+        # product_vars[i, j] = count of monomer i in all copies of the polymer in slot j
+        self.product_vars = {}
+        for i, monomer_type in enumerate(self.ordered_monomer_types):
+            for j in range(self.max_polymers):
+                self.product_vars[i, j] = self.model.int_var(
+                    0,
+                    min(self.monomer_counts[i], self.max_monomer_counts_in_polymer[i] * self.max_multiplicity),
+                    f'product_{i}_{j}'
+                )
+
+    def _add_constraints(self) -> None:
+        super()._add_constraints()
+        self._add_multiplicity_constraints()
+
+    def _add_conservation_constraints(self) -> None:
+        # monomer conservation; must use all limiting monomers, and cannot exceed the count of other monomers
+        self.conservation_constraints = {}
+        for i, monomer in enumerate(self.ordered_monomer_types):
+            number_of_monomers_used = sum(
+                self.product_vars[i, j]
+                for j in range(self.max_polymers)
+            ) + self.residual_vars.get(i, 0)
+            if monomer in self.limiting_monomer_types:
+                self.conservation_constraints[i] = \
+                    self.model.add_constraint(number_of_monomers_used == self.monomer_counts[i])
+            elif self.monomer_counts[i] < infinity:
+                self.conservation_constraints[i] = \
+                    self.model.add_constraint(number_of_monomers_used <= self.monomer_counts[i])
+
+    def _update_monomer_count(self, i: int) -> None:
+        super()._update_monomer_count(i)
+        for j in range(self.max_polymers):
+            self.model.set_var_upper_bound(
+                self.product_vars[i, j],
+                min(self.monomer_counts[i], self.max_monomer_counts_in_polymer[i] * self.max_multiplicity),
+            )
+
+    def _add_multiplicity_constraints(self) -> None:
+        for j in range(self.max_polymers):
+            # a slot has copies exactly when it holds a polymer
+            self.model.add_constraint(self.multiplicity_vars[j] >= self.indicator_vars[j])
+            self.model.add_constraint(self.multiplicity_vars[j] <= self.max_multiplicity * self.indicator_vars[j])
+            for i in range(len(self.ordered_monomer_types)):
+                self.model.add_multiplication_equality(
+                    self.product_vars[i, j],
+                    self.polymer_composition_vars[i, j],
+                    self.multiplicity_vars[j],
+                )
+
+            # the following are implied by the products, but they tighten the linear relaxation considerably:
+            #  all copies of a polymer together are saturated, and each copy contains a limiting monomer
+            for domain in self.limiting_domain_types:
+                self.model.add_constraint(
+                    sum(
+                        monomer.net_count(domain) * self.product_vars[i, j]
+                        for i, monomer in enumerate(self.ordered_monomer_types)
+                    ) <= 0
+                )
+            self.model.add_constraint(
+                self.multiplicity_vars[j] <= sum(
+                    self.product_vars[i, j]
+                    for i, monomer in enumerate(self.ordered_monomer_types)
+                    if monomer in self.limiting_monomer_types
+                )
+            )
+
+    def _add_sorting_constraints(self) -> None:
+        super()._add_sorting_constraints()
+        if self.user_constraints.sort() and \
+                self.user_constraints.sort_strategy() in (SortStrategy.CHAIN, SortStrategy.LEX):
+            # slots hold distinct polymer types, so an occupied slot must be strictly smaller than the one before it
+            last_block_index = len(self.sort_blocks) - 1
+            for j in range(self.max_polymers - 1):
+                self.model.add_implication(
+                    self.indicator_vars[j + 1],
+                    self.model.complement_var(self.tiebreaker_vars[last_block_index, j])
+                )
+
+    def _add_counting_expressions(self) -> None:
+        total_number_of_monomers_used = sum(
+            self.product_vars[i, j]
+                for i in range(len(self.ordered_monomer_types))
+                for j in range(self.max_polymers)
+        ) + sum(self.residual_vars.values())
+        self.number_of_polymers = \
+            sum(self.multiplicity_vars[j] for j in range(self.max_polymers)) + self.residual_polymers_var
+        self.number_of_merges = total_number_of_monomers_used - self.number_of_polymers
+
+    def _hint_columns(self, configuration: Configuration) -> List[Tuple[List[int], int]]:
+        # each column holds all copies of one polymer type
+        multiplicities = {}
+        for composition, _ in super()._hint_columns(configuration):
+            multiplicities[tuple(composition)] = 1 + multiplicities.get(tuple(composition), 0)
+        return sorted(
+            ((list(composition), multiplicity) for composition, multiplicity in multiplicities.items()),
+            reverse=True,
+        )
+
+    def _apply_hint(self) -> None:
+        super()._apply_hint()
+        columns = self._hint_columns(self.hint)
+        for j in range(self.max_polymers):
+            composition, multiplicity = columns[j] if j < len(columns) else ([0] * len(self.ordered_monomer_types), 0)
+            self.model.add_hint(self.multiplicity_vars[j], multiplicity)
+            for i, count in enumerate(composition):
+                self.model.add_hint(self.product_vars[i, j], count * multiplicity)
+
+    def _variables_to_keep(self) -> List[Any]:
+        """
+        returns a list of the variables that are necessary to convert a solution back to a configuration
+          (e.g. returns polymer composition variables but not 'internal' tie-breaker variables)
+        """
+        return list(self.polymer_composition_vars.values()) + list(self.multiplicity_vars.values())
+
+    def _interpret_solution(self, variable_to_value_dictionary: Dict[Any, int]) -> Configuration:
+        """
+        uses the provided dictionary to convert solution variables into solution values and from this,
+          converts the solutions values into the corresponding configuration
+        """
+        this_configuration_dict = {}
+
+        for j in range(self.max_polymers):
+            multiplicity = variable_to_value_dictionary[self.multiplicity_vars[j]]
+            this_polymer_dict = {}
+            for i, monomer in enumerate(self.ordered_monomer_types):
+                monomer_count = variable_to_value_dictionary[self.polymer_composition_vars[i, j]]
+                if monomer_count > 0:
+                    this_polymer_dict[monomer] = monomer_count
+            if this_polymer_dict and multiplicity > 0:
+                this_polymer = Polymer(this_polymer_dict)
+                this_configuration_dict[this_polymer] = multiplicity + this_configuration_dict.get(this_polymer, 0)
+
+        partial_configuration = Configuration(this_configuration_dict)
+
+        difference_tbn = self.tbn - partial_configuration.flatten()
+
+        for monomer_type in difference_tbn.monomer_types():
+            singleton_polymer = Polymer({monomer_type: 1})
+            this_configuration_dict[singleton_polymer] = \
+                difference_tbn.count(monomer_type) + this_configuration_dict.get(singleton_polymer, 0)
+
+        return Configuration(this_configuration_dict)
@@ -1,13 +1,121 @@
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Iterator, Optional
 from math import inf as infinity
 
 from source.formulations.abstract import Formulation as AbstractFormulation
+from source.tbn import Tbn
+from source.constraints import Constraints, SortStrategy
+from source.solver_adapters.abstract import SolverAdapter
 from source.monomer import Monomer
+from source.bounds import Bounds
 from source.polymer import Polymer
 from source.configuration import Configuration
 
 
 class Formulation(AbstractFormulation):
+    """
+    In iterative mode, the search for a single optimal configuration begins with only a few polymer columns.  Any
+      monomers that do not fit into the columns are placed into a "residual" which is only constrained to be
+      saturated in aggregate.  This is a relaxation of the problem, so if the optimal solution does not use the
+      residual then it is optimal for the original problem; otherwise the number of columns is doubled and the
+      search is repeated, up to the worst-case number of columns (at which point no residual is needed).
+    """
+    # largest value of a block signature in the LEX sort strategy; keeps the implied big M values manageable
+    MAX_SIGNATURE_VALUE = 2 ** 20
+
+    def __init__(
+            self,
+            tbn: Tbn,
+            solver: SolverAdapter,
+            user_constraints: Constraints = Constraints(),
+            number_of_columns: Optional[int] = None,
+    ) -> None:
+        self.number_of_columns = number_of_columns
+        self.hint = None
+        super().__init__(tbn, solver, user_constraints)
+
+    def get_configuration(self, verbose: bool = False) -> Configuration:
+        configuration = super().get_configuration(verbose=verbose)
+        while self._residual_is_used():
+            self.number_of_columns = min(2 * self.number_of_columns, self.exact_number_of_columns)
+            self._rebuild_model()
+            configuration = super().get_configuration(verbose=verbose)
+        return configuration
+
+    def get_all_configurations(self, verbose: bool = False) -> Iterator[Configuration]:
+        if self.number_of_columns < self.exact_number_of_columns:
+            self.number_of_columns = self.exact_number_of_columns
+            self._rebuild_model()
+        return super().get_all_configurations(verbose=verbose)
+
+    def add_hint(self, configuration: Configuration) -> None:
+        self.hint = configuration
+        self.model.clear_hints()
+        self._apply_hint()
+
+    def update_tbn(self, tbn: Tbn) -> bool:
+        """
+        if only the counts of non-limiting monomer types change (between finite values), and this changes neither the
+          limiting domain types nor any bound on the composition of a polymer, then only the right-hand sides of
+          the conservation constraints (and the bounds of the residual) depend on the counts, so the model is
+          updated in place
+        """
+        changed_monomer_types = set(
+            monomer for monomer in set(tbn.monomer_types()).union(self.tbn.monomer_types())
+            if tbn.count(monomer) != self.tbn.count(monomer)
+        )
+        in_place = \
+            set(tbn.monomer_types()) == set(self.tbn.monomer_types()) and \
+            list(tbn.limiting_domain_types()) == self.limiting_domain_types and \
+            self.user_constraints.max_polymers() == infinity and \
+            self.user_constraints.min_polymers() == 0 and \
+            all(
+                monomer not in self.limiting_monomer_types and
+                self.tbn.count(monomer) < infinity and tbn.count(monomer) < infinity
+                for monomer in changed_monomer_types
+            )
+        if in_place:
+            old_constants = (
+                self.ordered_monomer_types,
+                self.limiting_monomer_types,
+                self.upper_bound_on_total_monomers_in_complexes,
+                self.max_monomer_counts_in_polymer,
+                self.exact_number_of_columns,
+            )
+            self.tbn = tbn
+            self._construct_lists_and_calculate_constants()
+            in_place = old_constants == (
+                self.ordered_monomer_types,
+                self.limiting_monomer_types,
+                self.upper_bound_on_total_monomers_in_complexes,
+                self.max_monomer_counts_in_polymer,
+                self.exact_number_of_columns,
+            )
+
+        self.tbn = tbn
+        if not in_place:
+            self.number_of_columns = None
+            self._rebuild_model()
+            return False
+        for i, monomer in enumerate(self.ordered_monomer_types):
+            if monomer in changed_monomer_types:
+                self._update_monomer_count(i)
+        return True
+
+    def _update_monomer_count(self, i: int) -> None:
+        # updates the model in place after the count of (non-limiting) monomer i changes
+        self.model.set_constraint_upper_bound(self.conservation_constraints[i], self.monomer_counts[i])
+        if i in self.residual_vars:
+            self.model.set_var_upper_bound(
+                self.residual_vars[i],
+                min(self.monomer_counts[i], self.upper_bound_on_total_monomers_in_complexes)
+                if self.max_monomer_counts_in_polymer[i] > 0 else 0,
+            )
+
+    def _rebuild_model(self) -> None:
+        self._build_model()
+        if self.hint is not None:
+            self._apply_hint()
+
     def _populate_model(self) -> None:
         """
         populates self.model with the variables and constraints needed to solve a formulation
@@ -40,11 +148,53 @@ class Formulation(AbstractFormulation):
             self.upper_bound_on_total_monomers_in_complexes,
             self.total_number_of_monomers
         )
+        self.bounds = Bounds(
+            self.tbn,
+            self.limiting_monomer_types,
+            upper_bound_on_monomers_in_polymer=self.upper_bound_on_total_monomers_in_complexes,
+            tighten=self._tighten_bounds(),
+        )
+        self.max_monomer_counts_in_polymer = [
+            min(self.monomer_counts[i], self.bounds.max_copies_in_polymer(monomer))
+            for i, monomer in enumerate(self.ordered_monomer_types)
+        ]
+        # only a fallback; the IP adapter derives local values from the variable bounds where it can
         self.model.set_big_m(self.upper_bound_on_total_monomers_in_complexes)
         if self.user_constraints.max_polymers() == infinity:
             self.max_polymers = self.total_number_of_limiting_monomers
         else:
             self.max_polymers = self.user_constraints.max_polymers()
+        self.upper_bound_on_number_of_polymers = self.max_polymers
+
+        self.exact_number_of_columns = self._get_exact_number_of_columns()
+        if self.number_of_columns is None:
+            if self._iterative() and self.user_constraints.optimize():
+                self.number_of_columns = min(
+                    self.exact_number_of_columns, max(1, len(self.limiting_monomer_types))
+                )
+            else:
+                self.number_of_columns = self.exact_number_of_columns
+        # a relaxation is only meaningful if there is an objective to bound
+        self.with_residual = \
+            self.user_constraints.optimize() and self.number_of_columns < self.exact_number_of_columns
+
+        # from here on, max_polymers is the number of columns of the matrix
+        self.max_polymers = self.number_of_columns
+
+    def _tighten_bounds(self) -> bool:
+        # the bounding presolve assumes that splitting off a monomer never hurts,
+        #  which only holds if the configuration is optimized without a lower bound on the merges
+        return self.user_constraints.optimize() and \
+            self.user_constraints.min_merges() == 0 and \
+            self.user_constraints.max_polymers() == infinity and \
+            self.user_constraints.min_energy() == -infinity
+
+    def _get_exact_number_of_columns(self) -> int:
+        # the number of columns that guarantees that no configuration is excluded
+        return self.max_polymers
+
+    def _iterative(self) -> bool:
+        return self.user_constraints.iterative()
 
     def _add_variables(self) -> None:
         # polymer_composition_vars[i, j] = count of monomer i in polymer j
@@ -53,7 +203,7 @@ class Formulation(AbstractFormulation):
             for j in range(self.max_polymers):
                 self.polymer_composition_vars[i, j] = self.model.int_var(
                     0,
-                    min(self.monomer_counts[i], self.upper_bound_on_total_monomers_in_complexes),
+                    self.max_monomer_counts_in_polymer[i],
                     f'polymer_composition_{i}_{j}'
                 )
 
@@ -62,28 +212,43 @@ class Formulation(AbstractFormulation):
         for j in range(self.max_polymers):
             self.indicator_vars[j] = self.model.bool_var(f'indicator_{j}')
 
+        # residual_vars[i] = count of monomer i that is not placed into any column
+        self.residual_vars = {}
+        self.residual_polymers_var = 0
+        if self.with_residual:
+            for i, monomer_type in enumerate(self.ordered_monomer_types):
+                self.residual_vars[i] = self.model.int_var(
+                    0,
+                    min(self.monomer_counts[i], self.upper_bound_on_total_monomers_in_complexes)
+                    if self.max_monomer_counts_in_polymer[i] > 0 else 0,
+                    f'residual_{i}'
+                )
+            # an upper bound on the number of polymers that the residual monomers form
+            self.residual_polymers_var = self.model.int_var(
+                0, self.total_number_of_limiting_monomers, 'residual_polymers'
+            )
+
     def _add_constraints(self) -> None:
         self._add_conservation_constraints()
         self._add_saturation_constraints()
         self._add_polymer_indicator_constraints()
+        if self.with_residual:
+            self._add_residual_constraints()
 
     def _add_conservation_constraints(self) -> None:
         # monomer conservation; must use all limiting monomers, and cannot exceed the count of other monomers
+        self.conservation_constraints = {}
         for i, monomer in enumerate(self.ordered_monomer_types):
+            number_of_monomers_used = sum(
+                self.polymer_composition_vars[i, j]
+                for j in range(self.max_polymers)
+            ) + self.residual_vars.get(i, 0)
             if monomer in self.limiting_monomer_types:
-                self.model.add_constraint(
-                    sum(
-                        self.polymer_composition_vars[i, j]
-                        for j in range(self.max_polymers)
-                    ) == self.monomer_counts[i]
-                )
+                self.conservation_constraints[i] = \
+                    self.model.add_constraint(number_of_monomers_used == self.monomer_counts[i])
             elif self.monomer_counts[i] < infinity:
-                self.model.add_constraint(
-                    sum(
-                        self.polymer_composition_vars[i, j]
-                        for j in range(self.max_polymers)
-                    ) <= self.monomer_counts[i]
-                )
+                self.conservation_constraints[i] = \
+                    self.model.add_constraint(number_of_monomers_used <= self.monomer_counts[i])
 
     def _add_saturation_constraints(self) -> None:
         # must saturate the limiting domains in each polymer
@@ -122,48 +287,125 @@ class Formulation(AbstractFormulation):
             )
             # Note that by (i) and (ii) combined, we also enforce that there are no polymers without limiting monomers
 
+    def _add_residual_constraints(self) -> None:
+        # any collection of saturated polymers is saturated in aggregate
+        for domain in self.limiting_domain_types:
+            self.model.add_constraint(
+                sum(
+                    monomer.net_count(domain) * self.residual_vars[i]
+                    for i, monomer in enumerate(self.ordered_monomer_types)
+                ) <= 0
+            )
+        # every polymer contains a limiting monomer
+        self.model.add_constraint(
+            self.residual_polymers_var <= sum(
+                self.residual_vars[i]
+                for i, monomer in enumerate(self.ordered_monomer_types)
+                if monomer in self.limiting_monomer_types
+            )
+        )
+
+    def _residual_is_used(self) -> bool:
+        return self.with_residual and any(self.solver.value(var) > 0 for var in self.residual_vars.values())
+
     def _add_sorting_constraints(self) -> None:
-        if self.user_constraints.sort():
-            # tiebreaker variables that enforce lexicographical ordering of polymers based upon monomer counts within
-            # tiebreaker_vars[i,j] = (Is the count of all monomers <= i the same in both polymers j and j-1?)
-            tiebreaker_vars = {}
-            for i in range(-1, len(self.ordered_monomer_types)):
-                for j in range(self.max_polymers - 1):
-                    tiebreaker_vars[i, j] = self.model.bool_var(f'tiebreaker_{i}_{j}')
-
-            # boundary conditions
+        self.sort_blocks = []
+        if not self.user_constraints.sort():
+            return
+
+        sort_strategy = self.user_constraints.sort_strategy()
+        if sort_strategy == SortStrategy.CHAIN:
+            self.sort_blocks = [[(i, 1)] for i in range(len(self.ordered_monomer_types))]
+            self._add_lexicographic_ordering()
+        elif sort_strategy == SortStrategy.LEX:
+            self.sort_blocks = self._get_signature_blocks()
+            self._add_lexicographic_ordering()
+        elif sort_strategy == SortStrategy.SIGNATURE:
+            self._add_signature_ordering()
+        elif sort_strategy == SortStrategy.SOLVER:
+            self.model.enable_symmetry_detection()
+        else:
+            raise AssertionError(f"Did not recognize sort strategy {sort_strategy}")
+
+    def _get_signature_blocks(self) -> List[List[Tuple[int, int]]]:
+        # groups consecutive monomer types into blocks of (monomer index, weight) pairs; within a block, the weights
+        #  form a mixed radix, so that the weighted sum orders the block lexicographically.
+        #  blocks are cut before the weighted sum can exceed MAX_SIGNATURE_VALUE
+        blocks = []
+        this_block = []
+        radix = 1
+        for i in reversed(range(len(self.ordered_monomer_types))):
+            digit_range = self.max_monomer_counts_in_polymer[i] + 1
+            if digit_range == 1:  # this monomer type never appears in a polymer
+                continue
+            if this_block and radix * digit_range > self.MAX_SIGNATURE_VALUE:
+                blocks.append(this_block)
+                this_block = []
+                radix = 1
+            this_block.insert(0, (i, radix))
+            radix *= digit_range
+        if this_block:
+            blocks.append(this_block)
+        blocks.reverse()
+        return blocks
+
+    def _block_signature(self, block: List[Tuple[int, int]], j: int) -> Any:
+        return sum(weight * self.polymer_composition_vars[i, j] for i, weight in block)
+
+    def _add_lexicographic_ordering(self) -> None:
+        # tiebreaker variables that enforce lexicographical ordering of polymers based upon the block signatures
+        # tiebreaker_vars[b,j] = (Is the signature of all blocks <= b the same in both polymers j and j+1?)
+        self.tiebreaker_vars = tiebreaker_vars = {}
+        for b in range(-1, len(self.sort_blocks)):
             for j in range(self.max_polymers - 1):
-                self.model.add_constraint(
-                    tiebreaker_vars[-1, j] == int(
-                        True))  # start out with "tied" condition and then test first entry
-            # general case
-            for i in range(len(self.ordered_monomer_types)):
-                for j in range(self.max_polymers - 1):
-                    x = self.polymer_composition_vars[i, j]
-                    y = self.polymer_composition_vars[i, j + 1]
-
-                    # case 1: ties only make sense if a tie was not already broken above
-                    self.model.add_implication(tiebreaker_vars[i, j], tiebreaker_vars[i - 1, j])
-
-                    # case 2: try to resolve a tie, but still tied
-                    self.model.add_equal_to_zero_implication(tiebreaker_vars[i, j], x - y)  # x == y
-
-                    # case 3: try to resolve a tie, and succeed
-                    self.model.add_greater_than_zero_implication(
-                        self.model.complement_var(tiebreaker_vars[i, j]),
-                        tiebreaker_vars[i - 1, j],
-                        x - y,  # enforce that the above conditions imply x > y
-                    )
+                tiebreaker_vars[b, j] = self.model.bool_var(f'tiebreaker_{b}_{j}')
 
-    def _apply_counting_constraints(self) -> None:
+        # boundary conditions
+        for j in range(self.max_polymers - 1):
+            self.model.add_constraint(
+                tiebreaker_vars[-1, j] == int(
+                    True))  # start out with "tied" condition and then test first entry
+        # general case
+        for b, block in enumerate(self.sort_blocks):
+            for j in range(self.max_polymers - 1):
+                x = self._block_signature(block, j)
+                y = self._block_signature(block, j + 1)
+
+                # case 1: ties only make sense if a tie was not already broken above
+                self.model.add_implication(tiebreaker_vars[b, j], tiebreaker_vars[b - 1, j])
+
+                # case 2: try to resolve a tie, but still tied
+                self.model.add_equal_to_zero_implication(tiebreaker_vars[b, j], x - y)  # x == y
+
+                # case 3: try to resolve a tie, and succeed
+                self.model.add_greater_than_zero_implication(
+                    self.model.complement_var(tiebreaker_vars[b, j]),
+                    tiebreaker_vars[b - 1, j],
+                    x - y,  # enforce that the above conditions imply x > y
+                )
+
+    def _add_signature_ordering(self) -> None:
+        # a single weighted signature per polymer, in non-increasing order; polymers with equal signatures may still
+        #  appear in either order, but no auxiliary variables are needed
+        signature_block = [(i, i + 1) for i in range(len(self.ordered_monomer_types))]
+        for j in range(self.max_polymers - 1):
+            self.model.add_constraint(
+                self._block_signature(signature_block, j) >= self._block_signature(signature_block, j + 1)
+            )
+
+    def _add_counting_expressions(self) -> None:
         total_number_of_monomers_used = sum(
             self.polymer_composition_vars[i, j]
                 for i in range(len(self.ordered_monomer_types))
                 for j in range(self.max_polymers)
-        )
-        self.number_of_polymers = sum(self.indicator_vars[j] for j in range(self.max_polymers))
+        ) + sum(self.residual_vars.values())
+        self.number_of_polymers = \
+            sum(self.indicator_vars[j] for j in range(self.max_polymers)) + self.residual_polymers_var
         self.number_of_merges = total_number_of_monomers_used - self.number_of_polymers
 
+    def _apply_counting_constraints(self) -> None:
+        self._add_counting_expressions()
+
         if self.user_constraints.max_polymers() != infinity:
             inferred_min_merges = self.total_number_of_monomers - self.user_constraints.max_polymers()
             self.model.add_constraint(self.number_of_merges >= inferred_min_merges)
@@ -177,7 +419,51 @@ class Formulation(AbstractFormulation):
             self.model.add_constraint(self.number_of_merges >= self.user_constraints.min_merges())
 
     def _apply_objective_function(self) -> None:
-        self.model.minimize(self.number_of_merges)
+        if self.with_residual:
+            # among solutions with the fewest merges, prefer those which leave the residual empty
+            residual_size = sum(self.residual_vars.values())
+            upper_bound_on_residual_size = self.upper_bound_on_total_monomers_in_complexes
+            self.model.minimize((upper_bound_on_residual_size + 1) * self.number_of_merges + residual_size)
+        else:
+            self.model.minimize(self.number_of_merges)
+
+    def _bounded_quantity(self) -> Any:
+        return self.number_of_merges
+
+    def _hint_columns(self, configuration: Configuration) -> List[Tuple[List[int], int]]:
+        """
+        returns the columns (composition and number of copies) that hold the configuration, sorted like the columns
+          of the model; each copy of a polymer is held in its own column
+        """
+        rows_of_monomer = {}
+        for i, monomer in enumerate(self.ordered_monomer_types):
+            rows_of_monomer.setdefault(monomer, []).append(i)
+        remaining_counts = list(self.monomer_counts)
+
+        columns = []
+        for polymer, multiplicity in configuration.items():
+            if multiplicity == infinity or \
+                    not any(monomer in self.limiting_monomer_types for monomer, _ in polymer.items()):
+                continue  # singletons of non-limiting monomers are not held in columns
+            for _ in range(multiplicity):
+                composition = [0] * len(self.ordered_monomer_types)
+                for monomer, count in polymer.items():
+                    for i in rows_of_monomer.get(monomer, []):  # labelled formulations have one row per monomer
+                        taken = min(count, remaining_counts[i])
+                        composition[i] += taken
+                        remaining_counts[i] -= taken
+                        count -= taken
+                columns.append((composition, 1))
+        columns.sort(reverse=True)
+        return columns
+
+    def _apply_hint(self) -> None:
+        columns = self._hint_columns(self.hint)
+        for j in range(self.max_polymers):
+            composition = columns[j][0] if j < len(columns) else [0] * len(self.ordered_monomer_types)
+            self.model.add_hint(self.indicator_vars[j], int(j < len(columns)))
+            for i, count in enumerate(composition):
+                self.model.add_hint(self.polymer_composition_vars[i, j], count)
 
     def _variables_to_keep(self) -> List[Any]:
         """
@@ -0,0 +1,165 @@
+from typing import List, Dict, Any
+from math import inf as infinity
+
+from source.formulations.abstract import Formulation as AbstractFormulation
+from source.bounds import Bounds
+from source.polymer_library import PolymerLibrary
+from source.polymer import Polymer
+from source.configuration import Configuration
+
+
+class Formulation(AbstractFormulation):
+    """
+    Enumerates the candidate saturated polymer types once (see PolymerLibrary), then partitions the monomers among
+      them, with one integer multiplicity variable per polymer type.  Monomers that are not covered are singletons.
+    """
+    def _populate_model(self) -> None:
+        """
+        populates self.model with the variables and constraints needed to solve a formulation
+        """
+        self._construct_lists_and_calculate_constants()
+        self._run_asserts()
+        self._add_variables()
+        self._add_constraints()
+        self._apply_counting_constraints()
+        if self.user_constraints.optimize():
+            self._apply_objective_function()
+
+    def _construct_lists_and_calculate_constants(self) -> None:
+        self.ordered_monomer_types = list(self.tbn.monomer_types())
+        self.monomer_counts = [self.tbn.count(monomer) for monomer in self.ordered_monomer_types]
+        self.total_number_of_monomers = sum(self.monomer_counts)
+        self.limiting_domain_types = list(self.tbn.limiting_domain_types())
+        self.limiting_monomer_types = list(self.tbn.limiting_monomer_types())
+        # upper bound on how many total monomers can be in non-singleton polymers
+        self.upper_bound_on_total_monomers_in_complexes = min(
+            sum(
+                self.tbn.count(monomer_type) * (1 + abs(monomer_type.net_count(domain_type)))
+                for monomer_type in self.limiting_monomer_types
+                for domain_type in self.limiting_domain_types
+            ),
+            self.total_number_of_monomers
+        )
+        bounds = Bounds(
+            self.tbn,
+            self.limiting_monomer_types,
+            upper_bound_on_monomers_in_polymer=self.upper_bound_on_total_monomers_in_complexes,
+            tighten=self._optimizing_without_lower_bounds(),
+        )
+        self.library = PolymerLibrary.for_tbn(
+            self.tbn,
+            bounds,
+            irreducible=self._optimizing_without_lower_bounds(),
+            library_directory=self.user_constraints.library_directory(),
+        )
+        self.library_matrix = self.library.matrix()
+
+        self.model.set_big_m(self.upper_bound_on_total_monomers_in_complexes)
+
+    def _optimizing_without_lower_bounds(self) -> bool:
+        # only then is it safe to assume that splitting off a monomer, or splitting a polymer, never hurts
+        return self.user_constraints.optimize() and \
+            self.user_constraints.min_merges() == 0 and \
+            self.user_constraints.max_polymers() == infinity
+
+    def _add_variables(self) -> None:
+        # multiplicity_vars[p] = number of copies of polymer type p of the library
+        self.multiplicity_vars = {}
+        for p in range(self.library.number_of_polymers()):
+            max_multiplicity = min(
+                [self.upper_bound_on_total_monomers_in_complexes] + [
+                    self.monomer_counts[i] // int(self.library_matrix[i, p])
+                    for i in range(len(self.ordered_monomer_types))
+                    if self.library_matrix[i, p] > 0 and self.monomer_counts[i] < infinity
+                ]
+            )
+            self.multiplicity_vars[p] = self.model.int_var(0, int(max_multiplicity), f'multiplicity_{p}')
+
+    def _add_constraints(self) -> None:
+        # monomer conservation; must use all limiting monomers, and cannot exceed the count of other monomers
+        for i, monomer in enumerate(self.ordered_monomer_types):
+            number_of_monomers_used = sum(
+                int(self.library_matrix[i, p]) * self.multiplicity_vars[p]
+                for p in range(self.library.number_of_polymers())
+                if self.library_matrix[i, p] > 0
+            )
+            if monomer in self.limiting_monomer_types:
+                self.model.add_constraint(number_of_monomers_used == self.monomer_counts[i])
+            elif self.monomer_counts[i] < infinity:
+                self.model.add_constraint(number_of_monomers_used <= self.monomer_counts[i])
+
+    def _apply_counting_constraints(self) -> None:
+        polymer_sizes = self.library_matrix.sum(axis=0)
+        self.number_of_merges = sum(
+            int(polymer_sizes[p] - 1) * self.multiplicity_vars[p]
+            for p in range(self.library.number_of_polymers())
+        )
+
+        if self.user_constraints.max_polymers() != infinity:
+            inferred_min_merges = self.total_number_of_monomers - self.user_constraints.max_polymers()
+            self.model.add_constraint(self.number_of_merges >= inferred_min_merges)
+        if self.user_constraints.min_polymers() > 0:
+            inferred_max_merges = self.total_number_of_monomers - self.user_constraints.min_polymers()
+            self.model.add_constraint(self.number_of_merges <= inferred_max_merges)
+
+        if self.user_constraints.max_merges() != infinity:
+            self.model.add_constraint(self.number_of_merges <= self.user_constraints.max_merges())
+        if self.user_constraints.min_merges() > 0:
+            self.model.add_constraint(self.number_of_merges >= self.user_constraints.min_merges())
+
+    def _apply_objective_function(self) -> None:
+        self.model.minimize(self.number_of_merges)
+
+    def _bounded_quantity(self) -> Any:
+        return self.number_of_merges
+
+    def add_hint(self, configuration: Configuration) -> None:
+        self.model.clear_hints()
+        library_columns = {tuple(column): p for p, column in enumerate(self.library_matrix.T.tolist())}
+        multiplicities = {}
+        for polymer, multiplicity in configuration.items():
+            polymer_counts = dict(polymer.items())
+            column = tuple(polymer_counts.get(monomer, 0) for monomer in self.ordered_monomer_types)
+            if column in library_columns:  # e.g. singletons are not in the library
+                multiplicities[library_columns[column]] = multiplicity
+        for p, multiplicity_var in self.multiplicity_vars.items():
+            self.model.add_hint(multiplicity_var, multiplicities.get(p, 0))
+
+    def _variables_to_keep(self) -> List[Any]:
+        return list(self.multiplicity_vars.values())
+
+    def _interpret_solution(self, variable_to_value_dictionary: Dict[Any, int]) -> Configuration:
+        """
+        uses the provided dictionary to convert solution variables into solution values and from this,
+          converts the solutions values into the corresponding configuration
+        """
+        this_configuration_dict = {}
+        for p, multiplicity_var in self.multiplicity_vars.items():
+            multiplicity = variable_to_value_dictionary[multiplicity_var]
+            if multiplicity > 0:
+                this_polymer = self.library.polymer(p)
+                this_configuration_dict[this_polymer] = multiplicity + this_configuration_dict.get(this_polymer, 0)
+
+        partial_configuration = Configuration(this_configuration_dict)
+
+        difference_tbn = self.tbn - partial_configuration.flatten()
+
+        for monomer_type in difference_tbn.monomer_types():
+            singleton_polymer = Polymer({monomer_type: 1})
+            this_configuration_dict[singleton_polymer] = \
+                difference_tbn.count(monomer_type) + this_configuration_dict.get(singleton_polymer, 0)
+
+        return Configuration(this_configuration_dict)
+
+    def _run_asserts(self) -> None:
+        if self.user_constraints.max_energy() != infinity:
+            raise NotImplementedError(
+                f"Not implemented to use this formulation with max energy: {self.user_constraints.max_energy()}"
+            )
+        if self.user_constraints.min_energy() != -infinity:
+            raise NotImplementedError(
+                f"Not implemented to use this formulation with min energy: {self.user_constraints.min_energy()}"
+            )
+        if self.user_constraints.max_polymers() != infinity:
+            if self.total_number_of_monomers == infinity:
+                raise AssertionError("Tbn has infinitely many monomers but only a finite max_polymers was specified")
@@ -1,3 +1,4 @@
+from typing import Any
 from math import inf as infinity
 from math import ceil, floor
 
@@ -5,6 +6,12 @@ from source.formulations.polymer_unbounded_matrix import Formulation as Unbounde
 
 
 class Formulation(UnboundedFormulation):
+    ENERGY_SCALING_FACTOR = 100
+
+    def _iterative(self) -> bool:
+        # the residual relaxation does not account for bond deficits, so it cannot bound the energy
+        return False
+
     def _add_variables(self) -> None:
         super()._add_variables()
 
@@ -70,7 +77,7 @@ class Formulation(UnboundedFormulation):
             for domain in self.limiting_domain_types
             for j in range(self.max_polymers)
         )
-        scaling_factor = 100
+        scaling_factor = self.ENERGY_SCALING_FACTOR
         self.scaled_energy = (
                 round(scaling_factor * self.user_constraints.bond_weight()) * self.total_bond_deficit
                 + scaling_factor * self.number_of_merges
@@ -83,6 +90,9 @@ class Formulation(UnboundedFormulation):
     def _apply_objective_function(self) -> None:
         self.model.minimize(self.scaled_energy)
 
+    def _bounded_quantity(self) -> Any:
+        return (1 / self.ENERGY_SCALING_FACTOR) * self.scaled_energy
+
     def _run_asserts(self) -> None:
         if self.user_constraints.bond_weight() is None or self.user_constraints.bond_weight() <= 0.0:
             raise AssertionError("For low-W formulation, must supply positive bond weighting factor.")
@@ -0,0 +1,201 @@
+from typing import List, Dict
+from math import inf as infinity
+import random
+import time
+
+import numpy as np
+
+from source.tbn import Tbn
+from source.constraints import Constraints
+from source.polymer import Polymer
+from source.configuration import Configuration
+
+
+class Heuristic:
+    """
+    Greedy construction and local search for a configuration with many polymers; there is no guarantee that the
+      configuration is stable, but it is always saturated and is found quickly even for very large tbns.
+
+    The greedy construction starts one polymer per copy of a limiting monomer (hardest to saturate first) and adds
+      the monomer type which removes the most unbound limiting sites until the polymer is saturated.  Any polymer
+      which cannot be saturated from the remaining monomers is merged into the polymers with the most spare binding
+      sites.  The local search then repeatedly takes a few polymers, pools their monomers, and rebuilds them greedily
+      (with random tie-breaking), keeping the result whenever it has at least as many polymers.  Monomers that a
+      polymer does not need are split off as singletons after every move.
+    """
+    DEFAULT_TIME_LIMIT = 1.0
+    # the local search also stops after this many consecutive moves without an improvement; with an infinite time
+    #  limit, this is the only stopping rule, and the result depends only on the seed
+    MAX_MOVES_WITHOUT_IMPROVEMENT = 1000
+
+    def __init__(
+            self,
+            tbn: Tbn,
+            user_constraints: Constraints = Constraints(),
+            time_limit: float = DEFAULT_TIME_LIMIT,
+            seed: int = 0,
+    ):
+        self.__run_asserts(tbn, user_constraints)
+        self.__tbn = tbn
+        self.__time_limit = time_limit
+        self.__random = random.Random(seed)
+
+        self.__monomer_types = list(tbn.monomer_types())
+        limiting_domain_types = list(tbn.limiting_domain_types())
+        limiting_monomer_types = set(tbn.limiting_monomer_types())
+        self.__net_counts = np.array([
+            [monomer.net_count(domain) for domain in limiting_domain_types]
+            for monomer in self.__monomer_types
+        ], np.int64).reshape(len(self.__monomer_types), len(limiting_domain_types))
+        self.__is_limiting = np.array([monomer in limiting_monomer_types for monomer in self.__monomer_types], bool)
+        # how hard it is to saturate a copy of each monomer type on its own
+        self.__difficulty = np.maximum(self.__net_counts, 0).sum(axis=1)
+
+    @staticmethod
+    def __run_asserts(tbn: Tbn, user_constraints: Constraints) -> None:
+        if not user_constraints.optimize() or \
+                user_constraints.min_merges() > 0 or user_constraints.max_merges() != infinity or \
+                user_constraints.min_polymers() > 0 or user_constraints.max_polymers() != infinity or \
+                user_constraints.min_energy() != -infinity or user_constraints.max_energy() != infinity:
+            raise NotImplementedError("The heuristic only maximizes the number of polymers, without other constraints")
+        if any(tbn.count(monomer) == infinity for monomer in tbn.limiting_monomer_types()):
+            raise NotImplementedError("The heuristic requires finitely many limiting monomers")
+
+    def configuration(self) -> Configuration:
+        deadline = time.perf_counter() + self.__time_limit
+        counts = {t: self.__tbn.count(monomer) for t, monomer in enumerate(self.__monomer_types)}
+        polymers = self.__greedy(counts)
+        for polymer in polymers:
+            self.__prune(polymer)
+        polymers = [polymer for polymer in polymers if polymer]
+
+        moves_without_improvement = 0
+        while time.perf_counter() < deadline and \
+                moves_without_improvement < self.MAX_MOVES_WITHOUT_IMPROVEMENT and polymers:
+            polymers, improved = self.__regroup(polymers)
+            moves_without_improvement = 0 if improved else moves_without_improvement + 1
+
+        return self.__as_configuration(polymers)
+
+    def __net_count(self, polymer: Dict[int, int]) -> np.ndarray:
+        net_count = np.zeros(self.__net_counts.shape[1], np.int64)
+        for t, count in polymer.items():
+            net_count += count * self.__net_counts[t]
+        return net_count
+
+    def __greedy(self, counts: Dict[int, float]) -> List[Dict[int, int]]:
+        """
+        builds saturated polymers which together contain every limiting monomer of counts (and some of the others)
+        """
+        available = dict(counts)
+        starting_types = [t for t in available if self.__is_limiting[t]]
+        self.__random.shuffle(starting_types)
+        starting_types.sort(key=lambda t: -self.__difficulty[t])
+
+        polymers = []
+        unsaturated_polymers = []
+        for s in starting_types:
+            while available.get(s, 0) > 0:
+                available[s] -= 1
+                polymer = {s: 1}
+                net_count = self.__net_counts[s].copy()
+                while np.any(net_count > 0):
+                    candidates = [t for t, count in available.items() if count > 0]
+                    if not candidates:
+                        break
+                    # unbound limiting sites that remain after adding one copy of each candidate, and the
+                    #  complementary sites that would be left over (and so are wasted in this polymer)
+                    next_net_counts = net_count + self.__net_counts[candidates]
+                    remaining_deficits = np.maximum(next_net_counts, 0).sum(axis=1)
+                    if remaining_deficits.min() >= np.maximum(net_count, 0).sum():
+                        break
+                    scores = [
+                        (deficit, surplus, self.__difficulty[t])
+                        for t, deficit, surplus in zip(
+                            candidates, remaining_deficits, np.maximum(-next_net_counts, 0).sum(axis=1)
+                        )
+                    ]
+                    best_score = min(scores)
+                    t = self.__random.choice([t for t, score in zip(candidates, scores) if score == best_score])
+                    available[t] -= 1
+                    polymer[t] = polymer.get(t, 0) + 1
+                    net_count += self.__net_counts[t]
+                if np.any(net_count > 0):
+                    unsaturated_polymers.append(polymer)
+                else:
+                    polymers.append(polymer)
+
+        if unsaturated_polymers:
+            # no available monomer could help these polymers, so together with the saturated polymers they contain
+            #  everything needed to saturate them
+            merged_polymer = {}
+            for polymer in unsaturated_polymers:
+                for t, count in polymer.items():
+                    merged_polymer[t] = merged_polymer.get(t, 0) + count
+            polymers = self.__merge_until_saturated(merged_polymer, polymers)
+        return polymers
+
+    def __merge_until_saturated(self, polymer: Dict[int, int], polymers: List[Dict[int, int]]) \
+            -> List[Dict[int, int]]:
+        # merges the polymer with the saturated polymers that leave the fewest unbound limiting sites, until saturated
+        remaining_polymers = list(polymers)
+        net_count = self.__net_count(polymer)
+        while np.any(net_count > 0) and remaining_polymers:
+            remaining_deficits = [
+                np.maximum(net_count + self.__net_count(other), 0).sum() for other in remaining_polymers
+            ]
+            other = remaining_polymers.pop(int(np.argmin(remaining_deficits)))
+            for t, count in other.items():
+                polymer[t] = polymer.get(t, 0) + count
+            net_count = self.__net_count(polymer)
+        return remaining_polymers + [polymer]
+
+    def __prune(self, polymer: Dict[int, int]) -> None:
+        # splits off the non-limiting monomers which the polymer does not need
+        net_count = self.__net_count(polymer)
+        for t in sorted(polymer, key=lambda t: self.__difficulty[t]):
+            if self.__is_limiting[t]:
+                continue
+            while polymer[t] > 0 and not np.any(net_count - self.__net_counts[t] > 0):
+                polymer[t] -= 1
+                net_count -= self.__net_counts[t]
+            if polymer[t] == 0:
+                del polymer[t]
+
+    def __regroup(self, polymers: List[Dict[int, int]]):
+        number_of_polymers_to_pool = min(len(polymers), self.__random.choice([1, 2, 2, 3]))
+        pooled_indices = self.__random.sample(range(len(polymers)), number_of_polymers_to_pool)
+        pool = {}
+        for p in pooled_indices:
+            for t, count in polymers[p].items():
+                pool[t] = pool.get(t, 0) + count
+        pooled_size = sum(pool.values())
+
+        new_polymers = self.__greedy(pool)
+        for polymer in new_polymers:
+            self.__prune(polymer)
+        new_polymers = [polymer for polymer in new_polymers if polymer]
+        # monomers of the pool that are not used by the new polymers become singletons
+        new_size = sum(sum(polymer.values()) for polymer in new_polymers)
+        old_score = len(pooled_indices) - pooled_size
+        new_score = len(new_polymers) - new_size
+        if new_score < old_score:
+            return polymers, False
+
+        kept_polymers = [polymer for p, polymer in enumerate(polymers) if p not in pooled_indices]
+        return kept_polymers + new_polymers, new_score > old_score
+
+    def __as_configuration(self, polymers: List[Dict[int, int]]) -> Configuration:
+        configuration_dict = {}
+        for polymer in polymers:
+            this_polymer = Polymer({self.__monomer_types[t]: count for t, count in polymer.items()})
+            configuration_dict[this_polymer] = 1 + configuration_dict.get(this_polymer, 0)
+
+        partial_configuration = Configuration(configuration_dict)
+        difference_tbn = self.__tbn - partial_configuration.flatten()
+        for monomer_type in difference_tbn.monomer_types():
+            singleton_polymer = Polymer({monomer_type: 1})
+            configuration_dict[singleton_polymer] = \
+                difference_tbn.count(monomer_type) + configuration_dict.get(singleton_polymer, 0)
+
+        return Configuration(configuration_dict)
@@ -1,8 +1,11 @@
-from typing import Iterator, Optional
+from typing import Iterator, Optional, Tuple
 from source.solver import Solver, SolverMethod, SolverFormulation
 from source.configuration import Configuration
 from source.tbn import Tbn
 from source.constraints import Constraints
+from source.relaxation_bound import RelaxationBound
+from source.metrics import Metrics, measure
+from source import tbn_binary
 
 
 def get_stable_configs(
@@ -11,11 +14,28 @@ def get_stable_configs(
         solver_method: SolverMethod = SolverMethod.CONSTRAINT_PROGRAMMING,
         formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
         bond_weighting_factor: Optional[float] = None,
+        library_directory: Optional[str] = None,
+        solution_directory: Optional[str] = None,
+        checkpoint_filename: Optional[str] = None,
+        processes: int = 1,
+        streaming: bool = False,
         verbose: bool = False,
+        metrics: Optional[Metrics] = None,
+        parsed_input: Optional[Tuple[Tbn, Constraints]] = None,
 ) -> Iterator[Configuration]:
-    tbn = get_tbn_from_filename(tbn_filename)
-    user_constraints = get_constraints_from_filename(constraints_filename)
-    solver = Solver(method=solver_method)
+    # with streaming, the configurations are yielded as the search finds them (see Solver); parsed_input is the tbn
+    #  and user constraints to use instead of reading the files, if the caller has already read them (see get_input)
+    if parsed_input is None:
+        parsed_input = get_input(tbn_filename, constraints_filename, library_directory, metrics)
+    tbn, user_constraints = parsed_input
+    solver = Solver(
+        method=solver_method,
+        solution_directory=solution_directory,
+        checkpoint_filename=checkpoint_filename,
+        processes=processes,
+        streaming=streaming,
+        metrics=metrics,
+    )
     stable_configurations = solver.stable_configs(
         tbn,
         user_constraints=user_constraints,
@@ -33,33 +53,105 @@ def get_stable_config(
         solver_method: SolverMethod = SolverMethod.CONSTRAINT_PROGRAMMING,
         formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
         bond_weighting_factor: Optional[float] = None,
+        heuristic_hint: bool = False,
+        library_directory: Optional[str] = None,
         verbose: bool = False,
+        metrics: Optional[Metrics] = None,
+        parsed_input: Optional[Tuple[Tbn, Constraints]] = None,
 ) -> Configuration:
-    tbn = get_tbn_from_filename(tbn_filename)
-    user_constraints = get_constraints_from_filename(constraints_filename)
-    solver = Solver(method=solver_method)
+    # parsed_input is used instead of reading the files if given (see get_stable_configs)
+    if parsed_input is None:
+        parsed_input = get_input(tbn_filename, constraints_filename, library_directory, metrics)
+    tbn, user_constraints = parsed_input
+    hint = None
+    if heuristic_hint:
+        with measure(metrics, "heuristic"):
+            hint = get_heuristic_config(tbn, user_constraints)
+    solver = Solver(method=solver_method, metrics=metrics)
     stable_configuration = solver.stable_config(
         tbn,
         user_constraints=user_constraints,
         formulation=formulation,
         bond_weighting_factor=bond_weighting_factor,
+        hint=hint,
         verbose=verbose,
     )
 
     return stable_configuration
 
 
+def get_bound(
+        tbn_filename: str,
+        constraints_filename: Optional[str] = None,
+        formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+        bond_weighting_factor: Optional[float] = None,
+        library_directory: Optional[str] = None,
+        verbose: bool = False,
+        metrics: Optional[Metrics] = None,
+        parsed_input: Optional[Tuple[Tbn, Constraints]] = None,
+) -> RelaxationBound:
+    # parsed_input is used instead of reading the files if given (see get_stable_configs)
+    if parsed_input is None:
+        parsed_input = get_input(tbn_filename, constraints_filename, library_directory, metrics)
+    tbn, user_constraints = parsed_input
+    with measure(metrics, "heuristic"):
+        incumbent = get_heuristic_config(tbn, user_constraints)
+    solver = Solver(metrics=metrics)
+    bound = solver.bound(
+        tbn,
+        user_constraints=user_constraints,
+        formulation=formulation,
+        bond_weighting_factor=bond_weighting_factor,
+        incumbent=incumbent,
+        verbose=verbose,
+    )
+
+    return bound
+
+
+def get_input(
+        tbn_filename: str,
+        constraints_filename: Optional[str] = None,
+        library_directory: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+) -> Tuple[Tbn, Constraints]:
+    # reads the tbn and the user constraints, e.g. to pass them to both a query and an output writer
+    with measure(metrics, "parse"):
+        tbn = get_tbn_from_filename(tbn_filename)
+        user_constraints = get_constraints_from_filename(constraints_filename, library_directory)
+    return tbn, user_constraints
+
+
+def get_heuristic_config(tbn: Tbn, user_constraints: Constraints) -> Optional[Configuration]:
+    # returns None if the heuristic does not apply (e.g. because of the user constraints)
+    try:
+        return Solver(method=SolverMethod.HEURISTIC).stable_config(tbn, user_constraints=user_constraints)
+    except NotImplementedError:
+        return None
+
+
 def get_tbn_from_filename(tbn_filename) -> Tbn:
+    # reads either a text file or a binary file compiled by compile_tbn (which is detected automatically)
+    if tbn_binary.is_tbn_binary(tbn_filename):
+        return tbn_binary.read_tbn_binary(tbn_filename)
     with open(tbn_filename) as tbnFile:
-        tbn_as_string = tbnFile.read()
+        return Tbn.from_lines(tbnFile)
+
 
-    return Tbn.from_string(tbn_as_string)
+def compile_tbn(tbn_filename: str, binary_filename: str) -> Tbn:
+    tbn = get_tbn_from_filename(tbn_filename)
+    tbn_binary.write_tbn_binary(tbn, binary_filename)
+    return tbn
 
 
-def get_constraints_from_filename(constraints_filename) -> Constraints:
+def get_constraints_from_filename(constraints_filename, library_directory: Optional[str] = None) -> Constraints:
+    # library_directory is where polymer libraries are saved between runs (see Constraints.with_library_directory)
     if constraints_filename:
         with open(constraints_filename) as constraintsFile:
             constraints_as_string = constraintsFile.read()
-        return Constraints.from_string(constraints_as_string)
+        user_constraints = Constraints.from_string(constraints_as_string)
     else:
-        return Constraints()
+        user_constraints = Constraints()
+    if library_directory is not None:
+        user_constraints = user_constraints.with_library_directory(library_directory)
+    return user_constraints
@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import threading
+import time
+
+
+class Metrics:
+    """
+    Records where the time of a query goes, for a Metrics object passed to lib, Solver or a solver adapter: the wall
+      and CPU time of each phase (see PHASES), the size of each model that is built, and the statistics of each
+      search as reported by the solver (e.g. branches, conflicts and presolve time for CP-SAT, iterations and nodes
+      for integer programming).  Phases that are entered repeatedly (e.g. interpret_solution for every solution of an
+      enumeration) are summed.
+
+    CPU time is that of this process, so it includes background threads (e.g. the search of a streaming enumeration)
+      but not the worker processes of a parallel enumeration; their searches are still recorded.
+    """
+    PHASES = ["parse", "presolve", "heuristic", "populate_model", "solve", "interpret_solution"]
+
+    def __init__(self):
+        self.__phases: Dict[str, Dict[str, float]] = {}
+        self.__models: List[Dict[str, int]] = []
+        self.__searches: List[Dict[str, Any]] = []
+        self.__lock = threading.Lock()  # searches may be recorded by a background thread
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        wall_tic, cpu_tic = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall_tic, time.process_time() - cpu_tic)
+
+    def add_time(self, name: str, wall_time: float, cpu_time: float) -> None:
+        with self.__lock:
+            phase = self.__phases.setdefault(name, {"wall_time": 0.0, "cpu_time": 0.0})
+            phase["wall_time"] += wall_time
+            phase["cpu_time"] += cpu_time
+
+    def record_model(self, number_of_variables: int, number_of_constraints: int, number_of_nonzeros: int) -> None:
+        # nonzeros are the occurrences of variables in the constraints
+        with self.__lock:
+            self.__models.append({
+                "variables": number_of_variables,
+                "constraints": number_of_constraints,
+                "nonzeros": number_of_nonzeros,
+            })
+
+    def record_search(self, statistics: Dict[str, Any]) -> None:
+        with self.__lock:
+            self.__searches.append(dict(statistics))
+
+    def models(self) -> List[Dict[str, int]]:
+        with self.__lock:
+            return [dict(model) for model in self.__models]
+
+    def searches(self) -> List[Dict[str, Any]]:
+        with self.__lock:
+            return [dict(search) for search in self.__searches]
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self.__lock:
+            ordered_names = [name for name in self.PHASES if name in self.__phases] + \
+                sorted(name for name in self.__phases if name not in self.PHASES)
+            return {
+                "phases": {name: dict(self.__phases[name]) for name in ordered_names},
+                "models": [dict(model) for model in self.__models],
+                "searches": [dict(search) for search in self.__searches],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+
+@contextmanager
+def measure(metrics: Optional[Metrics], name: str) -> Iterator[None]:
+    # times the phase if metrics are being recorded
+    if metrics is None:
+        yield
+    else:
+        with metrics.phase(name):
+            yield
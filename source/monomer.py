@@ -1,5 +1,5 @@
 import re
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 from source.domain import Domain
 from source.positive_multiset import PositiveMultiset
 
@@ -10,6 +10,14 @@ class Monomer:
 
     __known_monomers = {}  # used to catalogue monomers; used to makes sure that all monomer names are unique
 
+    __domain_list_regex = f"{multiple_domain_regex}(?: {multiple_domain_regex})*"
+    __name_search_pattern = re.compile(f"^({__domain_list_regex})\\s*(|>{name_regex})$")
+    # fast path for the common format, in which every domain is a plain token (without a quantity or assigned name)
+    __plain_name_search_pattern = re.compile(
+        f"^((?:{Domain.name_regex}\\*?)(?: {Domain.name_regex}\\*?)*)\\s*(|>{name_regex})$"
+    )
+    __quantity_search_pattern = re.compile(f"^([1-9]\\d*)\\(\\s*({Domain.regex()})\\s*\\)$")
+
     def __init__(self, domain_counts: Dict[Domain, int], name: str):
         if not domain_counts:
             raise AssertionError("attempted to create an empty monomer")
@@ -57,17 +65,38 @@ class Monomer:
         return hash(str(self))
 
     @classmethod
-    def from_string(cls, monomer_as_string: str, name: str = None) -> "Monomer":
+    def from_string(
+            cls,
+            monomer_as_string: str,
+            name: str = None,
+            interned_monomers: Optional[Dict[Any, "Monomer"]] = None,
+            interned_domains: Optional[Dict[str, Domain]] = None,
+    ) -> "Monomer":
+        # if interned_monomers is given (e.g. by Tbn.from_lines, for the length of one parse), repeated strings return
+        #  the monomer that was already parsed from it, and new monomers are added to it (see Domain.from_string)
+        if interned_monomers is None:
+            return cls.__parse(monomer_as_string, name, interned_domains)
+        monomer = interned_monomers.get((cls, monomer_as_string, name))
+        if monomer is None:
+            monomer = cls.__parse(monomer_as_string, name, interned_domains)
+            interned_monomers[cls, monomer_as_string, name] = monomer
+        return monomer
+
+    @classmethod
+    def __parse(
+            cls, monomer_as_string: str, name: str = None, interned_domains: Optional[Dict[str, Domain]] = None
+    ) -> "Monomer":
         # name extraction first
-        domain_list_regex = f"{cls.multiple_domain_regex}(?: {cls.multiple_domain_regex})*"
-        
-        name_search_pattern = f"^({domain_list_regex})\\s*(|>{cls.name_regex})$"
-        name_search_result = re.match(name_search_pattern, monomer_as_string)
+        plain_name_search_result = cls.__plain_name_search_pattern.match(monomer_as_string)
+        if plain_name_search_result:
+            name_search_result = plain_name_search_result
+        else:
+            name_search_result = cls.__name_search_pattern.match(monomer_as_string)
         if not name_search_result:
             raise AssertionError(f"could not parse monomer from string '{monomer_as_string}'")
 
         composition_string, raw_name_string = name_search_result.groups()
-        
+
         if raw_name_string:
             if name:
                 raise AssertionError(
@@ -78,12 +107,14 @@ class Monomer:
 
         # now parse the composition of the monomer
         domain_counts = {}
-        domain_strings_as_list = composition_string.split()
-        for domain_string_with_optional_quantity in domain_strings_as_list:
-            quantity_search_result = re.match(
-                f"^([1-9]\\d*)\\(\\s*({Domain.regex()})\\s*\\)$",
-                domain_string_with_optional_quantity
-            )
+        if plain_name_search_result:
+            for domain_string in composition_string.split(" "):
+                domain = Domain.from_string(domain_string, interned_domains)
+                domain_counts[domain] = domain_counts.get(domain, 0) + 1
+            return cls(domain_counts, name)
+
+        for domain_string_with_optional_quantity in composition_string.split():
+            quantity_search_result = cls.__quantity_search_pattern.match(domain_string_with_optional_quantity)
             if quantity_search_result:
                 count = int(quantity_search_result.groups()[0])
                 domain_string = quantity_search_result.groups()[1]
@@ -91,11 +122,7 @@ class Monomer:
                 count = 1
                 domain_string = domain_string_with_optional_quantity
 
-            domain_search_result = re.match(f"^({Domain.regex()})$", domain_string)
-            if not domain_search_result:
-                raise AssertionError(f"Could not parse domain name from {domain_search_result}")
-
-            domain = Domain(domain_search_result.groups()[0])
+            domain = Domain.from_string(domain_string, interned_domains)
             domain_counts[domain] = domain_counts.get(domain, 0) + count
 
         return cls(domain_counts, name)
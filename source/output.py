@@ -0,0 +1,259 @@
+"""
+Writers for the configurations found by the solver, for tools that process many configurations.  Apart from the
+  text format of the command line, each configuration is written as the polymer types it contains, where each polymer
+  type is a sparse count vector over the monomer ids (the positions of the monomer types in tbn.monomer_types()),
+  together with its multiplicity, and the number of polymers, merges and the energy of the configuration.
+
+The configurations are written as they are found: one line per configuration for NDJSON, and one record batch per
+  BATCH_SIZE configurations for Arrow and Parquet (which need the optional pyarrow package).  The NumPy format keeps
+  compact arrays in memory and saves them when the writer is closed; it is used instead of Arrow and Parquet when
+  pyarrow is not installed.  Infinite counts are written as INFINITE_COUNT.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, TextIO, Union
+from math import inf as infinity
+from math import nan as not_a_number
+import json
+import sys
+import warnings
+
+from source.tbn import Tbn
+from source.configuration import Configuration
+
+OUTPUT_FORMATS = ["text", "ndjson", "npz", "arrow", "parquet"]
+# formats which are written to a file rather than to a stream
+BINARY_OUTPUT_FORMATS = ["npz", "arrow", "parquet"]
+INFINITE_COUNT = -1
+
+
+class ConfigurationWriter(ABC):
+    def __init__(self, tbn: Tbn, bond_weight: float):
+        self._monomer_types = list(tbn.monomer_types())
+        self._monomer_ids = {monomer: i for i, monomer in enumerate(self._monomer_types)}
+        self._bond_weight = bond_weight
+        self._number_of_configurations = 0
+
+    def __enter__(self) -> "ConfigurationWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write(self, configuration: Configuration) -> None:
+        self._write(configuration)
+        self._number_of_configurations += 1
+
+    def write_all(self, configurations) -> int:
+        # returns the number of configurations written
+        for configuration in configurations:
+            self.write(configuration)
+        return self._number_of_configurations
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def _write(self, configuration: Configuration) -> None:
+        pass
+
+    def _record(self, configuration: Configuration) -> Dict[str, Any]:
+        # the configuration as plain lists of numbers, with the polymer types in sorted order
+        multiplicities = []
+        monomer_ids = []
+        monomer_counts = []
+        for polymer, multiplicity in sorted(configuration.items()):
+            multiplicities.append(_as_count(multiplicity))
+            this_monomer_ids = []
+            this_monomer_counts = []
+            for monomer, count in sorted(polymer.items(), key=lambda item: self._monomer_ids[item[0]]):
+                this_monomer_ids.append(self._monomer_ids[monomer])
+                this_monomer_counts.append(int(count))
+            monomer_ids.append(this_monomer_ids)
+            monomer_counts.append(this_monomer_counts)
+        energy = configuration.energy(self._bond_weight)
+        return {
+            "index": self._number_of_configurations,
+            "polymers": _as_count(configuration.number_of_polymers()),
+            "merges": _as_count(configuration.number_of_merges()),
+            "energy": None if energy != energy or abs(energy) == infinity else energy,  # NaN is not valid JSON
+            "multiplicities": multiplicities,
+            "monomer_ids": monomer_ids,
+            "monomer_counts": monomer_counts,
+        }
+
+    def _monomer_type_strings(self) -> List[str]:
+        return [str(monomer) for monomer in self._monomer_types]
+
+
+class TextWriter(ConfigurationWriter):
+    """
+    the format of the command line: every configuration, numbered, or only the configuration if single is True
+    """
+    def __init__(
+            self,
+            tbn: Tbn,
+            bond_weight: float,
+            stream: TextIO = sys.stdout,
+            full: bool = False,
+            single: bool = False,
+            close_stream: bool = False,
+    ):
+        super().__init__(tbn, bond_weight)
+        self.__stream = stream
+        self.__full = full
+        self.__single = single
+        self.__close_stream = close_stream
+
+    def _write(self, configuration: Configuration) -> None:
+        configuration_string = configuration.full_str() if self.__full else str(configuration)
+        if self.__single:
+            print(f"Configuration: {configuration_string}", file=self.__stream)
+        else:
+            print(f"Configuration {self._number_of_configurations + 1}:\n{configuration_string}", file=self.__stream)
+
+    def close(self) -> None:
+        self.__stream.flush()
+        if self.__close_stream:
+            self.__stream.close()
+
+
+class NdjsonWriter(ConfigurationWriter):
+    """
+    one JSON object per line, starting with a header line that lists the monomer types (in the order of their ids)
+    """
+    def __init__(self, tbn: Tbn, bond_weight: float, stream: TextIO = sys.stdout, close_stream: bool = False):
+        super().__init__(tbn, bond_weight)
+        self.__stream = stream
+        self.__close_stream = close_stream
+        self.__stream.write(json.dumps({"monomer_types": self._monomer_type_strings()}) + "\n")
+
+    def _write(self, configuration: Configuration) -> None:
+        self.__stream.write(json.dumps(self._record(configuration)) + "\n")
+
+    def close(self) -> None:
+        self.__stream.flush()
+        if self.__close_stream:
+            self.__stream.close()
+
+
+class NpzWriter(ConfigurationWriter):
+    """
+    saves the configurations as flat arrays (see numpy.savez_compressed) when closed: per configuration, its
+      polymers, merges, energy and the offset of its polymer types in polymer_indptr; per polymer type, its
+      multiplicity and the offset of its monomers in monomer_ids and monomer_counts
+    """
+    def __init__(self, tbn: Tbn, bond_weight: float, filename: str):
+        super().__init__(tbn, bond_weight)
+        self.__filename = filename
+        self.__columns: Dict[str, List[Union[int, float]]] = {
+            "polymers": [], "merges": [], "energy": [], "polymer_indptr": [0],
+            "multiplicities": [], "monomer_indptr": [0], "monomer_ids": [], "monomer_counts": [],
+        }
+
+    def _write(self, configuration: Configuration) -> None:
+        record = self._record(configuration)
+        columns = self.__columns
+        columns["polymers"].append(record["polymers"])
+        columns["merges"].append(record["merges"])
+        columns["energy"].append(record["energy"] if record["energy"] is not None else not_a_number)
+        columns["multiplicities"].extend(record["multiplicities"])
+        columns["polymer_indptr"].append(len(columns["multiplicities"]))
+        for monomer_ids, monomer_counts in zip(record["monomer_ids"], record["monomer_counts"]):
+            columns["monomer_ids"].extend(monomer_ids)
+            columns["monomer_counts"].extend(monomer_counts)
+            columns["monomer_indptr"].append(len(columns["monomer_ids"]))
+
+    def close(self) -> None:
+        import numpy as np  # imported here, so that the other formats do not load NumPy
+
+        arrays = {
+            column_name: np.array(column, np.float64 if column_name == "energy" else np.int64)
+            for column_name, column in self.__columns.items()
+        }
+        with open(self.__filename, "wb") as npz_file:  # a file object, so that numpy does not append ".npz"
+            np.savez_compressed(npz_file, monomer_types=np.array(self._monomer_type_strings()), **arrays)
+
+
+class ArrowWriter(ConfigurationWriter):
+    """
+    one row per configuration, in an Arrow IPC file or (if parquet is True) a Parquet file; the monomer types are in
+      the schema metadata
+    """
+    BATCH_SIZE = 10000
+
+    def __init__(self, tbn: Tbn, bond_weight: float, filename: str, parquet: bool = False):
+        import pyarrow  # optional dependency, see get_writer
+
+        super().__init__(tbn, bond_weight)
+        self.__pyarrow = pyarrow
+        self.__schema = pyarrow.schema(
+            [
+                ("index", pyarrow.int64()),
+                ("polymers", pyarrow.int64()),
+                ("merges", pyarrow.int64()),
+                ("energy", pyarrow.float64()),
+                ("multiplicities", pyarrow.list_(pyarrow.int64())),
+                ("monomer_ids", pyarrow.list_(pyarrow.list_(pyarrow.int32()))),
+                ("monomer_counts", pyarrow.list_(pyarrow.list_(pyarrow.int64()))),
+            ],
+            metadata={"monomer_types": json.dumps(self._monomer_type_strings())},
+        )
+        if parquet:
+            import pyarrow.parquet
+            self.__writer = pyarrow.parquet.ParquetWriter(filename, self.__schema)
+        else:
+            import pyarrow.ipc
+            self.__writer = pyarrow.ipc.new_file(filename, self.__schema)
+        self.__batch: List[Dict[str, Any]] = []
+
+    def _write(self, configuration: Configuration) -> None:
+        self.__batch.append(self._record(configuration))
+        if len(self.__batch) >= self.BATCH_SIZE:
+            self.__write_batch()
+
+    def __write_batch(self) -> None:
+        if self.__batch:
+            table = self.__pyarrow.Table.from_pylist(self.__batch, schema=self.__schema)
+            self.__writer.write_table(table)
+            self.__batch = []
+
+    def close(self) -> None:
+        self.__write_batch()
+        self.__writer.close()
+
+
+def get_writer(
+        output_format: str,
+        tbn: Tbn,
+        bond_weight: float,
+        filename: Optional[str] = None,
+        full: bool = False,
+        single: bool = False,
+) -> ConfigurationWriter:
+    """
+    returns a writer for one of OUTPUT_FORMATS; text and NDJSON are written to the file if one is given (and to
+      standard output otherwise), the other formats need a file
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise AssertionError(f"Did not recognize output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+    if output_format in BINARY_OUTPUT_FORMATS and filename is None:
+        raise AssertionError(f"Output format '{output_format}' needs an output file")
+
+    if output_format in ["arrow", "parquet"]:
+        try:
+            return ArrowWriter(tbn, bond_weight, filename, parquet=output_format == "parquet")
+        except ImportError:
+            warnings.warn(f"pyarrow is not installed, so {filename} is written in the NumPy format instead")
+            output_format = "npz"
+    if output_format == "npz":
+        return NpzWriter(tbn, bond_weight, filename)
+
+    stream = sys.stdout if filename is None else open(filename, "w")
+    if output_format == "ndjson":
+        return NdjsonWriter(tbn, bond_weight, stream, close_stream=filename is not None)
+    else:
+        return TextWriter(tbn, bond_weight, stream, full=full, single=single, close_stream=filename is not None)
+
+
+def _as_count(count: Union[int, float]) -> int:
+    return INFINITE_COUNT if count == infinity else int(count)
@@ -0,0 +1,263 @@
+from typing import List, Dict, Tuple, Union, Iterable, Optional
+from math import inf as infinity
+import hashlib
+import os
+import numpy as np
+
+from source.tbn import Tbn
+from source.monomer import Monomer
+from source.domain import Domain
+from source.bounds import Bounds
+from source.polymer import Polymer
+
+
+class PolymerLibrary:
+    """
+    A library of candidate polymer types, stored as a matrix with one row per monomer type and one column per polymer
+      type (the entries are the monomer counts).  The library of a tbn contains every saturated polymer which contains
+      a limiting monomer and whose composition fits into the bounds of a bounding presolve.
+
+    Libraries depend only on the monomer types, the limiting domain types and the bounds, so they are cached, and a
+      cached library is reused (and restricted) whenever a tbn with the same monomer types needs smaller bounds.  The
+      most recently used libraries are kept in memory; with a library directory, every library is also saved there,
+      so that it can be reused by later runs.
+    """
+    MAX_CACHED_LIBRARIES = 16
+    # (monomer types, limiting domain types, irreducible) -> library, from least to most recently used
+    __cache: Dict[Tuple[Tuple[str, ...], Tuple[str, ...], bool], "PolymerLibrary"] = {}
+
+    def __init__(
+            self,
+            monomer_types: List[Monomer],
+            limiting_monomer_types: Iterable[Monomer],
+            matrix: np.ndarray,
+            max_copies_in_polymer: List[Union[int, float]],
+            max_monomers_in_polymer: Union[int, float],
+    ):
+        self.__monomer_types = list(monomer_types)
+        limiting_monomer_types = set(limiting_monomer_types)
+        self.__is_limiting = np.array([monomer in limiting_monomer_types for monomer in self.__monomer_types], bool)
+        self.__matrix = matrix
+        self.__max_copies_in_polymer = list(max_copies_in_polymer)
+        self.__max_monomers_in_polymer = max_monomers_in_polymer
+
+    @classmethod
+    def for_tbn(
+            cls, tbn: Tbn, bounds: Bounds, irreducible: bool = False, library_directory: Optional[str] = None,
+    ) -> "PolymerLibrary":
+        """
+        returns the library of the tbn (only its irreducible polymers, if irreducible is True), from the cache or the
+          library directory if possible
+        """
+        monomer_types = list(tbn.monomer_types())
+        limiting_domain_types = list(tbn.limiting_domain_types())
+        max_copies_in_polymer = [bounds.max_copies_in_polymer(monomer) for monomer in monomer_types]
+        max_monomers_in_polymer = bounds.max_monomers_in_polymer()
+
+        key = (
+            tuple(str(monomer) for monomer in monomer_types),
+            tuple(str(domain) for domain in limiting_domain_types),
+            irreducible,
+        )
+        cached_library = cls.__cache.pop(key, None)
+        if cached_library is None and library_directory is not None:
+            filename = cls.__filename(library_directory, key)
+            if os.path.exists(filename):
+                cached_library = cls.load(filename, monomer_types)
+        if cached_library is not None:
+            cls.__remember(key, cached_library)
+            if cached_library.__covers(max_copies_in_polymer, max_monomers_in_polymer):
+                return cached_library.restricted_to(max_copies_in_polymer, max_monomers_in_polymer)
+
+        library = cls.enumerate(
+            monomer_types, limiting_domain_types, set(tbn.limiting_monomer_types()),
+            max_copies_in_polymer, max_monomers_in_polymer, only_necessary_monomers=irreducible,
+        )
+        if irreducible:
+            library = library.irreducible()
+        cls.__remember(key, library)
+        if library_directory is not None:
+            os.makedirs(library_directory, exist_ok=True)
+            library.save(cls.__filename(library_directory, key))
+        return library
+
+    @classmethod
+    def __remember(cls, key: Tuple[Tuple[str, ...], Tuple[str, ...], bool], library: "PolymerLibrary") -> None:
+        cls.__cache.pop(key, None)
+        cls.__cache[key] = library
+        while len(cls.__cache) > cls.MAX_CACHED_LIBRARIES:
+            del cls.__cache[next(iter(cls.__cache))]
+
+    @staticmethod
+    def __filename(library_directory: str, key: Tuple[Tuple[str, ...], Tuple[str, ...], bool]) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(library_directory, f"polymer_library_{digest}.npz")
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls.__cache.clear()
+
+    @classmethod
+    def number_of_cached_libraries(cls) -> int:
+        return len(cls.__cache)
+
+    @classmethod
+    def enumerate(
+            cls,
+            monomer_types: List[Monomer],
+            limiting_domain_types: List[Domain],
+            limiting_monomer_types: Iterable[Monomer],
+            max_copies_in_polymer: List[Union[int, float]],
+            max_monomers_in_polymer: Union[int, float],
+            only_necessary_monomers: bool = False,
+    ) -> "PolymerLibrary":
+        """
+        depth-first search over the monomer types (choosing a count for each in turn), pruning any partial polymer
+          which can no longer be saturated by the remaining monomer types, or which is too large
+
+        The limiting monomer types are searched first.  After that, the net counts can only decrease, so if
+          only_necessary_monomers is True, a partial polymer is pruned as soon as it contains a non-limiting monomer
+          that could be split off as a singleton without breaking saturation.
+        """
+        limiting_monomer_types = set(limiting_monomer_types)
+        if any(max_copies == infinity for max_copies in max_copies_in_polymer) or \
+                max_monomers_in_polymer == infinity:
+            raise AssertionError("Cannot enumerate a polymer library without finite bounds on the polymers")
+
+        search_order = \
+            [i for i, monomer in enumerate(monomer_types) if monomer in limiting_monomer_types] + \
+            [i for i, monomer in enumerate(monomer_types) if monomer not in limiting_monomer_types]
+        number_of_types = len(search_order)
+        net_counts = np.array([
+            [monomer_types[i].net_count(domain) for domain in limiting_domain_types]
+            for i in search_order
+        ], np.int64).reshape(number_of_types, len(limiting_domain_types))
+        max_copies = np.array([max_copies_in_polymer[i] for i in search_order], np.int64)
+        is_limiting = [monomer_types[i] in limiting_monomer_types for i in search_order]
+
+        # most_negative_remaining[t] = the least net count that the monomer types t, t+1, ... can add to a polymer
+        most_negative_remaining = np.zeros((number_of_types + 1, len(limiting_domain_types)), np.int64)
+        for t in reversed(range(number_of_types)):
+            most_negative_remaining[t] = \
+                most_negative_remaining[t + 1] + np.minimum(net_counts[t], 0) * max_copies[t]
+
+        polymers = []
+        composition = np.zeros(number_of_types, np.int64)
+
+        def search(t: int, net_count: np.ndarray, size: int, has_limiting_monomer: bool) -> None:
+            if np.any(net_count + most_negative_remaining[t] > 0):
+                return
+            if t == number_of_types:
+                if has_limiting_monomer:
+                    polymers.append(composition.copy())
+                return
+            for count in range(0, int(min(max_copies[t], max_monomers_in_polymer - size)) + 1):
+                next_net_count = net_count + count * net_counts[t]
+                if only_necessary_monomers and count > 0 and not is_limiting[t] and \
+                        not np.any((net_counts[t] < 0) & (next_net_count > net_counts[t])):
+                    break  # removing one copy keeps the polymer saturated, and more copies only make it worse
+                composition[t] = count
+                search(t + 1, next_net_count, size + count, has_limiting_monomer or (count > 0 and is_limiting[t]))
+            composition[t] = 0
+
+        search(0, np.zeros(len(limiting_domain_types), np.int64), 0, False)
+
+        matrix = np.zeros((number_of_types, len(polymers)), np.int64)
+        for p, polymer in enumerate(polymers):
+            matrix[search_order, p] = polymer
+        return cls(monomer_types, limiting_monomer_types, matrix, max_copies_in_polymer, max_monomers_in_polymer)
+
+    def __covers(self, max_copies_in_polymer: List[Union[int, float]], max_monomers_in_polymer: Union[int, float]) \
+            -> bool:
+        return max_monomers_in_polymer <= self.__max_monomers_in_polymer and all(
+            requested <= available
+            for requested, available in zip(max_copies_in_polymer, self.__max_copies_in_polymer)
+        )
+
+    def restricted_to(
+            self,
+            max_copies_in_polymer: List[Union[int, float]],
+            max_monomers_in_polymer: Union[int, float],
+    ) -> "PolymerLibrary":
+        max_copies = np.array([min(max_copies, np.iinfo(np.int64).max) for max_copies in max_copies_in_polymer])
+        columns_to_keep = np.all(self.__matrix <= max_copies[:, np.newaxis], axis=0) & \
+            (self.__matrix.sum(axis=0) <= max_monomers_in_polymer)
+        return PolymerLibrary(
+            self.__monomer_types, self.__limiting_monomer_types(), self.__matrix[:, columns_to_keep],
+            max_copies_in_polymer, max_monomers_in_polymer,
+        )
+
+    def irreducible(self) -> "PolymerLibrary":
+        """
+        returns the library without the polymers which can be split into a polymer of the library and either another
+          polymer of the library or some non-limiting monomers (which become singletons); such polymers never appear
+          in a configuration with the fewest merges
+        """
+        columns = [tuple(column) for column in self.__matrix.T]
+        known_columns = set(columns)
+        columns_to_keep = []
+        for p, column in enumerate(self.__matrix.T):
+            smaller_columns = np.all(self.__matrix <= column[:, np.newaxis], axis=0)
+            smaller_columns[p] = False
+            is_reducible = False
+            for q in np.flatnonzero(smaller_columns):
+                remainder = column - self.__matrix[:, q]
+                if not np.any(remainder[self.__is_limiting]) or tuple(remainder) in known_columns:
+                    is_reducible = True
+                    break
+            columns_to_keep.append(not is_reducible)
+        return PolymerLibrary(
+            self.__monomer_types, self.__limiting_monomer_types(), self.__matrix[:, np.array(columns_to_keep, bool)],
+            self.__max_copies_in_polymer, self.__max_monomers_in_polymer,
+        )
+
+    def save(self, filename: str) -> None:
+        np.savez_compressed(
+            filename,
+            matrix=self.__matrix,
+            monomer_types=np.array([str(monomer) for monomer in self.__monomer_types]),
+            is_limiting=self.__is_limiting,
+            max_copies_in_polymer=np.array(self.__max_copies_in_polymer, np.float64),
+            max_monomers_in_polymer=np.array(self.__max_monomers_in_polymer, np.float64),
+        )
+
+    @classmethod
+    def load(cls, filename: str, monomer_types: List[Monomer]) -> "PolymerLibrary":
+        with np.load(filename) as data:
+            saved_monomer_types = list(data['monomer_types'])
+            if saved_monomer_types != [str(monomer) for monomer in monomer_types]:
+                raise AssertionError(
+                    f"Polymer library in '{filename}' was built for the monomer types {saved_monomer_types}"
+                )
+            max_copies_in_polymer = [
+                int(max_copies) if max_copies != infinity else infinity
+                for max_copies in data['max_copies_in_polymer']
+            ]
+            max_monomers_in_polymer = float(data['max_monomers_in_polymer'])
+            if max_monomers_in_polymer != infinity:
+                max_monomers_in_polymer = int(max_monomers_in_polymer)
+            limiting_monomer_types = [
+                monomer for monomer, is_limiting in zip(monomer_types, data['is_limiting']) if is_limiting
+            ]
+            return cls(
+                monomer_types, limiting_monomer_types, data['matrix'], max_copies_in_polymer, max_monomers_in_polymer
+            )
+
+    def __limiting_monomer_types(self) -> List[Monomer]:
+        return [monomer for monomer, is_limiting in zip(self.__monomer_types, self.__is_limiting) if is_limiting]
+
+    def matrix(self) -> np.ndarray:
+        return self.__matrix
+
+    def monomer_types(self) -> List[Monomer]:
+        return list(self.__monomer_types)
+
+    def number_of_polymers(self) -> int:
+        return self.__matrix.shape[1]
+
+    def polymer(self, p: int) -> Polymer:
+        return Polymer({
+            monomer: int(self.__matrix[i, p])
+            for i, monomer in enumerate(self.__monomer_types)
+            if self.__matrix[i, p] > 0
+        })
@@ -0,0 +1,259 @@
+from typing import List, Dict, Tuple, Iterator
+from math import inf as infinity
+
+from source.tbn import Tbn
+from source.monomer import Monomer
+from source.polymer import Polymer
+from source.configuration import Configuration
+from source.constraints import Constraints
+
+
+class SingletonPresolve:
+    """
+    Singleton presolve: finds the monomer types that are singletons in every stable configuration, so that they can
+      be removed from the tbn before solving and added back to every configuration afterwards.
+
+    A monomer type is a forced singleton when it has no positive net count on any limiting domain type, and every
+      limiting domain type on which it has a negative net count has no positive net count on any monomer type at
+      all.  Splitting such a monomer off a saturated polymer leaves the polymer saturated (and its bond deficit
+      unchanged), so this strictly improves any configuration in which it is not a singleton.  Removing these
+      monomer types does not change which monomer types are limiting.
+    """
+    def __init__(self, tbn: Tbn):
+        self.__tbn = tbn
+        limiting_domain_types = list(tbn.limiting_domain_types())
+        supplied_domain_types = set(
+            domain
+            for monomer in tbn.monomer_types()
+            for domain in limiting_domain_types
+            if monomer.net_count(domain) > 0
+        )
+        self.__singleton_types: List[Monomer] = [
+            monomer for monomer in tbn.monomer_types()
+            if all(
+                monomer.net_count(domain) == 0 or
+                (monomer.net_count(domain) < 0 and domain not in supplied_domain_types)
+                for domain in limiting_domain_types
+            )
+        ]
+        singleton_types = set(self.__singleton_types)
+        self.__reduced_tbn = Tbn({
+            monomer: tbn.count(monomer) for monomer in tbn.monomer_types() if monomer not in singleton_types
+        })
+
+    @staticmethod
+    def applies_to(user_constraints: Constraints) -> bool:
+        # forcing singletons only ever adds polymers (and never adds energy), which is only safe when optimizing
+        #  without lower bounds on merges or energy, or an upper bound on the number of polymers
+        return user_constraints.optimize() and \
+            user_constraints.min_merges() == 0 and \
+            user_constraints.max_polymers() == infinity and \
+            user_constraints.min_energy() == -infinity
+
+    def singleton_types(self) -> List[Monomer]:
+        return list(self.__singleton_types)
+
+    def reduced_tbn(self) -> Tbn:
+        return self.__reduced_tbn
+
+    def reduces(self) -> bool:
+        return len(self.__singleton_types) > 0
+
+    def add_singletons(self, configuration: Configuration) -> Configuration:
+        configuration_dict = dict(configuration.items())
+        for monomer in self.__singleton_types:
+            singleton_polymer = Polymer({monomer: 1})
+            configuration_dict[singleton_polymer] = \
+                self.__tbn.count(monomer) + configuration_dict.get(singleton_polymer, 0)
+        return Configuration(configuration_dict)
+
+    def remove_singletons(self, configuration: Configuration) -> Configuration:
+        # the corresponding configuration of the reduced tbn (e.g. to pass on a solution hint)
+        singleton_types = set(self.__singleton_types)
+        configuration_dict = {}
+        for polymer, multiplicity in configuration.items():
+            polymer_dict = {monomer: count for monomer, count in polymer.items() if monomer not in singleton_types}
+            if polymer_dict:
+                reduced_polymer = Polymer(polymer_dict)
+                configuration_dict[reduced_polymer] = multiplicity + configuration_dict.get(reduced_polymer, 0)
+        return Configuration(configuration_dict)
+
+    def singleton_configuration(self) -> Configuration:
+        # the stable configuration when every monomer type is a forced singleton
+        return self.add_singletons(Configuration({}))
+
+    def report(self) -> str:
+        return \
+            f"singleton presolve removed {len(self.__singleton_types)} of " \
+            f"{len(list(self.__tbn.monomer_types()))} monomer types " \
+            f"({sum(self.__tbn.count(monomer) for monomer in self.__singleton_types)} of " \
+            f"{self.__tbn.number_of_monomers()} monomers)"
+
+
+class MonomerCompression:
+    """
+    Merges the monomer types which have the same net count on every limiting domain type (and therefore on every
+      domain type) into a single representative type, with the summed count.  Such monomer types are interchangeable
+      in every formulation that does not model individual binding sites, so the tbn can be solved with the
+      representatives, and each configuration then expanded back by distributing the members of each class among
+      the copies of the representative.
+
+    Only classes whose members all have finite counts are merged.
+    """
+    def __init__(self, tbn: Tbn):
+        limiting_domain_types = list(tbn.limiting_domain_types())
+        classes: Dict[Tuple[int, ...], List[Monomer]] = {}
+        for monomer in tbn.monomer_types():
+            if tbn.count(monomer) < infinity:
+                signature = tuple(monomer.net_count(domain) for domain in limiting_domain_types)
+                classes.setdefault(signature, []).append(monomer)
+
+        # members[representative] = the monomer types (with their counts) that the representative stands for
+        self.__members: Dict[Monomer, List[Tuple[Monomer, int]]] = {}
+        for class_members in classes.values():
+            if len(class_members) > 1:
+                self.__members[class_members[0]] = [(monomer, tbn.count(monomer)) for monomer in class_members]
+
+        merged_monomer_types = set(member for members in self.__members.values() for member, _ in members)
+        compressed_monomer_counts = {}
+        for monomer in tbn.monomer_types():
+            if monomer in self.__members:
+                compressed_monomer_counts[monomer] = sum(count for _, count in self.__members[monomer])
+            elif monomer not in merged_monomer_types:
+                compressed_monomer_counts[monomer] = tbn.count(monomer)
+        self.__tbn = tbn
+        self.__compressed_tbn = Tbn(compressed_monomer_counts)
+
+    def compressed_tbn(self) -> Tbn:
+        return self.__compressed_tbn
+
+    def reduces(self) -> bool:
+        return len(self.__members) > 0
+
+    def compress(self, configuration: Configuration) -> Configuration:
+        # the corresponding configuration of the compressed tbn (e.g. to pass on a solution hint)
+        representative_of = {
+            member: representative for representative, members in self.__members.items() for member, _ in members
+        }
+        configuration_dict = {}
+        for polymer, multiplicity in configuration.items():
+            polymer_dict = {}
+            for monomer, count in polymer.items():
+                representative = representative_of.get(monomer, monomer)
+                polymer_dict[representative] = count + polymer_dict.get(representative, 0)
+            compressed_polymer = Polymer(polymer_dict)
+            configuration_dict[compressed_polymer] = multiplicity + configuration_dict.get(compressed_polymer, 0)
+        return Configuration(configuration_dict)
+
+    def __split(self, polymer: Polymer) -> Tuple[Dict[Monomer, int], List[Tuple[Monomer, int]]]:
+        # splits a polymer of the compressed tbn into its uncompressed part and its representatives (with counts)
+        fixed_part = {monomer: count for monomer, count in polymer.items() if monomer not in self.__members}
+        representatives = sorted(
+            (monomer, count) for monomer, count in polymer.items() if monomer in self.__members
+        )
+        return fixed_part, representatives
+
+    def expand(self, configuration: Configuration) -> Configuration:
+        """
+        returns one configuration of the original tbn that corresponds to a configuration of the compressed tbn
+        """
+        remaining = {member: count for members in self.__members.values() for member, count in members}
+        configuration_dict = {}
+        for polymer, multiplicity in sorted(configuration.items()):
+            fixed_part, representatives = self.__split(polymer)
+            for _ in range(multiplicity if representatives else 1):
+                polymer_dict = dict(fixed_part)
+                for representative, count in representatives:
+                    for member, _ in self.__members[representative]:
+                        taken = min(count, remaining[member])
+                        if taken > 0:
+                            polymer_dict[member] = taken
+                            remaining[member] -= taken
+                            count -= taken
+                expanded_polymer = Polymer(polymer_dict)
+                copies = 1 if representatives else multiplicity
+                configuration_dict[expanded_polymer] = copies + configuration_dict.get(expanded_polymer, 0)
+        return Configuration(configuration_dict)
+
+    def expand_all(self, configuration: Configuration) -> Iterator[Configuration]:
+        """
+        lazily yields every configuration of the original tbn that corresponds to a configuration of the compressed
+          tbn, each exactly once
+        """
+        remaining = {member: count for members in self.__members.values() for member, count in members}
+        configuration_dict = {}
+        slots = []
+        for polymer, multiplicity in sorted(configuration.items()):
+            fixed_part, representatives = self.__split(polymer)
+            if representatives:
+                slots.append((fixed_part, self.__fillings(representatives), multiplicity))
+            else:
+                configuration_dict[polymer] = multiplicity
+
+        yield from self.__expand_slot(slots, 0, 0, remaining, configuration_dict)
+
+    def __fillings(self, representatives: List[Tuple[Monomer, int]]) -> List[Dict[Monomer, int]]:
+        # every way to choose the members for one copy of a polymer, in a fixed order
+        fillings = [{}]
+        for representative, count in representatives:
+            members = [member for member, _ in self.__members[representative]]
+            fillings = [
+                {**filling, **{member: k for member, k in zip(members, composition) if k > 0}}
+                for filling in fillings
+                for composition in self.__compositions(count, len(members))
+            ]
+        return fillings
+
+    @classmethod
+    def __compositions(cls, total: int, number_of_parts: int) -> Iterator[Tuple[int, ...]]:
+        if number_of_parts == 1:
+            yield (total,)
+        else:
+            for first in range(total, -1, -1):
+                for rest in cls.__compositions(total - first, number_of_parts - 1):
+                    yield (first,) + rest
+
+    def __expand_slot(
+            self,
+            slots: List[Tuple[Dict[Monomer, int], List[Dict[Monomer, int]], int]],
+            s: int,
+            f: int,
+            remaining: Dict[Monomer, int],
+            configuration_dict: Dict[Polymer, int],
+    ) -> Iterator[Configuration]:
+        # assigns the copies of slot s to its fillings f, f+1, ... (how many copies use each filling, in order), so
+        #  that each multiset of fillings is generated once
+        if s == len(slots):
+            yield Configuration(dict(configuration_dict))
+            return
+        fixed_part, fillings, copies_left = slots[s]
+        if copies_left == 0:
+            yield from self.__expand_slot(slots, s + 1, 0, remaining, configuration_dict)
+            return
+        if f == len(fillings):
+            return
+
+        filling = fillings[f]
+        max_copies = min([copies_left] + [remaining[member] // k for member, k in filling.items()])
+        expanded_polymer = Polymer({**fixed_part, **filling})
+        for copies in range(max_copies, -1, -1):
+            for member, k in filling.items():
+                remaining[member] -= copies * k
+            if copies > 0:
+                configuration_dict[expanded_polymer] = copies + configuration_dict.get(expanded_polymer, 0)
+            slots[s] = (fixed_part, fillings, copies_left - copies)
+
+            yield from self.__expand_slot(slots, s, f + 1, remaining, configuration_dict)
+
+            slots[s] = (fixed_part, fillings, copies_left)
+            if copies > 0:
+                configuration_dict[expanded_polymer] -= copies
+                if configuration_dict[expanded_polymer] == 0:
+                    del configuration_dict[expanded_polymer]
+            for member, k in filling.items():
+                remaining[member] += copies * k
+
+    def report(self) -> str:
+        return \
+            f"monomer compression merged {sum(len(members) for members in self.__members.values())} of " \
+            f"{len(list(self.__tbn.monomer_types()))} monomer types into {len(self.__members)} classes"
@@ -0,0 +1,63 @@
+from typing import Optional, Union
+from math import ceil
+
+from source.tbn import Tbn
+from source.configuration import Configuration
+
+
+class RelaxationBound:
+    """
+    Bounds from the linear relaxation of a formulation: a lower bound on the number of merges (and so an upper bound
+      on the number of polymers), or a lower bound on the energy.  If an incumbent configuration is known, the gap
+      between it and the bound estimates how far the incumbent can be from optimal.
+    """
+    # the relaxation is solved in floating point, so values within this tolerance of an integer are rounded to it
+    TOLERANCE = 1e-6
+
+    def __init__(
+            self,
+            tbn: Tbn,
+            min_merges: Optional[float] = None,
+            min_energy: Optional[float] = None,
+            bond_weight: Optional[float] = None,
+            incumbent: Optional[Configuration] = None,
+    ):
+        self.__number_of_monomers = tbn.number_of_monomers()
+        self.__min_merges = None if min_merges is None else max(0, ceil(min_merges - self.TOLERANCE))
+        self.__min_energy = min_energy
+        self.__bond_weight = bond_weight
+        self.__incumbent = incumbent
+
+    def min_merges(self) -> Optional[int]:
+        return self.__min_merges
+
+    def max_polymers(self) -> Optional[Union[int, float]]:
+        if self.__min_merges is None:
+            return None
+        return self.__number_of_monomers - self.__min_merges
+
+    def min_energy(self) -> Optional[float]:
+        return self.__min_energy
+
+    def incumbent(self) -> Optional[Configuration]:
+        return self.__incumbent
+
+    def gap(self) -> Optional[float]:
+        """
+        returns the difference between the incumbent and the bound (in merges, or in energy if the energy is
+          bounded), or None if there is no incumbent
+        """
+        if self.__incumbent is None:
+            return None
+        if self.__min_energy is not None:
+            return self.__incumbent.energy(self.__bond_weight) - self.__min_energy
+        return self.__incumbent.number_of_merges() - self.__min_merges
+
+    def __str__(self) -> str:
+        if self.__min_energy is not None:
+            bound_as_string = f"min energy: {round(self.__min_energy, 8)}"
+        else:
+            bound_as_string = f"max polymers: {self.max_polymers()}; min merges: {self.__min_merges}"
+        if self.__incumbent is not None:
+            bound_as_string += f"; gap to incumbent: {round(self.gap(), 8)}"
+        return bound_as_string
@@ -0,0 +1,275 @@
+"""
+A long-running solver service, for many small queries from the command line (see stable_tbn.py --serve and
+  --connect).  The service listens on a Unix socket and hands each query to a pool of worker processes, which stay
+  alive between queries: NumPy and OR-Tools are imported once per worker, and the caches of a worker (e.g. the
+  polymer libraries of SET_PARTITIONING) are reused by later queries.  The answers to recent queries are kept by the
+  service itself, so a repeated query is answered without solving it again.
+
+Protocol: the client sends one request (see make_request) as a line of JSON, and the service answers with lines of
+  JSON: {"output": text} for each configuration as it is written (in the text or NDJSON format of the command line),
+  and then either {"done": true} or {"error": message}.  The service closes the connection after the answer.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+import functools
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import socket
+import socketserver
+import threading
+
+from source.tbn import Tbn
+from source.constraints import Constraints
+from source.solver import Solver, SolverMethod, SolverFormulation
+from source.lib import get_heuristic_config
+from source import output
+
+# the output formats which can be streamed over the socket
+SERVICE_OUTPUT_FORMATS = ["text", "ndjson"]
+MAX_CACHED_RESULTS = 256
+# answers with more output than this (in characters) are not cached
+MAX_CACHED_OUTPUT_LENGTH = 1 << 20
+
+
+def make_request(
+        tbn_text: str,
+        constraints_text: Optional[str] = None,
+        solver_method: SolverMethod = SolverMethod.CONSTRAINT_PROGRAMMING,
+        formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+        bond_weighting_factor: Optional[float] = None,
+        single: bool = False,
+        heuristic_hint: bool = False,
+        bound_only: bool = False,
+        library_directory: Optional[str] = None,
+        output_format: str = "text",
+        full: bool = False,
+) -> Dict[str, Any]:
+    # the options have the same meaning as those of the command line
+    if output_format not in SERVICE_OUTPUT_FORMATS:
+        raise AssertionError(f"Output format '{output_format}' cannot be streamed, expected one of "
+                             f"{SERVICE_OUTPUT_FORMATS}")
+    return {
+        "tbn": tbn_text,
+        "constraints": constraints_text,
+        "method": solver_method.name,
+        "formulation": formulation.name,
+        "bond_weighting_factor": bond_weighting_factor,
+        "single": single,
+        "heuristic_hint": heuristic_hint,
+        "bound_only": bound_only,
+        "library_directory": library_directory,
+        "output": output_format,
+        "full": full,
+    }
+
+
+def submit(socket_filename: str, request: Dict[str, Any]) -> Iterator[str]:
+    """
+    sends the request to the service listening on the socket, and yields the output as it arrives; raises an
+      AssertionError with the message of the service if the request failed
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_filename)
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with connection.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                message = json.loads(line)
+                if "error" in message:
+                    raise AssertionError(message["error"])
+                elif message.get("done"):
+                    return
+                yield message["output"]
+    raise AssertionError("The service closed the connection before the answer was complete")
+
+
+def serve(socket_filename: str, processes: int = 1) -> None:
+    # runs until interrupted
+    with Service(socket_filename, processes) as service:
+        service.serve_forever()
+
+
+class Service(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # how often (in seconds) an answer that is still being computed checks that its worker is alive
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, socket_filename: str, processes: int = 1):
+        if os.path.exists(socket_filename):
+            os.remove(socket_filename)  # left over from a service that was not shut down
+        super().__init__(socket_filename, RequestHandler)
+        self.__socket_filename = socket_filename
+        self.__manager = multiprocessing.Manager()
+        self.__pool = multiprocessing.Pool(processes, initializer=warm_up)
+        self.__results: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self.__results_lock = threading.Lock()
+
+    def answer(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        # yields the messages of the answer as the worker sends them
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+        with self.__results_lock:
+            messages = self.__results.get(key)
+            if messages is not None:
+                self.__results.move_to_end(key)
+        if messages is not None:
+            yield from messages
+            return
+
+        messages = []  # None once the output is too long to cache
+        output_length = 0
+        queue = self.__manager.Queue()
+        # answer_request reports its own errors; this reports those of the pool (e.g. if the request cannot be sent)
+        result = self.__pool.apply_async(
+            answer_request, (request, queue), error_callback=functools.partial(put_error, queue)
+        )
+        worker_pid = None
+        while True:
+            try:
+                message = queue.get(timeout=self.POLL_INTERVAL)
+            except queue_module.Empty:
+                message = self.__missing_message(queue, result, worker_pid)
+                if message is None:
+                    continue
+            if "worker" in message:
+                worker_pid = message["worker"]
+                continue
+            if messages is not None:
+                messages.append(message)
+                output_length += len(message.get("output", ""))
+                if output_length > MAX_CACHED_OUTPUT_LENGTH:
+                    messages = None  # not kept, so that a large answer does not stay in memory
+            yield message
+            if "output" not in message:
+                break
+        if message.get("done") and messages is not None:
+            with self.__results_lock:
+                self.__results[key] = messages
+                while len(self.__results) > MAX_CACHED_RESULTS:
+                    self.__results.popitem(last=False)
+
+    @staticmethod
+    def __missing_message(queue: Any, result: Any, worker_pid: Optional[int]) -> Optional[Dict[str, Any]]:
+        # called when no message arrived in time: returns an error if no more messages will come, and None otherwise
+        if result.ready():
+            # every message was put before the task finished, so one that is still missing never will be
+            try:
+                return queue.get_nowait()
+            except queue_module.Empty:
+                return {"error": "RuntimeError: The worker finished without completing the answer"}
+        if worker_pid is not None and worker_pid not in [process.pid for process in multiprocessing.active_children()]:
+            return {"error": "RuntimeError: The worker process died while answering"}
+        return None
+
+    def number_of_cached_results(self) -> int:
+        with self.__results_lock:
+            return len(self.__results)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.__pool.terminate()
+        self.__manager.shutdown()
+        if os.path.exists(self.__socket_filename):
+            os.remove(self.__socket_filename)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as error:
+            self.__send({"error": f"The request is not valid JSON: {error}"})
+            return
+        try:
+            for message in self.server.answer(request):
+                self.__send(message)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away
+
+    def __send(self, message: Dict[str, Any]) -> None:
+        self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+def warm_up() -> None:
+    # runs in each worker as it starts, so that the first query does not pay for loading the solvers
+    Solver().stable_config(Tbn.from_string("a \n a*"))
+
+
+def put_error(queue: Any, error: BaseException) -> None:
+    queue.put({"error": f"{type(error).__name__}: {error}"})
+
+
+def answer_request(request: Dict[str, Any], queue: Any) -> None:
+    # runs in a worker: puts the messages of the answer into the queue, the last of which is not an output message;
+    #  the first message identifies the worker, so that the service notices if it dies
+    queue.put({"worker": os.getpid()})
+    try:
+        tbn = Tbn.from_string(request["tbn"])
+        if request["constraints"]:
+            user_constraints = Constraints.from_string(request["constraints"])
+        else:
+            user_constraints = Constraints()
+        if request["library_directory"] is not None:
+            user_constraints = user_constraints.with_library_directory(request["library_directory"])
+        solver_method = SolverMethod[request["method"]]
+        formulation = SolverFormulation[request["formulation"]]
+        bond_weighting_factor = request["bond_weighting_factor"]
+
+        if request["bound_only"]:
+            bound = Solver().bound(
+                tbn,
+                user_constraints=user_constraints,
+                formulation=formulation,
+                bond_weighting_factor=bond_weighting_factor,
+                incumbent=get_heuristic_config(tbn, user_constraints),
+            )
+            queue.put({"output": f"Bound: {bound}\n"})
+            queue.put({"done": True})
+            return
+
+        if bond_weighting_factor is None:
+            bond_weight = user_constraints.bond_weight()
+        else:
+            bond_weight = bond_weighting_factor
+        stream = io.StringIO()
+        if request["output"] == "ndjson":
+            writer = output.NdjsonWriter(tbn, bond_weight, stream)
+        else:
+            writer = output.TextWriter(tbn, bond_weight, stream, full=request["full"], single=request["single"])
+
+        def put_output() -> None:
+            if stream.getvalue():
+                queue.put({"output": stream.getvalue()})
+                stream.seek(0)
+                stream.truncate()
+
+        put_output()  # the NDJSON header
+        solver = Solver(method=solver_method)
+        if request["single"]:
+            hint = None
+            if request["heuristic_hint"]:
+                hint = get_heuristic_config(tbn, user_constraints)
+            configurations = [solver.stable_config(
+                tbn,
+                user_constraints=user_constraints,
+                formulation=formulation,
+                bond_weighting_factor=bond_weighting_factor,
+                hint=hint,
+            )]
+        else:
+            configurations = solver.stable_configs(
+                tbn,
+                user_constraints=user_constraints,
+                formulation=formulation,
+                bond_weighting_factor=bond_weighting_factor,
+            )
+
+        for configuration in configurations:
+            writer.write(configuration)
+            put_output()
+        queue.put({"done": True})
+    except Exception as error:
+        put_error(queue, error)
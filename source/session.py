@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional, Union
+from math import inf as infinity
+
+from source.tbn import Tbn
+from source.monomer import Monomer
+from source.polymer import Polymer
+from source.configuration import Configuration
+from source.constraints import Constraints
+from source.formulations.abstract import Formulation as AbstractFormulation
+from source.solver import Solver, SolverMethod, SolverFormulation
+
+
+class Session:
+    """
+    Keeps a tbn and its formulation between queries, for design loops that make small edits to a tbn and solve
+      again.  If only the counts of non-limiting monomer types change, the formulation updates the bounds and
+      right-hand sides of the existing model where it can (see Formulation.update_tbn); otherwise the model is
+      rebuilt.  Every query after the first is warm-started with the previous stable configuration, adapted to the
+      edited tbn (for the formulations which accept solution hints).
+
+    The presolve steps of the solver are not used, since the reduced tbn could change with every edit.
+    """
+    def __init__(
+            self,
+            tbn: Tbn,
+            solver_method: SolverMethod = SolverMethod.CONSTRAINT_PROGRAMMING,
+            formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+            user_constraints: Constraints = Constraints(),
+            bond_weighting_factor: Optional[float] = None,
+    ):
+        if solver_method == SolverMethod.HEURISTIC:
+            raise NotImplementedError("Not implemented to run a session with the heuristic")
+        if bond_weighting_factor is not None:
+            user_constraints = user_constraints.with_bond_weight(bond_weighting_factor)
+        self.__solver = Solver(method=solver_method)
+        self.__formulation = formulation
+        self.__user_constraints = user_constraints
+
+        self.__monomer_counts: Dict[Monomer, Union[int, float]] = {
+            monomer: tbn.count(monomer) for monomer in tbn.monomer_types()
+        }
+        self.__formulation_object: Optional[AbstractFormulation] = None
+        self.__edited = False
+        self.__configuration: Optional[Configuration] = None
+        self.statistics = {"queries": 0, "models_built": 0, "models_updated_in_place": 0}
+
+    def tbn(self) -> Tbn:
+        return Tbn(self.__monomer_counts)
+
+    def configuration(self) -> Optional[Configuration]:
+        # the stable configuration from the most recent query, which may no longer fit the tbn
+        return self.__configuration
+
+    def set_count(self, monomer: Monomer, count: Union[int, float]) -> None:
+        if monomer not in self.__monomer_counts:
+            raise AssertionError(f"monomer {monomer} is not in the tbn; use add_monomer instead")
+        if count == 0:
+            self.remove_monomer(monomer)
+        elif count != self.__monomer_counts[monomer]:
+            self.__monomer_counts[monomer] = count
+            self.__edited = True
+
+    def add_monomer(self, monomer: Monomer, count: Union[int, float] = 1) -> None:
+        if monomer in self.__monomer_counts:
+            raise AssertionError(f"monomer {monomer} is already in the tbn; use set_count instead")
+        self.__monomer_counts[monomer] = count
+        self.__edited = True
+
+    def remove_monomer(self, monomer: Monomer) -> None:
+        if monomer not in self.__monomer_counts:
+            raise AssertionError(f"monomer {monomer} is not in the tbn")
+        del self.__monomer_counts[monomer]
+        self.__edited = True
+
+    def sweep(
+            self, monomers: List[Monomer], counts: List[Union[int, float]], verbose: bool = False
+    ) -> List[Configuration]:
+        """
+        returns a stable configuration for each count in turn, where the count applies to each of the monomer types
+          (which are added or removed as needed); each query is warm-started from the previous one
+        """
+        configurations = []
+        for count in counts:
+            for monomer in monomers:
+                if monomer not in self.__monomer_counts:
+                    if count > 0:
+                        self.add_monomer(monomer, count)
+                else:
+                    self.set_count(monomer, count)
+            configurations.append(self.stable_config(verbose=verbose))
+        return configurations
+
+    def stable_config(self, verbose: bool = False) -> Configuration:
+        tbn = self.tbn()
+        self.statistics["queries"] += 1
+        if tbn.number_of_monomers() == 0:
+            self.__configuration = Configuration({})
+            return self.__configuration
+
+        if self.__formulation_object is None:
+            self.__formulation_object = self.__solver.build_formulation(
+                tbn, self.__user_constraints, self.__formulation
+            )
+            self.statistics["models_built"] += 1
+        elif self.__edited:
+            if self.__formulation_object.update_tbn(tbn):
+                self.statistics["models_updated_in_place"] += 1
+            else:
+                self.statistics["models_built"] += 1
+        self.__edited = False
+
+        if self.__configuration is not None:
+            try:
+                self.__formulation_object.add_hint(self.__adapted_configuration(self.__configuration, tbn))
+            except NotImplementedError:
+                pass  # this formulation does not accept hints, so solve cold
+
+        self.__configuration = self.__formulation_object.get_configuration(verbose=verbose)
+        return self.__configuration
+
+    @staticmethod
+    def __adapted_configuration(configuration: Configuration, tbn: Tbn) -> Configuration:
+        # removes the monomers that are no longer in the tbn from the polymers of the configuration, and adds the new
+        #  ones as singletons
+        remaining_counts = {monomer: tbn.count(monomer) for monomer in tbn.monomer_types()}
+        configuration_dict = {}
+        for polymer, multiplicity in sorted(configuration.items()):
+            if multiplicity == infinity:
+                continue
+            for _ in range(multiplicity):
+                polymer_dict = {}
+                for monomer, count in polymer.items():
+                    taken = min(count, remaining_counts.get(monomer, 0))
+                    if taken > 0:
+                        polymer_dict[monomer] = taken
+                        remaining_counts[monomer] -= taken
+                if polymer_dict:
+                    adapted_polymer = Polymer(polymer_dict)
+                    configuration_dict[adapted_polymer] = 1 + configuration_dict.get(adapted_polymer, 0)
+
+        for monomer, count in remaining_counts.items():
+            if count > 0:
+                singleton_polymer = Polymer({monomer: 1})
+                configuration_dict[singleton_polymer] = count + configuration_dict.get(singleton_polymer, 0)
+        return Configuration(configuration_dict)
+
+
+def sweep_in_new_session(
+        tbn: Tbn,
+        monomers: List[Monomer],
+        counts: List[Union[int, float]],
+        solver_method: SolverMethod,
+        formulation: SolverFormulation,
+        user_constraints: Constraints,
+        verbose: bool = False,
+) -> List[Configuration]:
+    # module level, so that it can be run in a worker process
+    session = Session(tbn, solver_method=solver_method, formulation=formulation, user_constraints=user_constraints)
+    return session.sweep(monomers, counts, verbose=verbose)
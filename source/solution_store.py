@@ -0,0 +1,102 @@
+from typing import Iterator, List, Optional, Sequence
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+
+class SolutionStore:
+    """
+    An append-only table of solutions (one row of variable values per solution) which is kept on disk instead of in
+      memory, for enumerations with millions of solutions.  The rows are stored in chunks of about CHUNK_BYTES each,
+      in memory-mapped files; since the rows have a fixed width, row k is found directly in chunk k // chunk_size.
+      At most one chunk is mapped for writing and one for reading at any time, so the memory used does not grow with
+      the number of solutions.
+
+    The files are written to a new temporary directory (inside directory, if given), which is removed when the store
+      is closed or garbage collected.
+    """
+    CHUNK_BYTES = 1 << 26
+
+    def __init__(self, number_of_columns: int, directory: Optional[str] = None, chunk_size: Optional[int] = None):
+        # chunk_size is the number of rows per chunk
+        if chunk_size is None:
+            chunk_size = max(1, self.CHUNK_BYTES // (8 * max(1, number_of_columns)))
+        if chunk_size <= 0:
+            raise AssertionError(f"chunk size must be positive, got {chunk_size}")
+        self.__number_of_columns = number_of_columns
+        self.__chunk_size = chunk_size
+        self.__directory = tempfile.mkdtemp(prefix="solutions_", dir=directory)
+        self.__finalizer = weakref.finalize(self, shutil.rmtree, self.__directory, True)
+        self.__number_of_rows = 0
+        self.__write_chunk: Optional[np.memmap] = None
+        self.__read_chunk_index: Optional[int] = None
+        self.__read_chunk: Optional[np.memmap] = None
+
+    def __chunk_filename(self, chunk_index: int) -> str:
+        return os.path.join(self.__directory, f"chunk_{chunk_index}.bin")
+
+    def append(self, row: Sequence[int]) -> None:
+        chunk_index, offset = divmod(self.__number_of_rows, self.__chunk_size)
+        if offset == 0:
+            self.flush()
+            self.__write_chunk = np.memmap(
+                self.__chunk_filename(chunk_index),
+                dtype=np.int64,
+                mode="w+",
+                shape=(self.__chunk_size, max(1, self.__number_of_columns)),
+            )
+        self.__write_chunk[offset, :self.__number_of_columns] = row
+        self.__number_of_rows += 1
+
+    def flush(self) -> None:
+        # writes the rows appended so far to disk, and unmaps the current chunk if it is full; a chunk that is mapped
+        #  for reading shares its pages with the chunk that is mapped for writing, so it sees later rows as well
+        if self.__write_chunk is not None:
+            self.__write_chunk.flush()
+            if self.__number_of_rows % self.__chunk_size == 0:
+                self.__write_chunk = None
+
+    def __len__(self) -> int:
+        return self.__number_of_rows
+
+    def __getitem__(self, k: int) -> np.ndarray:
+        if k < 0:
+            k += self.__number_of_rows
+        if not 0 <= k < self.__number_of_rows:
+            raise IndexError(f"solution {k} is out of range for a store of {self.__number_of_rows} solutions")
+        chunk_index, offset = divmod(k, self.__chunk_size)
+        if chunk_index != self.__read_chunk_index:
+            self.flush()
+            self.__read_chunk = np.memmap(
+                self.__chunk_filename(chunk_index),
+                dtype=np.int64,
+                mode="r",
+                shape=(self.__chunk_size, max(1, self.__number_of_columns)),
+            )
+            self.__read_chunk_index = chunk_index
+        return np.array(self.__read_chunk[offset, :self.__number_of_columns])
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for k in range(self.__number_of_rows):
+            yield self[k]
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[List[int]]:
+        # the rows as lists of python ints
+        stop = self.__number_of_rows if stop is None else min(stop, self.__number_of_rows)
+        for k in range(start, stop):
+            yield self[k].tolist()
+
+    def close(self) -> None:
+        self.__write_chunk = None
+        self.__read_chunk = None
+        self.__read_chunk_index = None
+        self.__finalizer()
+
+    def __enter__(self) -> "SolutionStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -1,23 +1,24 @@
-from typing import Iterator, Optional
+from typing import Iterator, Optional, List, Type, Union
+from math import ceil
+import importlib
+import multiprocessing
+import warnings
 from enum import Enum, auto
 
 from source.tbn import Tbn
+from source.monomer import Monomer
 from source.configuration import Configuration
-from source.solver_adapters import constraint_programming, integer_programming
+from source.solver_adapters.abstract import SolverAdapter
 from source.constraints import Constraints
-
-from source.formulations.bond_aware_network import Formulation as BondAwareNetworkFormulation
-from source.formulations.bond_oblivious_network import Formulation as BondObliviousNetworkFormulation
-from source.formulations.polymer_binary_matrix import Formulation as PolymerBinaryMatrixFormulation
-from source.formulations.polymer_integer_matrix import Formulation as PolymerIntegerMatrixFormulation
-from source.formulations.polymer_unbounded_matrix import Formulation as PolymerUnboundedMatrixFormulation
-from source.formulations.variable_bond_weight import Formulation as VariableBondWeightFormulation
-from source.formulations.hilbert_basis import Formulation as HilbertBasisFormulation
-
+from source.presolve import SingletonPresolve, MonomerCompression
+from source.relaxation_bound import RelaxationBound
+from source.metrics import Metrics, measure
+from source.formulations.abstract import Formulation as AbstractFormulation
 
 class SolverMethod(Enum):
     CONSTRAINT_PROGRAMMING = auto()
     INTEGER_PROGRAMMING = auto()  # Only implemented for single queries
+    HEURISTIC = auto()  # Only implemented for single queries; fast, but the configuration may not be stable
 
 
 class SolverFormulation(Enum):
@@ -26,59 +27,242 @@ class SolverFormulation(Enum):
     POLYMER_BINARY_MATRIX = auto()
     POLYMER_INTEGER_MATRIX = auto()
     POLYMER_UNBOUNDED_MATRIX = auto()
+    POLYMER_MULTIPLICITY_MATRIX = auto()
+    MONOMER_ASSIGNMENT = auto()
+    SET_PARTITIONING = auto()
+    COLUMN_GENERATION = auto()  # Only implemented for single queries
     VARIABLE_BOND_WEIGHT = auto()
     HILBERT_BASIS = auto()
 
 
+# the module of each formulation, which defines its class Formulation, and the module of the solver adapter of each
+#  method, which defines its class Solver.  A module is only imported once it is used (see formulation_class and
+#  adapter_class), so that e.g. a CP solve does not load the IP solver, and parsing a tbn loads neither
+FORMULATION_MODULES = {
+    SolverFormulation.BOND_AWARE_NETWORK: "source.formulations.bond_aware_network",
+    SolverFormulation.BOND_OBLIVIOUS_NETWORK: "source.formulations.bond_oblivious_network",
+    SolverFormulation.POLYMER_BINARY_MATRIX: "source.formulations.polymer_binary_matrix",
+    SolverFormulation.POLYMER_INTEGER_MATRIX: "source.formulations.polymer_integer_matrix",
+    SolverFormulation.POLYMER_UNBOUNDED_MATRIX: "source.formulations.polymer_unbounded_matrix",
+    SolverFormulation.POLYMER_MULTIPLICITY_MATRIX: "source.formulations.polymer_multiplicity_matrix",
+    SolverFormulation.MONOMER_ASSIGNMENT: "source.formulations.monomer_assignment",
+    SolverFormulation.SET_PARTITIONING: "source.formulations.set_partitioning",
+    SolverFormulation.COLUMN_GENERATION: "source.formulations.column_generation",
+    SolverFormulation.VARIABLE_BOND_WEIGHT: "source.formulations.variable_bond_weight",
+    SolverFormulation.HILBERT_BASIS: "source.formulations.hilbert_basis",
+}
+ADAPTER_MODULES = {
+    SolverMethod.CONSTRAINT_PROGRAMMING: "source.solver_adapters.constraint_programming",
+    SolverMethod.INTEGER_PROGRAMMING: "source.solver_adapters.integer_programming",
+}
+
+# formulations whose enumeration fixes the number of merges (or the energy) to the optimum; the others fix the
+#  number of polymers
+FIXED_MERGE_FORMULATIONS = {
+    SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+    SolverFormulation.POLYMER_MULTIPLICITY_MATRIX,
+    SolverFormulation.SET_PARTITIONING,
+    SolverFormulation.COLUMN_GENERATION,
+}
+FIXED_ENERGY_FORMULATIONS = {
+    SolverFormulation.VARIABLE_BOND_WEIGHT,
+}
+
+# formulations which distinguish the individual monomers (and report each labelling of a configuration); merging
+#  monomer types would change how many times each configuration is reported
+LABELLED_FORMULATIONS = {
+    SolverFormulation.BOND_AWARE_NETWORK,
+    SolverFormulation.BOND_OBLIVIOUS_NETWORK,
+    SolverFormulation.POLYMER_BINARY_MATRIX,
+    SolverFormulation.MONOMER_ASSIGNMENT,
+}
+
+# formulations which do not build their model with the solver adapter, and so have no linear relaxation to bound
+UNRELAXABLE_FORMULATIONS = {
+    SolverFormulation.COLUMN_GENERATION,
+    SolverFormulation.HILBERT_BASIS,
+}
+
+
+def formulation_class(formulation: SolverFormulation) -> Type[AbstractFormulation]:
+    if formulation not in FORMULATION_MODULES:
+        raise AssertionError(f"did not recognize formulation requested: {formulation}")
+    return importlib.import_module(FORMULATION_MODULES[formulation]).Formulation
+
+
+def adapter_class(method: SolverMethod) -> Type[SolverAdapter]:
+    if method not in ADAPTER_MODULES:
+        raise NotImplementedError(f"no solver adapter for method {method}")
+    return importlib.import_module(ADAPTER_MODULES[method]).Solver
+
+
 class Solver:
     def __init__(
             self,
             method: SolverMethod = SolverMethod.CONSTRAINT_PROGRAMMING,
+            time_limit: Optional[float] = None,  # only used by the heuristic; its default time limit if None
+            solution_directory: Optional[str] = None,  # if given, stable_configs keeps the solutions on disk there
+            checkpoint_filename: Optional[str] = None,  # if given, stable_configs saves its progress and resumes
+            processes: int = 1,  # stable_configs enumerates in parallel with several processes
+            streaming: bool = False,  # if True, stable_configs yields configurations while the search is running
+            metrics: Optional[Metrics] = None,  # if given, the time of each phase and the solver statistics go there
     ):
+        self.__method = method
+        self.__time_limit = time_limit
+        self.__metrics = metrics
         if method == SolverMethod.CONSTRAINT_PROGRAMMING:
-            self.__single_solve_adapter = constraint_programming.Solver()
+            self.__single_solve_adapter = adapter_class(method)(metrics=metrics)
             self.__sorted_polymers = True
         elif method == SolverMethod.INTEGER_PROGRAMMING:
-            self.__single_solve_adapter = integer_programming.Solver()
+            self.__single_solve_adapter = adapter_class(method)(metrics=metrics)
+            self.__sorted_polymers = False
+        elif method == SolverMethod.HEURISTIC:
+            self.__single_solve_adapter = None
             self.__sorted_polymers = False
         else:
             raise NotImplementedError(f"solver not implemented for method {method}")
 
-        self.__multi_solve_adapter = constraint_programming.Solver()  # only implemented for CP to solve_all
+        # only implemented for CP to solve_all; created by the first stable_configs call, so that the other methods
+        #  do not load CP-SAT
+        self.__multi_solve_options = {
+            "solution_directory": solution_directory,
+            "checkpoint_filename": checkpoint_filename,
+            "processes": processes,
+            "streaming": streaming,
+            "metrics": metrics,
+        }
+        self.__multi_solve_adapter = None
+        self.__stopped = False
+
+    def stop_search(self) -> None:
+        """
+        may be called from another thread while this solver is running: stops its CP-SAT searches, after which the
+          running call raises an AssertionError.  Searches started later stop at once, so the solver should not be
+          used again.  The IP and heuristic methods cannot be stopped
+        """
+        self.__stopped = True
+        for adapter in [self.__single_solve_adapter, self.__multi_solve_adapter]:
+            if adapter is not None:
+                adapter.stop_search()
+
+    def __get_multi_solve_adapter(self) -> SolverAdapter:
+        if self.__multi_solve_adapter is None:
+            self.__multi_solve_adapter = adapter_class(SolverMethod.CONSTRAINT_PROGRAMMING)(
+                **self.__multi_solve_options
+            )
+            if self.__stopped:  # stop_search was called while the adapter was created
+                self.__multi_solve_adapter.stop_search()
+        return self.__multi_solve_adapter
 
     def stable_config(self,
                       tbn: Tbn,
                       user_constraints: Constraints = Constraints(),
                       formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
                       bond_weighting_factor: Optional[float] = None,
+                      hint: Optional[Configuration] = None,
                       verbose: bool = False,
                       ) -> Configuration:
+        # hint is a configuration (e.g. from the heuristic) that the solver may use as a starting solution
+        if bond_weighting_factor is not None:
+            user_constraints = user_constraints.with_bond_weight(bond_weighting_factor)
+
+        # removing singletons would merge labelled solutions which differ only in the bonds or labels of the singletons
+        if SingletonPresolve.applies_to(user_constraints) and formulation not in LABELLED_FORMULATIONS:
+            with measure(self.__metrics, "presolve"):
+                presolve = SingletonPresolve(tbn)
+            if presolve.reduces():
+                if verbose:
+                    print(presolve.report())
+                if presolve.reduced_tbn().number_of_monomers() == 0:
+                    return presolve.singleton_configuration()
+                return presolve.add_singletons(self.stable_config(
+                    presolve.reduced_tbn(),
+                    user_constraints=user_constraints,
+                    formulation=formulation,
+                    hint=None if hint is None else presolve.remove_singletons(hint),
+                    verbose=verbose,
+                ))
+
+        if formulation not in LABELLED_FORMULATIONS:
+            with measure(self.__metrics, "presolve"):
+                compression = MonomerCompression(tbn)
+            if compression.reduces():
+                if verbose:
+                    print(compression.report())
+                return compression.expand(self.stable_config(
+                    compression.compressed_tbn(),
+                    user_constraints=user_constraints,
+                    formulation=formulation,
+                    hint=None if hint is None else compression.compress(hint),
+                    verbose=verbose,
+                ))
+
+        if self.__method == SolverMethod.HEURISTIC:
+            from source.heuristic import Heuristic  # imported here, as it loads NumPy
+            time_limit = Heuristic.DEFAULT_TIME_LIMIT if self.__time_limit is None else self.__time_limit
+            with measure(self.__metrics, "solve"):
+                return Heuristic(tbn, user_constraints, time_limit=time_limit).configuration()
+
+        formulation_object = self.build_formulation(tbn, user_constraints, formulation)
+        if hint is not None:
+            try:
+                formulation_object.add_hint(hint)
+            except NotImplementedError:
+                warnings.warn(f"{formulation.name} does not accept solution hints, so the hint is ignored")
+        return formulation_object.get_configuration(verbose=verbose)
+
+    def count_sweep(self,
+                    tbn: Tbn,
+                    monomers: Union[Monomer, List[Monomer]],
+                    counts: List[Union[int, float]],
+                    user_constraints: Constraints = Constraints(),
+                    formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                    bond_weighting_factor: Optional[float] = None,
+                    processes: int = 1,
+                    verbose: bool = False,
+                    ) -> List[Configuration]:
+        """
+        returns a stable configuration for each of the counts (in order), where the count is used for each of the
+          monomer types.  The counts are solved in sequence by a session (see source.session), so that one model is
+          reused where possible and each query is warm-started from the previous one.  With several processes, the
+          counts are split into contiguous chunks, each solved in sequence by its own session
+        """
+        from source.session import sweep_in_new_session  # source.session imports this module
+
         if bond_weighting_factor is not None:
             user_constraints = user_constraints.with_bond_weight(bond_weighting_factor)
+        if isinstance(monomers, Monomer):
+            monomers = [monomers]
+        counts = list(counts)
+        if not counts:
+            return []
 
-        if formulation == SolverFormulation.BOND_AWARE_NETWORK:
-            formulation = BondAwareNetworkFormulation(tbn, self.__single_solve_adapter, user_constraints)
-            return formulation.get_configuration(verbose=verbose)
-        elif formulation == SolverFormulation.BOND_OBLIVIOUS_NETWORK:
-            formulation = BondObliviousNetworkFormulation(tbn, self.__single_solve_adapter, user_constraints)
-            return formulation.get_configuration(verbose=verbose)
-        elif formulation == SolverFormulation.POLYMER_BINARY_MATRIX:
-            formulation = PolymerBinaryMatrixFormulation(tbn, self.__single_solve_adapter, user_constraints)
-            return formulation.get_configuration(verbose=verbose)
-        elif formulation == SolverFormulation.POLYMER_INTEGER_MATRIX:
-            formulation = PolymerIntegerMatrixFormulation(tbn, self.__single_solve_adapter, user_constraints)
-            return formulation.get_configuration(verbose=verbose)
-        elif formulation == SolverFormulation.POLYMER_UNBOUNDED_MATRIX:
-            formulation = PolymerUnboundedMatrixFormulation(tbn, self.__single_solve_adapter, user_constraints)
-            return formulation.get_configuration(verbose=verbose)
-        elif formulation == SolverFormulation.VARIABLE_BOND_WEIGHT:
-            formulation = VariableBondWeightFormulation(tbn, self.__single_solve_adapter, user_constraints)
-            return formulation.get_configuration(verbose=verbose)
-        elif formulation == SolverFormulation.HILBERT_BASIS:
-            formulation = HilbertBasisFormulation(tbn, self.__single_solve_adapter, user_constraints)
-            return formulation.get_configuration(verbose=verbose)
+        chunk_size = ceil(len(counts) / max(1, processes))
+        chunk_arguments = [
+            (tbn, monomers, counts[k:k + chunk_size], self.__method, formulation, user_constraints, verbose)
+            for k in range(0, len(counts), chunk_size)
+        ]
+        if len(chunk_arguments) > 1:
+            with multiprocessing.Pool(len(chunk_arguments)) as pool:
+                configurations_by_chunk = pool.starmap(sweep_in_new_session, chunk_arguments)
         else:
-            raise AssertionError(f"did not recognize formulation requested: {formulation}")
+            configurations_by_chunk = [sweep_in_new_session(*arguments) for arguments in chunk_arguments]
+        return [configuration for configurations in configurations_by_chunk for configuration in configurations]
+
+    def build_formulation(self,
+                          tbn: Tbn,
+                          user_constraints: Constraints = Constraints(),
+                          formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                          adapter: Optional[SolverAdapter] = None,
+                          ) -> AbstractFormulation:
+        # the formulation for a single query, without any presolve steps; by default, it is built for the solver
+        #  adapter of this solver's method
+        if adapter is None:
+            if self.__method == SolverMethod.HEURISTIC:
+                raise NotImplementedError("The heuristic does not use a formulation")
+            adapter = self.__single_solve_adapter
+
+        return formulation_class(formulation)(tbn, adapter, user_constraints)
 
     def stable_configs(self,
                        tbn: Tbn,
@@ -87,9 +271,49 @@ class Solver:
                        bond_weighting_factor: Optional[float] = None,
                        verbose: bool = False,
                        ) -> Iterator[Configuration]:
+        if self.__method == SolverMethod.HEURISTIC:
+            raise NotImplementedError("The heuristic only finds a single configuration")
+
         if bond_weighting_factor is not None:
             user_constraints = user_constraints.with_bond_weight(bond_weighting_factor)
 
+        if SingletonPresolve.applies_to(user_constraints) and formulation not in LABELLED_FORMULATIONS:
+            # the forced singletons are singletons in every stable configuration, so enumeration stays exact (except
+            #  for labelled formulations, which report each labelling and bonding of the singletons separately)
+            with measure(self.__metrics, "presolve"):
+                presolve = SingletonPresolve(tbn)
+            if presolve.reduces():
+                if verbose:
+                    print(presolve.report())
+                if presolve.reduced_tbn().number_of_monomers() == 0:
+                    return iter([presolve.singleton_configuration()])
+                return (
+                    presolve.add_singletons(configuration)
+                    for configuration in self.stable_configs(
+                        presolve.reduced_tbn(),
+                        user_constraints=user_constraints,
+                        formulation=formulation,
+                        verbose=verbose,
+                    )
+                )
+
+        if formulation not in LABELLED_FORMULATIONS:
+            with measure(self.__metrics, "presolve"):
+                compression = MonomerCompression(tbn)
+            if compression.reduces():
+                if verbose:
+                    print(compression.report())
+                return (
+                    expanded_configuration
+                    for configuration in self.stable_configs(
+                        compression.compressed_tbn(),
+                        user_constraints=user_constraints,
+                        formulation=formulation,
+                        verbose=verbose,
+                    )
+                    for expanded_configuration in compression.expand_all(configuration)
+                )
+
         if user_constraints.optimize():  # do a first solve to find optimal objective value
             example_stable_configuration = self.stable_config(
                 tbn,
@@ -110,47 +334,54 @@ class Solver:
             fixed_merge_user_constraints = user_constraints
             fixed_energy_user_constraints = user_constraints
 
-        if formulation == SolverFormulation.BOND_AWARE_NETWORK:
-            formulation = BondAwareNetworkFormulation(
-                tbn, self.__multi_solve_adapter, fixed_polymer_user_constraints
-            )
-            return formulation.get_all_configurations(verbose=verbose)
-
-        elif formulation == SolverFormulation.BOND_OBLIVIOUS_NETWORK:
-            formulation = BondObliviousNetworkFormulation(
-                tbn, self.__multi_solve_adapter, fixed_polymer_user_constraints
-            )
-            return formulation.get_all_configurations(verbose=verbose)
-
-        elif formulation == SolverFormulation.POLYMER_BINARY_MATRIX:
-            formulation = PolymerBinaryMatrixFormulation(
-                tbn, self.__multi_solve_adapter, fixed_polymer_user_constraints
-            )
-            return formulation.get_all_configurations(verbose=verbose)
+        if formulation in FIXED_MERGE_FORMULATIONS:
+            enumeration_constraints = fixed_merge_user_constraints
+        elif formulation in FIXED_ENERGY_FORMULATIONS:
+            enumeration_constraints = fixed_energy_user_constraints
+        else:
+            enumeration_constraints = fixed_polymer_user_constraints
+        formulation_object = self.build_formulation(
+            tbn, enumeration_constraints, formulation, adapter=self.__get_multi_solve_adapter()
+        )
+        return formulation_object.get_all_configurations(verbose=verbose)
 
-        elif formulation == SolverFormulation.POLYMER_INTEGER_MATRIX:
-            formulation = PolymerIntegerMatrixFormulation(
-                tbn, self.__multi_solve_adapter, fixed_polymer_user_constraints
-            )
-            return formulation.get_all_configurations(verbose=verbose)
+    def bound(self,
+              tbn: Tbn,
+              user_constraints: Constraints = Constraints(),
+              formulation: SolverFormulation = SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+              bond_weighting_factor: Optional[float] = None,
+              incumbent: Optional[Configuration] = None,
+              verbose: bool = False,
+              ) -> RelaxationBound:
+        """
+        solves the linear relaxation of the formulation (with GLOP) instead of the formulation itself; this is much
+          faster, but only gives a bound on the optimal number of merges (or energy)
+        """
+        if bond_weighting_factor is not None:
+            user_constraints = user_constraints.with_bond_weight(bond_weighting_factor)
 
-        elif formulation == SolverFormulation.POLYMER_UNBOUNDED_MATRIX:
-            formulation = PolymerUnboundedMatrixFormulation(
-                tbn, self.__multi_solve_adapter, fixed_merge_user_constraints
-            )
-            return formulation.get_all_configurations(verbose=verbose)
+        # the presolve steps do not change the optimal number of merges or the optimal energy
+        reduced_tbn = tbn
+        with measure(self.__metrics, "presolve"):
+            if SingletonPresolve.applies_to(user_constraints):
+                reduced_tbn = SingletonPresolve(reduced_tbn).reduced_tbn()
+            if formulation not in LABELLED_FORMULATIONS:
+                reduced_tbn = MonomerCompression(reduced_tbn).compressed_tbn()
 
-        elif formulation == SolverFormulation.VARIABLE_BOND_WEIGHT:
-            formulation = VariableBondWeightFormulation(
-                tbn, self.__multi_solve_adapter, fixed_energy_user_constraints
+        if reduced_tbn.number_of_monomers() == 0:
+            value = 0.0
+        else:
+            if formulation in UNRELAXABLE_FORMULATIONS:
+                raise NotImplementedError(f"Not implemented to bound the linear relaxation of {formulation}")
+            relaxed_adapter = adapter_class(SolverMethod.INTEGER_PROGRAMMING)(relaxed=True, metrics=self.__metrics)
+            formulation_object = self.build_formulation(
+                reduced_tbn, user_constraints, formulation, adapter=relaxed_adapter
             )
-            return formulation.get_all_configurations(verbose=verbose)
+            value = formulation_object.get_relaxation_bound(verbose=verbose)
 
-        elif formulation == SolverFormulation.HILBERT_BASIS:
-            formulation = HilbertBasisFormulation(
-                tbn, self.__multi_solve_adapter, fixed_polymer_user_constraints
+        if formulation == SolverFormulation.VARIABLE_BOND_WEIGHT:
+            return RelaxationBound(
+                tbn, min_energy=value, bond_weight=user_constraints.bond_weight(), incumbent=incumbent
             )
-            return formulation.get_all_configurations(verbose=verbose)
-
         else:
-            raise AssertionError(f"did not recognize formulation requested: {formulation}")
+            return RelaxationBound(tbn, min_merges=value, incumbent=incumbent)
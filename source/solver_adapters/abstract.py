@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Any, Iterator, Dict, List
+from typing import Any, Iterator, Dict, List, Optional, Tuple
+
+from source.metrics import Metrics
 
 
 class Model(ABC):
     def __init__(self):
         ABC.__init__(self)
         self._big_M = None
+        self._detect_symmetries = False
         self.OPTIMAL = "ABSTRACT CLASS OPTIMAL"
         self.INFEASIBLE = "ABSTRACT CLASS INFEASIBLE"
 
@@ -40,6 +43,11 @@ class Model(ABC):
         # same as add_implication, except last expression will be enforced to be equal to zero
         pass
 
+    @abstractmethod
+    def add_multiplication_equality(self, target: Any, first_factor: Any, second_factor: Any) -> Any:
+        # enforces target == first_factor * second_factor, where the factors are non-negative bounded variables
+        pass
+
     @abstractmethod
     def minimize(self, *args, **kargs) -> None:
         pass
@@ -48,14 +56,53 @@ class Model(ABC):
     def maximize(self, *args, **kargs) -> None:
         pass
 
+    @abstractmethod
+    def add_hint(self, var: Any, value: int) -> None:
+        # suggests a value for a variable, e.g. from a heuristic solution; the solver may ignore it
+        pass
+
+    @abstractmethod
+    def clear_hints(self) -> None:
+        pass
+
+    @abstractmethod
+    def set_var_upper_bound(self, var: Any, value: int) -> None:
+        # changes the upper bound of an existing variable (e.g. to reuse a model after a count changes)
+        pass
+
+    @abstractmethod
+    def set_constraint_upper_bound(self, constraint: Any, value: int) -> None:
+        # changes the right-hand side of an existing constraint "expression <= value", where the expression has no
+        #  constant term
+        pass
+
+    @abstractmethod
+    def size(self) -> Tuple[int, int, int]:
+        # returns the number of variables, of constraints, and of occurrences of variables in the constraints
+        pass
+
     def set_big_m(self, big_M: int) -> None:
         # not used by all solvers.  this should be a large value (i.e. for big M formulations for integer programming)
         self._big_M = big_M
 
+    def enable_symmetry_detection(self) -> None:
+        # asks the solver to find and break symmetries of the model itself; not all solvers support this
+        self._detect_symmetries = True
+
+    def detect_symmetries(self) -> bool:
+        return self._detect_symmetries
+
 
 class SolverAdapter(ABC):
-    def __init__(self):
+    def __init__(self, metrics: Optional[Metrics] = None):
+        # if metrics is given, the formulations record their phases there, and the adapter records the size of the
+        #  models and the statistics of its searches
         super().__init__()
+        self.metrics = metrics
+
+    def record_model_size(self, model: Model) -> None:
+        if self.metrics is not None:
+            self.metrics.record_model(*model.size())
 
     @staticmethod
     @abstractmethod
@@ -74,3 +121,8 @@ class SolverAdapter(ABC):
     def solve_all(self, model: Model, variables_with_values_to_keep: List[Any], verbose: bool = False)\
             -> Iterator[Dict[Any, int]]:
         pass
+
+    def stop_search(self) -> None:
+        # may be called from another thread: stops the running search (which then returns a status other than
+        #  OPTIMAL or INFEASIBLE), and every later search of this adapter stops at once
+        pass
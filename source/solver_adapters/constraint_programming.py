@@ -1,6 +1,14 @@
-from typing import Any, List, Iterator, Dict, Union
+from typing import Any, Callable, List, Iterator, Dict, Tuple, Union, Optional
+from math import ceil
+import multiprocessing
+import queue
+import re
+import threading
 from ortools.sat.python import cp_model
 from source.solver_adapters import abstract
+from source.metrics import Metrics
+from source.solution_store import SolutionStore
+from source.checkpoint import Checkpoint
 
 
 class CpModel(abstract.Model, cp_model.CpModel):
@@ -23,6 +31,61 @@ class CpModel(abstract.Model, cp_model.CpModel):
     def add_constraint(self, *args) -> Any:
         return self.Add(*args)
 
+    @staticmethod
+    def __as_literal(expression: Any) -> Union[cp_model.IntVar, None]:
+        # returns the expression as a CP-SAT literal if it is a boolean variable or its negation, and None otherwise
+        if isinstance(expression, cp_model.IntVar):
+            return expression if list(expression.Proto().domain) == [0, 1] else None
+        # the negation of a boolean variable has a negative index (its class is private, and differs between versions
+        #  of OR-Tools), and its negation is the variable
+        index = getattr(expression, "Index", None)
+        if callable(index) and index() < 0 and isinstance(expression.Not(), cp_model.IntVar):
+            return expression
+        else:
+            return None
+
+    @classmethod
+    def __as_sum_of_literals(cls, expression: Any) -> Union[List[cp_model.IntVar], None]:
+        # returns the literals whose sum is the expression, or None if the expression is not of that form
+        literal = cls.__as_literal(expression)
+        if literal is not None:
+            return [literal]
+        elif not isinstance(expression, cp_model.LinearExpr):
+            return None
+
+        coefficients, constant = expression.GetIntegerVarValueMap()
+        literals = []
+        for var, coefficient in coefficients.items():
+            if coefficient == 0:
+                continue
+            elif cls.__as_literal(var) is None or coefficient not in (-1, 1):
+                return None
+            elif coefficient == 1:
+                literals.append(var)
+            else:  # -x == (1 - x) - 1
+                literals.append(var.Not())
+                constant -= 1
+        if constant != 0:
+            return None
+        return literals
+
+    def __enforcement_literals(self, antecedents: List[Any]) -> Union[List[cp_model.IntVar], None]:
+        # drops antecedents that are constantly true; returns None if any antecedent is constantly false
+        enforcement_literals = []
+        for antecedent in antecedents:
+            if type(antecedent) is int and antecedent == 0:  # have to do it this way because bool vars in CP == 0
+                return None
+            elif antecedent is True or (type(antecedent) is int and antecedent == 1):
+                continue
+            enforcement_literals.append(antecedent)
+        return enforcement_literals
+
+    def __add_clause(self, enforcement_literals: List[Any], consequent_literals: List[Any]) -> Any:
+        # (a1 and a2 and ...) => (c1 or c2 or ...), as a single clause that CP-SAT propagates natively
+        if len(enforcement_literals) == 1 and len(consequent_literals) == 1:
+            return self.AddImplication(enforcement_literals[0], consequent_literals[0])
+        return self.AddBoolOr([literal.Not() for literal in enforcement_literals] + consequent_literals)
+
     def add_implication(self, *args) -> Any:
         # intended call: .AddChainedImplication(antecedent1, antecedent2, ..., consequent)
         if len(args) < 2:
@@ -33,25 +96,67 @@ class CpModel(abstract.Model, cp_model.CpModel):
             consequent = args[-1]
             antecedents = list(args[:-1])
 
-        for antecedent in antecedents:
-            if type(antecedent) is int and antecedent == 0:  # have to do it this way because bool vars in CP == 0
-                return None
-        else:
-            if type(consequent) is not cp_model.BoundedLinearExpression:
-                constraint = self.add_constraint(consequent != int(False))
-            else:
-                constraint = self.add_constraint(consequent)
+        enforcement_literals = self.__enforcement_literals(antecedents)
+        if enforcement_literals is None:
+            return None
 
-            constraint = constraint.OnlyEnforceIf([x for x in antecedents
-                    if x is not True and not (type(x) is int and x == 1)])
+        consequent_literal = self.__as_literal(consequent)
+        if consequent_literal is not None:
+            return self.__add_clause(enforcement_literals, [consequent_literal])
 
-            return constraint
+        if type(consequent) is not cp_model.BoundedLinearExpression:
+            constraint = self.add_constraint(consequent != int(False))
+        else:
+            constraint = self.add_constraint(consequent)
+        return constraint.OnlyEnforceIf(enforcement_literals)
 
     def add_equal_to_zero_implication(self, *args) -> Any:
-        return self.add_implication(*args[:-1], args[-1] == 0)
+        enforcement_literals = self.__enforcement_literals(list(args[:-1]))
+        if enforcement_literals is None:
+            return None
+
+        consequent = args[-1]
+        consequent_literals = self.__as_sum_of_literals(consequent)
+        if consequent_literals is not None:
+            # a sum of literals is zero exactly when every literal is false
+            return self.AddBoolAnd([literal.Not() for literal in consequent_literals])\
+                .OnlyEnforceIf(enforcement_literals)
+        return self.AddLinearConstraint(consequent, 0, 0).OnlyEnforceIf(enforcement_literals)
 
     def add_greater_than_zero_implication(self, *args) -> Any:
-        return self.add_implication(*args[:-1], args[-1] > 0)
+        enforcement_literals = self.__enforcement_literals(list(args[:-1]))
+        if enforcement_literals is None:
+            return None
+
+        consequent = args[-1]
+        consequent_literals = self.__as_sum_of_literals(consequent)
+        if consequent_literals is not None:
+            # a sum of literals is positive exactly when some literal is true
+            return self.__add_clause(enforcement_literals, consequent_literals)
+        return self.AddLinearConstraint(consequent, 1, cp_model.INT_MAX).OnlyEnforceIf(enforcement_literals)
+
+    def add_multiplication_equality(self, target: Any, first_factor: Any, second_factor: Any) -> Any:
+        return self.AddMultiplicationEquality(target, [first_factor, second_factor])
+
+    def add_hint(self, var: cp_model.IntVar, value: int) -> None:
+        self.AddHint(var, value)
+
+    def clear_hints(self) -> None:
+        self.ClearHints()
+
+    def set_var_upper_bound(self, var: cp_model.IntVar, value: int) -> None:
+        var.Proto().domain[-1] = value
+
+    def set_constraint_upper_bound(self, constraint: cp_model.Constraint, value: int) -> None:
+        constraint.Proto().linear.domain[-1] = value
+
+    def size(self) -> Tuple[int, int, int]:
+        model_proto = self.Proto()
+        return (
+            len(model_proto.variables),
+            len(model_proto.constraints),
+            sum(number_of_occurrences(constraint) for constraint in model_proto.constraints),
+        )
 
     def minimize(self, *args, **kargs) -> None:
         self.Minimize(*args, **kargs)
@@ -61,20 +166,59 @@ class CpModel(abstract.Model, cp_model.CpModel):
 
 
 class Solver(abstract.SolverAdapter):
-    def __init__(self):
-        super().__init__()
+    # symmetries are detected in presolve and also exploited during the search
+    SYMMETRY_LEVEL = 4
+    # with several processes, solve_all splits the search into about this many cubes per process, so that a process
+    #  that finishes an easy cube early can take another one
+    CUBES_PER_PROCESS = 8
+    # how often (in seconds) a parallel search checks whether it was stopped
+    STOP_POLL_INTERVAL = 0.1
+
+    def __init__(
+            self,
+            solution_directory: Optional[str] = None,
+            checkpoint_filename: Optional[str] = None,
+            processes: int = 1,
+            streaming: bool = False,
+            metrics: Optional[Metrics] = None,
+    ):
+        # if solution_directory is given, solve_all keeps the solutions on disk in that directory (see SolutionStore)
+        #  instead of in memory, and they are read back as they are iterated over; if checkpoint_filename is given,
+        #  solve_all saves the solutions to that file as it finds them, and resumes from it (see Checkpoint); with
+        #  several processes, solve_all enumerates disjoint parts of the search space in parallel (see search_cube);
+        #  if streaming is True, solve_all searches in a background thread and yields the solutions as they are
+        #  found, instead of after the search (and does not keep them)
+        super().__init__(metrics)
         self.__internal_solver = None
+        self.__solution_directory = solution_directory
+        self.__checkpoint_filename = checkpoint_filename
+        self.__processes = processes
+        self.__streaming = streaming
+        self.__stopped = False
+        # the functions which stop the searches that are running
+        self.__search_stoppers: List[Callable[[], None]] = []
 
     @staticmethod
     def model() -> abstract.Model:
         return CpModel()
 
     def solve(self, model: abstract.Model, variables_with_values_to_keep: List[Any], verbose: bool = False) -> Any:
-        self.__internal_solver = cp_model.CpSolver()
-        self.__internal_solver.parameters.log_search_progress = verbose
-        status = self.__internal_solver.Solve(model)
+        self.__internal_solver = self.__new_internal_solver(verbose)
+        if model.detect_symmetries():
+            self.__internal_solver.parameters.symmetry_level = self.SYMMETRY_LEVEL
+        status = self.__run_search(self.__internal_solver, model, SearchStopper())
         return status
 
+    def solve_with_intermediate_solutions(
+            self, model: abstract.Model, variables_with_values_to_keep: List[Any], verbose: bool = False
+    ) -> Tuple[Any, List[Dict[Any, int]]]:
+        # like solve, but also returns every improving solution that was found along the way (the last is the best)
+        self.__internal_solver = self.__new_internal_solver(verbose)
+        found_solutions = []
+        solution_accumulator = SolutionAccumulator(variables_with_values_to_keep, found_solutions)
+        status = self.__run_search(self.__internal_solver, model, solution_accumulator)
+        return status, found_solutions
+
     def value(self, var: Union[int, cp_model.IntVar]) -> int:
         if isinstance(var, int):
             return var
@@ -83,19 +227,341 @@ class Solver(abstract.SolverAdapter):
 
     def solve_all(self, model: abstract.Model, variables_with_values_to_keep, verbose: bool = False)\
             -> Iterator[Dict[Any, int]]:
-        internal_solver = cp_model.CpSolver()
-        internal_solver.parameters.log_search_progress = verbose
+        internal_solver = self.__new_internal_solver(verbose)
+        if model.detect_symmetries():
+            internal_solver.parameters.symmetry_level = self.SYMMETRY_LEVEL
 
-        found_solutions = []
-        solution_accumulator = SolutionAccumulator(variables_with_values_to_keep, found_solutions)
-        status = internal_solver.SearchForAllSolutions(model, solution_accumulator)
+        if self.__streaming:
+            found_solutions = []  # only the saved solutions of a checkpoint
+            row_callbacks = []
+        elif self.__solution_directory is not None:
+            found_solutions = SolutionStore(len(variables_with_values_to_keep), directory=self.__solution_directory)
+            row_callbacks = [found_solutions.append]
+        else:
+            found_solutions = []
+            row_callbacks = [found_solutions.append]
+
+        checkpoint = None
+        if self.__checkpoint_filename is not None:
+            # the fingerprint is taken before the saved solutions are excluded
+            checkpoint = Checkpoint(self.__checkpoint_filename)
+            saved_solutions, complete = checkpoint.resume(
+                Checkpoint.fingerprint(model.Proto().SerializeToString(deterministic=True))
+            )
+            for row in saved_solutions:
+                found_solutions.append(row)
+            if complete:
+                return self.__solutions_from_rows(found_solutions, variables_with_values_to_keep)
+            self.__exclude_solutions(model, variables_with_values_to_keep, saved_solutions)
+            row_callbacks.append(checkpoint.record)
+
+        if self.__streaming:
+            return self.__stream_solutions(
+                model, internal_solver, variables_with_values_to_keep, found_solutions, row_callbacks, checkpoint
+            )
+
+        try:
+            status = self.__search_rows(model, internal_solver, variables_with_values_to_keep, row_callbacks)
+        finally:
+            if checkpoint is not None:
+                checkpoint.save()
+
+        if status == cp_model.INFEASIBLE and len(found_solutions) > 0:
+            status = cp_model.OPTIMAL  # the saved solutions were all of the solutions
+        if status == cp_model.OPTIMAL and checkpoint is not None:
+            checkpoint.complete()
 
         if status == cp_model.INFEASIBLE:
+            if self.__solution_directory is not None:
+                found_solutions.close()
             return iter(())
         elif status != cp_model.OPTIMAL:
+            if self.__solution_directory is not None:
+                found_solutions.close()
+            raise AssertionError(f"OR-Tools returned code {status}, but expected {cp_model.OPTIMAL}")
+
+        return self.__solutions_from_rows(found_solutions, variables_with_values_to_keep)
+
+    def __new_internal_solver(self, verbose: bool) -> cp_model.CpSolver:
+        internal_solver = cp_model.CpSolver()
+        internal_solver.parameters.log_search_progress = verbose
+        if self.metrics is not None:
+            # CP-SAT only reports the presolve time in its log (see search_statistics)
+            internal_solver.parameters.log_search_progress = True
+            internal_solver.parameters.log_to_stdout = verbose
+            internal_solver.parameters.log_to_response = True
+        return internal_solver
+
+    def stop_search(self) -> None:
+        self.__stopped = True
+        self.__stop_running_searches()
+
+    def __stop_running_searches(self) -> None:
+        for stop in list(self.__search_stoppers):
+            stop()
+
+    def __run_search(
+            self,
+            internal_solver: cp_model.CpSolver,
+            model: CpModel,
+            callback: cp_model.CpSolverSolutionCallback,
+            enumerate_all: bool = False,
+    ) -> int:
+        # the search is stopped through its callback, since CpSolver.StopSearch has no effect in some versions of
+        #  OR-Tools; a search that starts after stop_search is given no time
+        self.__search_stoppers.append(callback.StopSearch)
+        try:
+            if self.__stopped:
+                internal_solver.parameters.max_time_in_seconds = 0.0
+            if enumerate_all:
+                status = internal_solver.SearchForAllSolutions(model, callback)
+            else:
+                status = internal_solver.Solve(model, callback)
+        finally:
+            self.__search_stoppers.remove(callback.StopSearch)
+        if self.metrics is not None:
+            self.metrics.record_search(search_statistics(internal_solver, model.Proto()))
+        return status
+
+    def __search_rows(
+            self,
+            model: CpModel,
+            internal_solver: cp_model.CpSolver,
+            variables_with_values_to_keep: List[Any],
+            row_callbacks: List[Callable[[List[int]], None]],
+    ) -> int:
+        # enumerates the solutions, passing each to the row callbacks; returns the status of the search
+        if self.__processes > 1:
+            return self.__search_in_parallel(model, variables_with_values_to_keep, row_callbacks)
+        solution_accumulator = RowAccumulator(variables_with_values_to_keep, row_callbacks)
+        return self.__run_search(internal_solver, model, solution_accumulator, enumerate_all=True)
+
+    def __stream_solutions(
+            self,
+            model: CpModel,
+            internal_solver: cp_model.CpSolver,
+            variables_with_values_to_keep: List[Any],
+            saved_solutions: List[List[int]],
+            row_callbacks: List[Callable[[List[int]], None]],
+            checkpoint: Optional[Checkpoint],
+    ) -> Iterator[Dict[Any, int]]:
+        # the search runs in a background thread and passes its rows through a queue; None marks the end
+        for row in saved_solutions:
+            yield dict(zip(variables_with_values_to_keep, row))
+
+        rows = queue.Queue()
+        outcome = {}
+
+        def search() -> None:
+            try:
+                outcome["status"] = self.__search_rows(
+                    model, internal_solver, variables_with_values_to_keep, row_callbacks + [rows.put]
+                )
+            except Exception as error:
+                outcome["error"] = error
+            finally:
+                rows.put(None)
+
+        search_thread = threading.Thread(target=search, daemon=True)
+        search_thread.start()
+        number_of_solutions = len(saved_solutions)
+        try:
+            while True:
+                row = rows.get()
+                if row is None:
+                    break
+                number_of_solutions += 1
+                yield dict(zip(variables_with_values_to_keep, row))
+        finally:
+            if search_thread.is_alive():  # the solutions are no longer needed
+                self.__stop_running_searches()
+            search_thread.join()
+            if checkpoint is not None:
+                checkpoint.save()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        status = outcome["status"]
+        if status == cp_model.INFEASIBLE and number_of_solutions > 0:
+            status = cp_model.OPTIMAL  # the saved solutions were all of the solutions
+        if status == cp_model.OPTIMAL and checkpoint is not None:
+            checkpoint.complete()
+        elif status not in [cp_model.OPTIMAL, cp_model.INFEASIBLE]:
             raise AssertionError(f"OR-Tools returned code {status}, but expected {cp_model.OPTIMAL}")
 
-        return iter(found_solutions)
+    def __search_in_parallel(
+            self,
+            model: CpModel,
+            variables_with_values_to_keep: List[Any],
+            row_callbacks: List[Callable[[List[int]], None]],
+    ) -> int:
+        # cube and conquer: the cubes partition the search space, so every solution is found in exactly one cube; the
+        #  rows of each cube are passed on in the order of the cubes, as soon as that cube and those before it are done
+        positions = [k for k, var in enumerate(variables_with_values_to_keep) if not isinstance(var, int)]
+        variable_indices = [variables_with_values_to_keep[k].Index() for k in positions]
+        model_as_bytes = model.Proto().SerializeToString()
+        cubes = split_into_cubes(model.Proto(), variable_indices, self.CUBES_PER_PROCESS * self.__processes)
+        cube_arguments = [
+            (model_as_bytes, variable_indices, cube, model.detect_symmetries(), self.metrics is not None)
+            for cube in cubes
+        ]
+
+        statuses = set()
+        stop_event = threading.Event()
+        self.__search_stoppers.append(stop_event.set)
+        if self.__stopped:
+            stop_event.set()
+        try:
+            with multiprocessing.Pool(min(self.__processes, len(cubes))) as pool:
+                results = pool.imap(search_cube, cube_arguments)
+                for _ in cubes:
+                    status, cube_rows, statistics = None, None, None
+                    while status is None:
+                        if stop_event.is_set():
+                            return cp_model.UNKNOWN  # the workers are terminated as the pool is closed
+                        try:
+                            status, cube_rows, statistics = results.next(timeout=self.STOP_POLL_INTERVAL)
+                        except multiprocessing.TimeoutError:
+                            pass
+                    statuses.add(status)
+                    if statistics is not None:
+                        self.metrics.record_search(statistics)
+                    for values in cube_rows:
+                        row = list(variables_with_values_to_keep)
+                        for k, value in zip(positions, values):
+                            row[k] = value
+                        for row_callback in row_callbacks:
+                            row_callback(row)
+        finally:
+            self.__search_stoppers.remove(stop_event.set)
+
+        unexpected_statuses = statuses - {cp_model.OPTIMAL, cp_model.INFEASIBLE}
+        if unexpected_statuses:
+            return unexpected_statuses.pop()
+        elif cp_model.OPTIMAL in statuses:
+            return cp_model.OPTIMAL
+        else:
+            return cp_model.INFEASIBLE
+
+    @staticmethod
+    def __exclude_solutions(model: CpModel, variables_with_values_to_keep: List[Any], rows: List[List[int]]) -> None:
+        # no-good constraints on the variables (the other entries of the rows are constants)
+        positions = [k for k, var in enumerate(variables_with_values_to_keep) if not isinstance(var, int)]
+        if rows and positions:
+            model.AddForbiddenAssignments(
+                [variables_with_values_to_keep[k] for k in positions],
+                [[row[k] for k in positions] for row in rows],
+            )
+
+    @staticmethod
+    def __solutions_from_rows(rows: Union[List[List[int]], SolutionStore], variables_with_values_to_keep: List[Any]) \
+            -> Iterator[Dict[Any, int]]:
+        # the solutions are converted to dictionaries as they are iterated over; the files of a solution store are
+        #  removed once the solutions have been iterated over (or the iterator is discarded)
+        try:
+            for row in (rows.rows() if isinstance(rows, SolutionStore) else rows):
+                yield dict(zip(variables_with_values_to_keep, row))
+        finally:
+            if isinstance(rows, SolutionStore):
+                rows.close()
+
+
+def split_into_cubes(model_proto: Any, variable_indices: List[int], number_of_cubes: int) \
+        -> List[List[Tuple[int, int, int]]]:
+    """
+    splits the search space into at least number_of_cubes disjoint cubes (if the domains allow it), where a cube is a
+      list of (variable index, lower bound, upper bound) restrictions; the variables are split in the given order
+      (for the matrix formulations, the composition of the first polymer comes first), each into as many contiguous
+      ranges of its domain as are still needed.  Every assignment lies in exactly one cube
+    """
+    cubes = [[]]
+    for variable_index in variable_indices:
+        if len(cubes) >= number_of_cubes:
+            break
+        domain = model_proto.variables[variable_index].domain
+        lower_bound, upper_bound = domain[0], domain[-1]
+        if lower_bound == upper_bound:
+            continue
+        number_of_ranges = min(upper_bound - lower_bound + 1, ceil(number_of_cubes / len(cubes)))
+        range_size = ceil((upper_bound - lower_bound + 1) / number_of_ranges)
+        ranges = [
+            (start, min(start + range_size - 1, upper_bound))
+            for start in range(lower_bound, upper_bound + 1, range_size)
+        ]
+        cubes = [cube + [(variable_index, start, stop)] for cube in cubes for start, stop in ranges]
+    return cubes
+
+
+def search_cube(arguments: Tuple[bytes, List[int], List[Tuple[int, int, int]], bool, bool]) \
+        -> Tuple[int, List[List[int]], Optional[Dict[str, Any]]]:
+    """
+    enumerates the solutions of the serialized model within one cube (see split_into_cubes), in a worker process;
+      returns the status, the values of the variables with the given indices for every solution, and the statistics
+      of the search if they were asked for
+    """
+    model_as_bytes, variable_indices, cube, detect_symmetries, collect_statistics = arguments
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(model_as_bytes)
+    for variable_index, lower_bound, upper_bound in cube:
+        model.AddLinearConstraint(model.GetIntVarFromProtoIndex(variable_index), lower_bound, upper_bound)
+
+    internal_solver = cp_model.CpSolver()
+    if detect_symmetries:
+        internal_solver.parameters.symmetry_level = Solver.SYMMETRY_LEVEL
+    if collect_statistics:
+        internal_solver.parameters.log_search_progress = True
+        internal_solver.parameters.log_to_stdout = False
+        internal_solver.parameters.log_to_response = True
+    variables = [model.GetIntVarFromProtoIndex(variable_index) for variable_index in variable_indices]
+    rows = []
+    status = internal_solver.SearchForAllSolutions(model, RowAccumulator(variables, [rows.append]))
+    return status, rows, search_statistics(internal_solver, model.Proto()) if collect_statistics else None
+
+
+def search_statistics(internal_solver: cp_model.CpSolver, model_proto: Any) -> Dict[str, Any]:
+    """
+    the statistics of the last search of the solver; the presolve time (with the resolution of the log, 0.01 s) is
+      None unless the search was logged to its response and the log shows the end of the presolve (e.g. not when the
+      presolve alone proves the model infeasible), and the best bound is None without an objective
+    """
+    response = internal_solver.ResponseProto()
+    return {
+        "solver": "CP-SAT",
+        "status": internal_solver.StatusName(response.status),
+        "wall_time": response.wall_time,
+        "user_time": response.user_time,
+        "deterministic_time": response.deterministic_time,
+        "branches": response.num_branches,
+        "conflicts": response.num_conflicts,
+        "presolve_time": presolve_time(response.solve_log),
+        "best_bound": response.best_objective_bound if model_proto.HasField("objective") else None,
+    }
+
+
+def presolve_time(solve_log: str) -> Optional[float]:
+    # from the time at which the presolve starts to the time at which the next step starts
+    match = re.search(r"^Starting presolve at ([0-9.]+)s$.*?^Starting [^\n]* at ([0-9.]+)s$", solve_log, re.M | re.S)
+    if match is None:
+        return None
+    return float(match.group(2)) - float(match.group(1))
+
+
+def number_of_occurrences(message: Any) -> int:
+    # the number of references to variables (or literals) in a constraint of a model proto, or in a part of it
+    count = 0
+    for field, value in message.ListFields():
+        if field.message_type is not None:
+            parts = [value] if hasattr(value, "ListFields") else value  # a message, or a list of them
+            count += sum(number_of_occurrences(part) for part in parts)
+        elif field.name in ["vars", "literals", "enforcement_literal"]:
+            count += len(value)
+    return count
+
+
+class SearchStopper(cp_model.CpSolverSolutionCallback):
+    # does nothing with the solutions; passed to a search only so that it can be stopped (see Solver.stop_search)
+    def on_solution_callback(self) -> None:
+        pass
 
 
 class SolutionAccumulator(cp_model.CpSolverSolutionCallback):
@@ -111,3 +577,17 @@ class SolutionAccumulator(cp_model.CpSolverSolutionCallback):
     def on_solution_callback(self) -> None:
         this_solution = {v: self.Value(v) for v in self.__variables_with_values_to_keep}
         self.__found_solutions.append(this_solution)
+
+
+class RowAccumulator(cp_model.CpSolverSolutionCallback):
+    # like SolutionAccumulator, but passes each solution as a row of values (in the order of the variables) to every
+    #  callback, e.g. to append it to a list or a SolutionStore
+    def __init__(self, variables_with_values_to_keep: List[Any], row_callbacks: List[Callable[[List[int]], None]]):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.__variables_with_values_to_keep = variables_with_values_to_keep
+        self.__row_callbacks = row_callbacks
+
+    def on_solution_callback(self) -> None:
+        row = [self.Value(v) for v in self.__variables_with_values_to_keep]
+        for row_callback in self.__row_callbacks:
+            row_callback(row)
@@ -1,27 +1,63 @@
-from typing import Any, Iterator, Dict, List, Union
-from ortools.linear_solver import pywraplp
+from typing import Any, Iterator, Dict, List, Optional, Tuple, Union
+from math import ceil, isinf
+import time
+from ortools.linear_solver import pywraplp, linear_solver_pb2
 from source.solver_adapters import abstract
+from source.metrics import Metrics
+
+STATUS_NAMES = {
+    pywraplp.Solver.OPTIMAL: "OPTIMAL",
+    pywraplp.Solver.FEASIBLE: "FEASIBLE",
+    pywraplp.Solver.INFEASIBLE: "INFEASIBLE",
+    pywraplp.Solver.UNBOUNDED: "UNBOUNDED",
+    pywraplp.Solver.ABNORMAL: "ABNORMAL",
+    pywraplp.Solver.NOT_SOLVED: "NOT_SOLVED",
+}
 
 
 class IpModel(abstract.Model, pywraplp.Solver):
-    def __init__(self):
+    def __init__(self, relaxed: bool = False):
+        # if relaxed is True, this is the linear programming relaxation: all variables are continuous, and the model
+        #  is solved with GLOP, so that dual values are available
         # calling superclasses explicitly here because of multiple inheritance
         abstract.Model.__init__(self)
-        pywraplp.Solver.__init__(self, "stable_tbn-ip-model", pywraplp.Solver.SCIP_MIXED_INTEGER_PROGRAMMING)
+        if relaxed:
+            pywraplp.Solver.__init__(self, "stable_tbn-lp-model", pywraplp.Solver.GLOP_LINEAR_PROGRAMMING)
+        else:
+            pywraplp.Solver.__init__(self, "stable_tbn-ip-model", pywraplp.Solver.SCIP_MIXED_INTEGER_PROGRAMMING)
+        self.__relaxed = relaxed
         self.__id_counter = 0
+        self.__hint_vars = []
+        self.__hint_values = []
         self.OPTIMAL = pywraplp.Solver.OPTIMAL
         self.INFEASIBLE = pywraplp.Solver.INFEASIBLE
 
+    def size(self) -> Tuple[int, int, int]:
+        model_proto = linear_solver_pb2.MPModelProto()
+        self.ExportModelToProto(model_proto)
+        return (
+            self.NumVariables(),
+            self.NumConstraints(),
+            sum(len(constraint.var_index) for constraint in model_proto.constraint),
+        )
+
     def __get_id(self) -> int:
         self.__id_counter += 1
         return self.__id_counter
 
     def int_var(self, *args, **kargs) -> pywraplp.Variable:
+        if self.__relaxed:
+            return self.NumVar(*args, **kargs)
         return self.IntVar(*args, **kargs)
 
     def bool_var(self, *args, **kargs) -> pywraplp.Variable:
+        if self.__relaxed:
+            return self.NumVar(0, 1, *args, **kargs)
         return self.BoolVar(*args, **kargs)
 
+    def relaxed(self) -> bool:
+        return self.__relaxed
+
     def complement_var(self, var: pywraplp.Variable) -> Any:
         return -var + 1
 
@@ -31,6 +67,28 @@ class IpModel(abstract.Model, pywraplp.Solver):
         else:
             return int(self._big_M)
 
+    def __get_big_m_values(self, expression: Any) -> Tuple[int, int]:
+        # returns local big M values (M-, M+) with -M- <= expression <= M+, computed from the variable bounds;
+        #  falls back to the global big M value if the expression is not bounded
+        if isinstance(expression, (int, float)):
+            return max(0, int(-expression)), max(0, int(expression))
+
+        lower_bound = upper_bound = 0.0
+        for var, coefficient in expression.GetCoeffs().items():
+            if isinstance(var, pywraplp.Variable):
+                low, high = coefficient * var.lb(), coefficient * var.ub()
+                lower_bound += min(low, high)
+                upper_bound += max(low, high)
+            else:  # constant offset
+                lower_bound += coefficient
+                upper_bound += coefficient
+
+        if isinf(lower_bound) or isinf(upper_bound):
+            big_m = self.__get_big_m()
+            return big_m, big_m
+        else:
+            return max(0, ceil(-lower_bound)), max(0, ceil(upper_bound))
+
     def add_constraint(self, *args) -> Any:
         return self.Add(*args)
 
@@ -54,7 +112,6 @@ class IpModel(abstract.Model, pywraplp.Solver):
     def add_equal_to_zero_implication(self, *args) -> Any:
         # intended call:
         #   .add_equal_to_zero_implication(antecedent1, antecedent2, ..., consequent, big_m = very_large_value)
-        big_m = self.__get_big_m()
         if len(args) < 2:
             raise AssertionError(
                 "Call to add_equal_to_zero_implication with less than two arguments.  Need antecedent and consequent"
@@ -62,12 +119,13 @@ class IpModel(abstract.Model, pywraplp.Solver):
         else:
             consequent = args[-1]
             antecedents = args[:-1]
+        big_m_below, big_m_above = self.__get_big_m_values(consequent)
 
         # delta will be the indicator for the zeroness of the consequent.
         # If consequent == 0, delta == True
         delta = self.bool_var(f'indicator_zero_{self.__get_id()}')
-        self.add_constraint(consequent <= big_m * (-delta + 1))
-        self.add_constraint(consequent >= -big_m * (-delta + 1))
+        self.add_constraint(consequent <= big_m_above * (-delta + 1))
+        self.add_constraint(consequent >= -big_m_below * (-delta + 1))
 
         # for p => (q => delta), change to delta + (1-p) + (1-q) >= 1.  for more antecedents, extrapolate
         boolean_complement_sum: pywraplp.Variable = sum(self.complement_var(antecedent) for antecedent in antecedents)
@@ -77,7 +135,6 @@ class IpModel(abstract.Model, pywraplp.Solver):
     def add_greater_than_zero_implication(self, *args) -> Any:
         # intended call:
         #   .add_greater_than_zero_implication(antecedent1, antecedent2, ..., consequent, big_m = very_large_value)
-        big_m = self.__get_big_m()
         if len(args) < 2:
             raise AssertionError(
                 "Call to add_greater_than_zero_implication with less than two arguments."
@@ -85,16 +142,56 @@ class IpModel(abstract.Model, pywraplp.Solver):
         else:
             consequent = args[-1]
             antecedents = args[:-1]
+        big_m_below, _ = self.__get_big_m_values(consequent)
 
         # delta will be the indicator for consequent greater than zero (e.g. if consequent > 0, delta == True)
         delta = self.bool_var(f'indicator_gt_zero_{self.__get_id()}')
-        self.add_constraint(consequent >= 1 - (big_m * (-delta + 1)))
+        self.add_constraint(consequent >= 1 - ((big_m_below + 1) * (-delta + 1)))
 
         # for p => (q => delta), change to delta + (1-p) + (1-q) >= 1.  for more antecedents, extrapolate
         boolean_complement_sum: pywraplp.Variable = sum(self.complement_var(antecedent) for antecedent in antecedents)
         constraint = self.add_constraint(delta + boolean_complement_sum >= 1)
         return constraint
 
+    def add_multiplication_equality(self, target: Any, first_factor: pywraplp.Variable,
+                                    second_factor: pywraplp.Variable) -> Any:
+        # the product is linearized by a binary expansion of the second factor:
+        #   second_factor = sum(2^t * bit_t), and each partial product bit_t * first_factor is a bounded variable
+        upper_bound_of_first_factor = int(first_factor.ub())
+        number_of_bits = int(second_factor.ub()).bit_length()
+        product_id = self.__get_id()
+
+        bits = [self.bool_var(f'product_bit_{product_id}_{t}') for t in range(number_of_bits)]
+        self.add_constraint(second_factor == sum(2**t * bit for t, bit in enumerate(bits)))
+
+        partial_products = []
+        for t, bit in enumerate(bits):
+            partial_product = self.int_var(0, upper_bound_of_first_factor, f'partial_product_{product_id}_{t}')
+            self.add_constraint(partial_product <= upper_bound_of_first_factor * bit)
+            self.add_constraint(partial_product <= first_factor)
+            self.add_constraint(partial_product >= first_factor - upper_bound_of_first_factor * (-bit + 1))
+            partial_products.append(partial_product)
+
+        return self.add_constraint(target == sum(2**t * w for t, w in enumerate(partial_products)))
+
+    def add_hint(self, var: pywraplp.Variable, value: int) -> None:
+        # SetHint replaces any previous hint, so the hints are collected here and set once by the solver adapter
+        self.__hint_vars.append(var)
+        self.__hint_values.append(value)
+
+    def hints(self) -> Tuple[List[pywraplp.Variable], List[int]]:
+        return self.__hint_vars, self.__hint_values
+
+    def clear_hints(self) -> None:
+        self.__hint_vars = []
+        self.__hint_values = []
+
+    def set_var_upper_bound(self, var: pywraplp.Variable, value: int) -> None:
+        var.SetUb(value)
+
+    def set_constraint_upper_bound(self, constraint: pywraplp.Constraint, value: int) -> None:
+        constraint.SetUb(value)
+
     def minimize(self, *args, **kargs) -> None:
         self.Minimize(*args, **kargs)
 
@@ -103,15 +200,24 @@ class IpModel(abstract.Model, pywraplp.Solver):
 
 
 class Solver(abstract.SolverAdapter):
-    @staticmethod
-    def model() -> abstract.Model:
-        return IpModel()
+    def __init__(self, relaxed: bool = False, metrics: Optional[Metrics] = None):
+        # if relaxed is True, every model is the linear programming relaxation (see IpModel)
+        super().__init__(metrics)
+        self.__relaxed = relaxed
+
+    def model(self) -> abstract.Model:
+        return IpModel(relaxed=self.__relaxed)
 
     def solve(self, model: Union[abstract.Model, IpModel],
               variables_with_values_to_keep: List[Any], verbose: bool = False) -> Any:
         if verbose:
             model.EnableOutput()
+        hint_vars, hint_values = model.hints()
+        model.SetHint(hint_vars, hint_values)  # also clears the hint of a previous solve if there are none now
+        tic = time.perf_counter()
         status = model.Solve()
+        if self.metrics is not None:
+            self.metrics.record_search(search_statistics(model, status, time.perf_counter() - tic))
         return status
 
     def value(self, var: Union[int, pywraplp.Variable]) -> int:
@@ -120,6 +226,26 @@ class Solver(abstract.SolverAdapter):
         else:
             return int(var.solution_value())
 
+    @staticmethod
+    def objective_value(model: IpModel) -> float:
+        return model.Objective().Value()
+
     def solve_all(self, model: abstract.Model, variables_with_values_to_keep: List[Any], verbose: bool = False)\
             -> Iterator[Dict[Any, int]]:
         raise NotImplementedError("Not implemented to query the complete solution set using IP")
+
+
+def search_statistics(model: IpModel, status: int, wall_time: float) -> Dict[str, Any]:
+    # the bound of a linear program is its optimal value; the node count is only available for integer programs
+    statistics = {
+        "solver": "GLOP" if model.relaxed() else "SCIP",
+        "status": STATUS_NAMES.get(status, str(status)),
+        "wall_time": wall_time,
+        "iterations": model.iterations(),
+    }
+    if model.relaxed():
+        statistics["best_bound"] = model.Objective().Value() if status == model.OPTIMAL else None
+    else:
+        statistics["nodes"] = model.nodes()
+        statistics["best_bound"] = model.Objective().BestBound()
+    return statistics
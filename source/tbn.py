@@ -1,7 +1,10 @@
 import re
 from math import inf as infinity
 from math import isnan as not_a_number
-from typing import Dict, Iterator, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np  # imported by the array methods themselves, so that parsing does not load NumPy
 
 from source.monomer import Monomer
 from source.domain import Domain
@@ -9,6 +12,9 @@ from source.positive_multiset import PositiveMultiset
 
 
 class Tbn:
+    # the monomer inside the brackets is checked by Monomer.from_string()
+    __quantity_search_pattern = re.compile(r"^(|inf|[1-9]\d*)\[\s*(.*?)\s*\]$")
+
     def __init__(self, monomer_counts: Dict[Monomer, Union[int, float]]):
         self.__monomer_counts = PositiveMultiset(Monomer, monomer_counts, allow_infinity=True)
 
@@ -51,31 +57,181 @@ class Tbn:
 
     @classmethod
     def from_string(cls, text) -> "Tbn":
+        return cls.from_lines(text.split('\n'))
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "Tbn":
+        """
+        parses one line at a time, so that a file can be read incrementally (e.g. Tbn.from_lines(open_file));
+          parsing errors report the line number
+        """
         monomer_counts = {}
+        # repeated monomer and domain strings are only parsed once; the tables only last for this parse
+        interned_monomers = {}
+        interned_domains = {}
 
-        for raw_line in text.split('\n'):
+        for line_number, raw_line in enumerate(lines, start=1):
             line = raw_line.strip()
             if line:  # not just whitespace
-                quantity_search_result = re.match(
-                    f"^(|inf|[1-9]\\d*)\\[\\s*({Monomer.regex()})\\s*\\]$", line
-                )
-                if quantity_search_result:
-                    raw_count, monomer_string = quantity_search_result.groups()
-                    if raw_count == "inf":
-                        count = infinity
-                    elif raw_count == "":
-                        count = 1
-                    else:
-                        count = int(raw_count)
-                else:
-                    count = 1
-                    monomer_string = line
-
-                monomer = Monomer.from_string(monomer_string)
+                try:
+                    count, monomer = cls.__parse_line(line, interned_monomers, interned_domains)
+                except AssertionError as error:
+                    raise AssertionError(f"line {line_number}: {error}") from error
                 monomer_counts[monomer] = monomer_counts.get(monomer, 0) + count
 
         return Tbn(monomer_counts)
 
+    @classmethod
+    def __parse_line(
+            cls, line: str, interned_monomers: Dict[Any, Monomer], interned_domains: Dict[str, Domain]
+    ) -> Tuple[Union[int, float], Monomer]:
+        quantity_search_result = cls.__quantity_search_pattern.match(line) if line.endswith("]") else None
+        if quantity_search_result:
+            raw_count, monomer_string = quantity_search_result.groups()
+            if raw_count == "inf":
+                count = infinity
+            elif raw_count == "":
+                count = 1
+            else:
+                count = int(raw_count)
+        else:
+            count = 1
+            monomer_string = line
+
+        return count, Monomer.from_string(
+            monomer_string, interned_monomers=interned_monomers, interned_domains=interned_domains
+        )
+
+    @classmethod
+    def from_arrays(
+            cls,
+            domain_names: Sequence[str],
+            monomer_names: Optional[Sequence[Optional[str]]],
+            count_matrix: Any,
+            monomer_counts: Sequence[Union[int, float]],
+    ) -> "Tbn":
+        """
+        builds a tbn from a matrix of domain counts with one row per monomer type and one column per domain type
+          (starred and unstarred domains are separate columns), and the count of each monomer type (which may be
+          infinite), without formatting or parsing any text.  The matrix is either dense, or in CSR form: a tuple
+          (data, indices, indptr), or an object with those attributes (e.g. a scipy.sparse.csr_matrix).  Monomer
+          types without a name (None) get the usual generated name, and identical monomer types are combined
+        """
+        import numpy as np
+
+        number_of_monomer_types = len(monomer_counts)
+        if monomer_names is None:
+            monomer_names = [None] * number_of_monomer_types
+        elif len(monomer_names) != number_of_monomer_types:
+            raise AssertionError(
+                f"got {len(monomer_names)} monomer names but {number_of_monomer_types} monomer counts"
+            )
+        if len(set(domain_names)) != len(domain_names):
+            raise AssertionError("domain names must be distinct")
+        data, indices, indptr = cls.__as_csr(count_matrix, number_of_monomer_types, len(domain_names))
+
+        counts = np.asarray(monomer_counts, dtype=float).reshape(number_of_monomer_types)
+        if np.any(np.isnan(counts)) or np.any(counts < 1) or \
+                np.any((counts != np.floor(counts)) & np.isfinite(counts)):
+            raise AssertionError("monomer counts must be positive integers or infinity")
+        if np.any(np.diff(indptr) == 0):
+            raise AssertionError(f"monomer type {int(np.argmin(np.diff(indptr)))} has no domains")
+
+        domains = [Domain.from_string(domain_name) for domain_name in domain_names]
+        indices = indices.tolist()
+        data = data.tolist()
+        indptr = indptr.tolist()
+        monomer_counts_as_dict = {}
+        for m, (name, count) in enumerate(zip(monomer_names, counts.tolist())):
+            monomer = Monomer(
+                {domains[indices[entry]]: data[entry] for entry in range(indptr[m], indptr[m + 1])},
+                name,
+            )
+            count = infinity if count == infinity else int(count)
+            monomer_counts_as_dict[monomer] = monomer_counts_as_dict.get(monomer, 0) + count
+
+        return Tbn(monomer_counts_as_dict)
+
+    @staticmethod
+    def __as_csr(count_matrix: Any, number_of_rows: int, number_of_columns: int) \
+            -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        # returns (data, indices, indptr) of the matrix without explicit zeros, after checking its shape and entries
+        import numpy as np
+
+        if isinstance(count_matrix, tuple):
+            data, indices, indptr = (np.asarray(array) for array in count_matrix)
+        elif all(hasattr(count_matrix, attribute) for attribute in ["data", "indices", "indptr"]):
+            data, indices, indptr = (
+                np.asarray(count_matrix.data), np.asarray(count_matrix.indices), np.asarray(count_matrix.indptr)
+            )
+        else:
+            dense_matrix = np.asarray(count_matrix)
+            if dense_matrix.shape != (number_of_rows, number_of_columns):
+                raise AssertionError(
+                    f"count matrix has shape {dense_matrix.shape}, expected {(number_of_rows, number_of_columns)}"
+                )
+            rows, indices = np.nonzero(dense_matrix)
+            data = dense_matrix[rows, indices]
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=number_of_rows))])
+
+        if len(indptr) != number_of_rows + 1 or len(data) != len(indices) or indptr[-1] != len(data) or \
+                np.any(np.diff(indptr) < 0):
+            raise AssertionError(f"count matrix is not a valid CSR matrix with {number_of_rows} rows")
+        if len(indices) > 0 and (indices.min() < 0 or indices.max() >= number_of_columns):
+            raise AssertionError(f"count matrix has column indices outside of the {number_of_columns} domains")
+        if np.any(data < 0) or np.any(data != np.floor(data)):
+            raise AssertionError("domain counts must be non-negative integers")
+
+        # drop explicit zeros
+        data = data.astype(np.int64)
+        nonzero = data != 0
+        if not np.all(nonzero):
+            rows = np.repeat(np.arange(number_of_rows), np.diff(indptr))[nonzero]
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=number_of_rows))])
+            data = data[nonzero]
+            indices = indices[nonzero]
+        return data, indices.astype(np.int64), indptr.astype(np.int64)
+
+    def to_arrays(self, sparse: bool = False) \
+            -> Tuple[List[str], List[Optional[str]], Any, "np.ndarray"]:
+        """
+        returns (domain_names, monomer_names, count_matrix, monomer_counts) such that Tbn.from_arrays() builds this
+          tbn again; the count matrix is dense, or the tuple (data, indices, indptr) if sparse is True.  Monomer
+          types with a generated name have the name None, and the monomer counts are floats (so that they can be
+          infinite)
+        """
+        import numpy as np
+
+        monomer_types = list(self.monomer_types())
+        domain_counts_by_monomer = []
+        for monomer in monomer_types:
+            domain_counts = {}
+            for domain in monomer.as_explicit_list():
+                domain_counts[str(domain)] = domain_counts.get(str(domain), 0) + 1
+            domain_counts_by_monomer.append(domain_counts)
+        domain_names = sorted(set(name for domain_counts in domain_counts_by_monomer for name in domain_counts))
+        column_of_domain = {name: k for k, name in enumerate(domain_names)}
+
+        indptr = [0]
+        indices = []
+        data = []
+        for domain_counts in domain_counts_by_monomer:
+            for column, count in sorted((column_of_domain[name], count) for name, count in domain_counts.items()):
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+        data, indices, indptr = np.array(data, np.int64), np.array(indices, np.int64), np.array(indptr, np.int64)
+        if sparse:
+            count_matrix = (data, indices, indptr)
+        else:
+            count_matrix = np.zeros((len(monomer_types), len(domain_names)), np.int64)
+            count_matrix[np.repeat(np.arange(len(monomer_types)), np.diff(indptr)), indices] = data
+
+        # generated names are in brackets, which are not allowed in given names
+        monomer_names = [None if monomer.name().startswith("[") else monomer.name() for monomer in monomer_types]
+        monomer_counts = np.array([self.count(monomer) for monomer in monomer_types], float)
+        return domain_names, monomer_names, count_matrix, monomer_counts
+
     def monomer_types(self, flatten: bool = False) -> Iterator[Monomer]:
         for monomer in sorted(self.__monomer_counts):
             if flatten:
@@ -0,0 +1,96 @@
+"""
+A compact binary format for tbns (".tbnb" files), for networks that are loaded repeatedly.  The text format remains
+  the source of truth; a binary file is compiled from it (see lib.compile_tbn) and has to be compiled again after the
+  text file changes.
+
+Layout: the magic bytes, the length of the header (8 bytes, little-endian), a JSON header, and then the arrays of a
+  CSR matrix with one row per monomer type and one column per domain type (starred and unstarred domains are
+  separate columns), followed by the count of each monomer type.  Every array starts at a multiple of 8 bytes, and
+  the header records its offset, dtype and length, so that the arrays can be memory-mapped instead of read.
+"""
+from math import inf as infinity
+import json
+
+from source.tbn import Tbn
+
+MAGIC = b"TBNB"
+VERSION = 1
+# stands for an infinite count in the monomer count array
+INFINITE_COUNT = -1
+ALIGNMENT = 8
+
+
+def is_tbn_binary(filename: str) -> bool:
+    with open(filename, "rb") as binary_file:
+        return binary_file.read(len(MAGIC)) == MAGIC
+
+
+def write_tbn_binary(tbn: Tbn, filename: str) -> None:
+    import numpy as np  # imported here, so that checking for a binary file (see is_tbn_binary) does not load NumPy
+
+    domain_names, monomer_names, (data, indices, indptr), monomer_counts = tbn.to_arrays(sparse=True)
+    arrays = {
+        "indptr": indptr.astype(np.int64),
+        "indices": indices.astype(np.int32),
+        "data": data.astype(np.int32),
+        "monomer_counts": np.where(np.isinf(monomer_counts), INFINITE_COUNT, monomer_counts).astype(np.int64),
+    }
+
+    array_specs = {}
+    offset = 0
+    for array_name, array in arrays.items():
+        array_specs[array_name] = {"offset": offset, "dtype": array.dtype.str, "length": len(array)}
+        offset += _aligned(array.nbytes)
+    header = json.dumps({
+        "version": VERSION,
+        "domain_names": domain_names,
+        "monomer_names": monomer_names,
+        "arrays": array_specs,
+    }).encode("utf-8")
+    data_offset = _aligned(len(MAGIC) + 8 + len(header))
+
+    with open(filename, "wb") as binary_file:
+        binary_file.write(MAGIC)
+        binary_file.write(len(header).to_bytes(8, "little"))
+        binary_file.write(header)
+        binary_file.write(b"\0" * (data_offset - len(MAGIC) - 8 - len(header)))
+        for array in arrays.values():
+            binary_file.write(array.tobytes())
+            binary_file.write(b"\0" * (_aligned(array.nbytes) - array.nbytes))
+
+
+def read_tbn_binary(filename: str) -> Tbn:
+    import numpy as np
+
+    with open(filename, "rb") as binary_file:
+        if binary_file.read(len(MAGIC)) != MAGIC:
+            raise AssertionError(f"{filename} is not a binary tbn file")
+        header_length = int.from_bytes(binary_file.read(8), "little")
+        header = json.loads(binary_file.read(header_length).decode("utf-8"))
+    if header["version"] != VERSION:
+        raise AssertionError(f"binary tbn file {filename} has version {header['version']}, expected {VERSION}")
+    data_offset = _aligned(len(MAGIC) + 8 + header_length)
+
+    arrays = {}
+    for array_name, array_spec in header["arrays"].items():
+        if array_spec["length"] == 0:  # cannot memory-map an empty range
+            arrays[array_name] = np.empty(0, np.dtype(array_spec["dtype"]))
+        else:
+            arrays[array_name] = np.memmap(
+                filename,
+                dtype=np.dtype(array_spec["dtype"]),
+                mode="r",
+                offset=data_offset + array_spec["offset"],
+                shape=(array_spec["length"],),
+            )
+    monomer_counts = np.where(arrays["monomer_counts"] == INFINITE_COUNT, infinity, arrays["monomer_counts"])
+    return Tbn.from_arrays(
+        header["domain_names"],
+        header["monomer_names"],
+        (arrays["data"], arrays["indices"], arrays["indptr"]),
+        monomer_counts,
+    )
+
+
+def _aligned(number_of_bytes: int) -> int:
+    return -(-number_of_bytes // ALIGNMENT) * ALIGNMENT
@@ -1,13 +1,33 @@
 import argparse
+import sys
 import timeit
+from typing import Optional, Tuple
 from source.solver import SolverMethod, SolverFormulation
-from source import lib
+from source.metrics import Metrics
+from source.tbn import Tbn
+from source.constraints import Constraints
+from source import lib, output, service, tbn_binary
 
 
 def main() -> None:
     args = get_command_line_arguments()
 
+    if args.serve_socket is not None:
+        print(f"Serving on {args.serve_socket} with {args.processes} worker process(es)")
+        service.serve(args.serve_socket, args.processes)
+        return
+
     tic = timeit.default_timer()
+    metrics = Metrics() if args.stats is not None else None
+
+    if args.compile_filename is not None:
+        tbn = lib.compile_tbn(args.tbn_filename, args.compile_filename)
+        toc = timeit.default_timer()
+        if not args.benchmark:
+            print(f"Compiled {len(list(tbn.monomer_types()))} monomer types into {args.compile_filename}")
+        if args.timed:
+            print(f"seconds elapsed: {toc-tic}")
+        return
 
     if args.weight is None:
         if args.formulation is not None:
@@ -27,38 +47,115 @@ def main() -> None:
         formulation = SolverFormulation.VARIABLE_BOND_WEIGHT
         bond_weighting_factor = float(args.weight)
 
-    if not args.single:
-        stable_configurations = lib.get_stable_configs(
-            tbn_filename=args.tbn_filename,
-            constraints_filename=args.constraints_filename,
-            solver_method=SolverMethod.CONSTRAINT_PROGRAMMING if args.cp else SolverMethod.INTEGER_PROGRAMMING,
+    if args.heuristic:
+        solver_method = SolverMethod.HEURISTIC
+    elif args.cp:
+        solver_method = SolverMethod.CONSTRAINT_PROGRAMMING
+    else:
+        solver_method = SolverMethod.INTEGER_PROGRAMMING
+
+    if args.connect_socket is not None:
+        with open(args.tbn_filename) as tbn_file:
+            tbn_text = tbn_file.read()
+        constraints_text = None
+        if args.constraints_filename:
+            with open(args.constraints_filename) as constraints_file:
+                constraints_text = constraints_file.read()
+        request = service.make_request(
+            tbn_text,
+            constraints_text,
+            solver_method=solver_method,
             formulation=formulation,
             bond_weighting_factor=bond_weighting_factor,
-            verbose=args.verbose,
+            single=args.single,
+            heuristic_hint=args.hint,
+            bound_only=args.bound_only,
+            library_directory=args.library_directory,
+            output_format=args.output,
+            full=args.full,
         )
-
+        stream = sys.stdout if args.output_filename is None else open(args.output_filename, "w")
+        try:
+            # the output is written as it arrives
+            for output_text in service.submit(args.connect_socket, request):
+                if not args.benchmark:
+                    stream.write(output_text)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
         toc = timeit.default_timer()
-        if not args.benchmark:
-            for i, configuration in enumerate(stable_configurations):
-                configuration_string = configuration.full_str() if args.full else str(configuration)
-                print(f"Configuration {i+1}:\n{configuration_string}")
     else:
-        stable_configuration = lib.get_stable_config(
-            tbn_filename=args.tbn_filename,
-            constraints_filename=args.constraints_filename,
-            solver_method=SolverMethod.CONSTRAINT_PROGRAMMING if args.cp else SolverMethod.INTEGER_PROGRAMMING,
-            formulation=formulation,
-            bond_weighting_factor=bond_weighting_factor,
-            verbose=args.verbose,
+        # the input is read once, for both the query and the writer
+        parsed_input = lib.get_input(
+            args.tbn_filename, args.constraints_filename, args.library_directory, metrics=metrics
         )
+        if args.bound_only:
+            bound = lib.get_bound(
+                tbn_filename=args.tbn_filename,
+                formulation=formulation,
+                bond_weighting_factor=bond_weighting_factor,
+                verbose=args.verbose,
+                metrics=metrics,
+                parsed_input=parsed_input,
+            )
 
-        toc = timeit.default_timer()
-        if not args.benchmark:
-            configuration_string = stable_configuration.full_str() if args.full else str(stable_configuration)
-            print(f"Configuration: {configuration_string}")
+            toc = timeit.default_timer()
+            if not args.benchmark:
+                print(f"Bound: {bound}")
+        elif not args.single:
+            # the configurations are written as the search finds them, unless they are kept on disk (--spill-dir)
+            stable_configurations = lib.get_stable_configs(
+                tbn_filename=args.tbn_filename,
+                solver_method=solver_method,
+                formulation=formulation,
+                bond_weighting_factor=bond_weighting_factor,
+                solution_directory=args.solution_directory,
+                checkpoint_filename=args.checkpoint_filename,
+                processes=args.processes,
+                streaming=args.solution_directory is None,
+                verbose=args.verbose,
+                metrics=metrics,
+                parsed_input=parsed_input,
+            )
+
+            if args.benchmark:
+                for _ in stable_configurations:
+                    pass
+            else:
+                with get_writer(args, parsed_input, bond_weighting_factor) as writer:
+                    writer.write_all(stable_configurations)
+            toc = timeit.default_timer()  # the search runs while the configurations are written
+        else:
+            stable_configuration = lib.get_stable_config(
+                tbn_filename=args.tbn_filename,
+                solver_method=solver_method,
+                formulation=formulation,
+                bond_weighting_factor=bond_weighting_factor,
+                heuristic_hint=args.hint,
+                verbose=args.verbose,
+                metrics=metrics,
+                parsed_input=parsed_input,
+            )
+
+            toc = timeit.default_timer()
+            if not args.benchmark:
+                with get_writer(args, parsed_input, bond_weighting_factor) as writer:
+                    writer.write(stable_configuration)
 
     if args.timed:
         print(f"seconds elapsed: {toc-tic}")
+    if metrics is not None:
+        print(metrics.to_json(), file=sys.stderr)
+
+
+def get_writer(
+        args: argparse.Namespace, parsed_input: Tuple[Tbn, Constraints], bond_weighting_factor: Optional[float]
+) -> output.ConfigurationWriter:
+    tbn, user_constraints = parsed_input
+    bond_weight = user_constraints.bond_weight() if bond_weighting_factor is None else bond_weighting_factor
+    return output.get_writer(
+        args.output, tbn, bond_weight, filename=args.output_filename, full=args.full, single=args.single
+    )
 
 
 def get_command_line_arguments() -> argparse.Namespace:
@@ -67,7 +164,8 @@ def get_command_line_arguments() -> argparse.Namespace:
         "tbn_filename",
         metavar="tbn_filename",
         type=str,
-        help="filename for tbn text file",
+        nargs="?",
+        help="filename for tbn text file (or binary file compiled with --compile)",
     )
     parser.add_argument(
         '-i',
@@ -124,12 +222,110 @@ def get_command_line_arguments() -> argparse.Namespace:
         help="use the constraint programming formulation for optimization (instead of integer programming)",
     )
 
+    parser.add_argument(
+        "--heuristic",
+        action="store_true",
+        help="use a fast heuristic instead of solving exactly (with -1 only; the result may not be stable)",
+    )
+    parser.add_argument(
+        "--hint",
+        action="store_true",
+        help="start the exact solve from the configuration found by the heuristic (with -1 only)",
+    )
+    parser.add_argument(
+        "--bound-only",
+        action="store_true",
+        help="only report a bound from the linear relaxation of the formulation (much faster than solving it)",
+    )
+    parser.add_argument(
+        "--library-dir",
+        dest="library_directory",
+        metavar="directory",
+        type=str,
+        help="save the polymer libraries of SET_PARTITIONING in this directory, and reuse them in later runs",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        dest="solution_directory",
+        metavar="directory",
+        type=str,
+        help="keep the solutions of an enumeration in temporary files in this directory instead of in memory",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        dest="checkpoint_filename",
+        metavar="checkpoint_filename",
+        type=str,
+        help="save the configurations of an enumeration to this file as they are found, and resume from it",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="enumerate the configurations in parallel with this many processes",
+    )
+    parser.add_argument(
+        "--serve",
+        dest="serve_socket",
+        metavar="socket_filename",
+        type=str,
+        help="run as a service on this Unix socket, with --processes warm worker processes, until interrupted",
+    )
+    parser.add_argument(
+        "--connect",
+        dest="connect_socket",
+        metavar="socket_filename",
+        type=str,
+        help="send the query to the service on this Unix socket (see --serve) instead of solving it here",
+    )
+    parser.add_argument(
+        "--compile",
+        dest="compile_filename",
+        metavar="binary_filename",
+        type=str,
+        help="only compile the tbn into a binary file, which loads faster and can be given instead of the text file",
+    )
+    parser.add_argument(
+        "--output",
+        choices=output.OUTPUT_FORMATS,
+        default="text",
+        help="format of the configurations; ndjson and the columnar formats (npz, arrow, parquet) list the monomers of "
+             "each polymer by monomer id, and arrow and parquet fall back to npz if pyarrow is not installed",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-file",
+        dest="output_filename",
+        metavar="output_filename",
+        type=str,
+        help="write the configurations to this file instead of standard output (needed for the columnar formats)",
+    )
+    parser.add_argument(
+        "--stats",
+        choices=["json"],
+        help="print the wall and CPU time of each phase, the size of each model and the statistics of each search to "
+             "standard error in this format",
+    )
     parser.add_argument(
         "--benchmark",
         action="store_true",
         help="do not display configurations",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.serve_socket is not None:
+        return args
+    if args.tbn_filename is None:
+        parser.error("the tbn_filename argument is required")
+    if args.stats is not None and (args.connect_socket is not None or args.compile_filename is not None):
+        parser.error("--stats cannot be used with --connect or --compile")
+    if args.connect_socket is not None:
+        if args.output not in service.SERVICE_OUTPUT_FORMATS:
+            parser.error(f"--connect only streams the formats {', '.join(service.SERVICE_OUTPUT_FORMATS)}")
+        if tbn_binary.is_tbn_binary(args.tbn_filename):
+            parser.error("--connect needs a tbn text file")
+    if args.output in output.BINARY_OUTPUT_FORMATS and args.output_filename is None and not args.benchmark:
+        parser.error(f"--output {args.output} needs an output file (-o)")
+    return args
 
 
 if __name__ == "__main__":
@@ -0,0 +1,2 @@
+# intentionally blank
+# must be present in order for Python to auto-locate tests in this folder
@@ -0,0 +1,41 @@
+import unittest
+
+from source.solver_adapters.constraint_programming import CpModel
+
+
+class TestCpModel(unittest.TestCase):
+    CLAUSE_KINDS = ["bool_or", "bool_and"]  # AddImplication is stored as either, depending on the version of OR-Tools
+
+    def setUp(self):
+        self.model = CpModel()
+        self.x = self.model.bool_var("x")
+        self.y = self.model.bool_var("y")
+        self.z = self.model.int_var(0, 3, "z")
+
+    def constraint_kind(self) -> str:
+        return self.model.Proto().constraints[-1].WhichOneof("constraint")
+
+    def test_add_implication(self):
+        with self.subTest("literals become a clause"):
+            self.model.add_implication(self.x, self.y)
+            self.assertIn(self.constraint_kind(), self.CLAUSE_KINDS)
+
+        with self.subTest("negated literals become a clause"):
+            self.model.add_implication(self.x, self.model.complement_var(self.y))
+            self.assertIn(self.constraint_kind(), self.CLAUSE_KINDS)
+            self.model.add_implication(self.x, self.y, self.model.complement_var(self.y))
+            self.assertIn(self.constraint_kind(), self.CLAUSE_KINDS)
+
+        with self.subTest("other consequents become enforced linear constraints"):
+            self.model.add_implication(self.x, self.z)
+            self.assertEqual("linear", self.constraint_kind())
+
+    def test_add_greater_than_zero_implication(self):
+        self.model.add_greater_than_zero_implication(self.x, self.y + self.model.complement_var(self.x) - 1)
+        self.assertEqual("linear", self.constraint_kind())
+        self.model.add_greater_than_zero_implication(self.x, self.y - self.x + 1)
+        self.assertEqual("bool_or", self.constraint_kind())
+
+
+if __name__ == '__main__':
+    unittest.main()
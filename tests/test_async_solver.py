@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from source.tbn import Tbn
+from source.solver import Solver, SolverFormulation
+from source.constraints import Constraints
+from source.async_solver import AsyncSolver
+
+
+class TestAsyncSolver(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string("a* b* \n a b \n a* \n b* \n a \n b")
+        # takes minutes to solve, and to enumerate
+        self.slow_tbn = Tbn.from_string("10[a* b*] \n 10[a b] \n 10[a] \n 10[b] \n 10[a* b] \n 10[a b*]")
+        self.slow_constraints = Constraints().with_unset_optimization_flag()
+
+    @staticmethod
+    def run_async(coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def test_stable_config(self):
+        expected_configuration = Solver().stable_config(self.tbn)
+        for use_processes in [False, True]:
+            with self.subTest(use_processes=use_processes):
+                configuration = self.run_async(AsyncSolver(use_processes=use_processes).stable_config(self.tbn))
+                self.assertEqual(expected_configuration.number_of_merges(), configuration.number_of_merges())
+
+    def test_stable_configs(self):
+        expected_configurations = list(Solver().stable_configs(self.tbn))
+
+        async def stable_configs(async_solver):
+            return [configuration async for configuration in async_solver.stable_configs(self.tbn)]
+
+        for use_processes in [False, True]:
+            with self.subTest(use_processes=use_processes):
+                configurations = self.run_async(stable_configs(AsyncSolver(use_processes=use_processes)))
+                self.assertEqual(len(expected_configurations), len(configurations))
+                self.assertEqual(set(expected_configurations), set(configurations))
+
+    def test_cancel(self):
+        async def first_configuration(async_solver):
+            # leaving the loop early stops the enumeration
+            async for configuration in async_solver.stable_configs(
+                    self.slow_tbn, self.slow_constraints, formulation=SolverFormulation.POLYMER_BINARY_MATRIX
+            ):
+                return configuration
+
+        async def cancelled(async_solver):
+            task = asyncio.ensure_future(async_solver.stable_configs(
+                self.slow_tbn, self.slow_constraints, formulation=SolverFormulation.POLYMER_BINARY_MATRIX
+            ).__anext__())
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        async def cancelled_stable_config(async_solver):
+            task = asyncio.ensure_future(async_solver.stable_config(
+                self.slow_tbn, formulation=SolverFormulation.POLYMER_BINARY_MATRIX
+            ))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        for use_processes in [False, True]:
+            for coroutine_function in [first_configuration, cancelled, cancelled_stable_config]:
+                with self.subTest(use_processes=use_processes, coroutine_function=coroutine_function):
+                    number_of_threads = threading.active_count()
+                    executor = ThreadPoolExecutor(1)
+                    tic = time.monotonic()
+                    self.run_async(coroutine_function(AsyncSolver(executor=executor, use_processes=use_processes)))
+                    executor.shutdown(wait=True)  # returns once the solve in the executor has stopped
+                    self.assertLess(time.monotonic() - tic, 10)
+                    # the search thread of the solver ends once the search has stopped
+                    while threading.active_count() > number_of_threads and time.monotonic() - tic < 10:
+                        time.sleep(0.1)
+                    self.assertEqual(number_of_threads, threading.active_count())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from math import inf as infinity
+
+from source.tbn import Tbn
+from source.monomer import Monomer
+from source.domain import Domain
+from source.bounds import Bounds
+
+
+class TestBounds(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string("2[a* b* >G] \n inf[a >A] \n 3[b >B] \n 5[c >C]")
+        self.limiting_monomer_types = list(self.tbn.limiting_monomer_types())
+
+    def test_limiting_site_count(self):
+        self.assertEqual(2, Bounds(self.tbn, self.limiting_monomer_types).limiting_site_count(Domain("a*")))
+        self.assertEqual(2, Bounds(self.tbn, self.limiting_monomer_types).limiting_site_count(Domain("b*")))
+        self.assertEqual(0, Bounds(self.tbn, self.limiting_monomer_types).limiting_site_count(Domain("c*")))
+
+    def test_max_copies_in_polymer(self):
+        test_cases = [
+            # (monomer name, tightened bound, trivial bound)
+            ("G", 2, 2),
+            ("A", 2, infinity),
+            ("B", 2, 3),
+            ("C", 0, 5),  # binds no limiting site
+        ]
+        tightened_bounds = Bounds(self.tbn, self.limiting_monomer_types)
+        trivial_bounds = Bounds(self.tbn, self.limiting_monomer_types, tighten=False)
+        for name, tightened_bound, trivial_bound in test_cases:
+            with self.subTest(name=name):
+                monomer = next(monomer for monomer in self.tbn.monomer_types() if monomer.name() == name)
+                self.assertEqual(tightened_bound, tightened_bounds.max_copies_in_polymer(monomer))
+                self.assertEqual(trivial_bound, trivial_bounds.max_copies_in_polymer(monomer))
+
+    def test_max_monomers_in_polymer(self):
+        self.assertEqual(6, Bounds(self.tbn, self.limiting_monomer_types).max_monomers_in_polymer())
+        self.assertEqual(
+            4, Bounds(self.tbn, self.limiting_monomer_types, upper_bound_on_monomers_in_polymer=4)
+                .max_monomers_in_polymer()
+        )
+        self.assertEqual(0, Bounds(self.tbn, []).max_copies_in_polymer(Monomer.from_string("d", "D")))
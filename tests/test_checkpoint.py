@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from source.tbn import Tbn
+from source.solver import Solver, SolverFormulation
+from source.checkpoint import Checkpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string("a* b* \n a b \n a* \n b* \n a \n b")
+        self.formulation = SolverFormulation.POLYMER_BINARY_MATRIX
+        self.expected_configurations = list(Solver().stable_configs(self.tbn, formulation=self.formulation))
+
+    def stable_configs(self, checkpoint_filename: str):
+        solver = Solver(checkpoint_filename=checkpoint_filename)
+        return list(solver.stable_configs(self.tbn, formulation=self.formulation))
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "checkpoint.jsonl")
+            self.assertEqual(self.expected_configurations, self.stable_configs(filename))
+            with open(filename) as checkpoint_file:
+                lines = checkpoint_file.readlines()
+            self.assertEqual(len(self.expected_configurations) + 2, len(lines))
+
+            # an interrupted enumeration: one solution saved, and a line that was only partly written
+            with open(filename, "w") as checkpoint_file:
+                checkpoint_file.write(lines[0] + lines[1] + lines[2][:5])
+            configurations = self.stable_configs(filename)
+            self.assertEqual(len(self.expected_configurations), len(configurations))
+            self.assertEqual(set(self.expected_configurations), set(configurations))
+
+            # a complete enumeration is not searched again
+            self.assertEqual(configurations, self.stable_configs(filename))
+
+            with self.assertRaises(AssertionError):
+                list(Solver(checkpoint_filename=filename).stable_configs(
+                    self.tbn, formulation=SolverFormulation.POLYMER_UNBOUNDED_MATRIX
+                ))
+
+    def test_record_and_save(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "checkpoint.jsonl")
+            checkpoint = Checkpoint(filename, interval=float("inf"))
+            self.assertEqual(([], False), checkpoint.resume("fingerprint"))
+            checkpoint.record([1, 2])
+            self.assertEqual(([], False), Checkpoint(filename).resume("fingerprint"))  # not saved yet
+            checkpoint.save()
+            self.assertEqual(([[1, 2]], False), Checkpoint(filename).resume("fingerprint"))
+            checkpoint.complete()
+            self.assertEqual(([[1, 2]], True), Checkpoint(filename).resume("fingerprint"))
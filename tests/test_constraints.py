@@ -1,7 +1,7 @@
 import unittest
 from math import inf as infinity
 
-from source.constraints import Constraints
+from source.constraints import Constraints, SortStrategy
 
 
 class TestConstraints(unittest.TestCase):
@@ -98,3 +98,25 @@ class TestConstraints(unittest.TestCase):
         new_constraints = old_constraints.with_unset_optimization_flag()
         self.assertFalse(new_constraints.optimize())
         self.assertTrue(old_constraints.optimize())
+
+    def test_with_iterative_flag(self):
+        old_constraints = Constraints.from_string("NO ITERATIVE")
+        self.assertFalse(old_constraints.iterative())
+        new_constraints = old_constraints.with_iterative_flag()
+        self.assertTrue(new_constraints.iterative())
+        self.assertFalse(old_constraints.iterative())
+        self.assertTrue(Constraints.from_string("ITERATIVE").iterative())
+
+    def test_with_sort_strategy(self):
+        old_constraints = Constraints()
+        self.assertEqual(SortStrategy.CHAIN, old_constraints.sort_strategy())
+        new_constraints = old_constraints.with_sort_strategy(SortStrategy.LEX)
+        self.assertEqual(SortStrategy.LEX, new_constraints.sort_strategy())
+        self.assertEqual(SortStrategy.CHAIN, old_constraints.sort_strategy())
+        for strategy in SortStrategy:
+            with self.subTest(strategy=strategy):
+                constraints = Constraints.from_string(f"SORT {strategy.name}")
+                self.assertTrue(constraints.sort())
+                self.assertEqual(strategy, constraints.sort_strategy())
+        with self.assertRaises(AssertionError):
+            Constraints.from_string("SORT SIDEWAYS")
@@ -81,6 +81,15 @@ class TestDomain(unittest.TestCase):
 
     def test_hash(self):
         self.assertNotEqual(hash(self.a), hash(self.a_star))
+        self.assertEqual(hash(self.a), hash(self.a_star.complement()))
+
+    def test_from_string(self):
+        self.assertEqual(self.a_star, Domain.from_string("a*"))
+        interned_domains = {}
+        self.assertIs(Domain.from_string("a*", interned_domains), Domain.from_string("a*", interned_domains))
+        self.assertIsNot(Domain.from_string("a*", interned_domains), Domain.from_string("a*"))
+        with self.assertRaises(AssertionError):
+            Domain.from_string("a**")
 
     def test_is_starred(self):
         tests = [
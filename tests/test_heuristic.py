@@ -0,0 +1,36 @@
+import unittest
+from math import inf as infinity
+
+from source.tbn import Tbn
+from source.constraints import Constraints
+from source.heuristic import Heuristic
+
+
+class TestHeuristic(unittest.TestCase):
+    def assert_saturated(self, tbn, configuration):
+        self.assertEqual(tbn, configuration.flatten())
+        limiting_domain_types = list(tbn.limiting_domain_types())
+        for polymer, _ in configuration.items():
+            for domain in limiting_domain_types:
+                self.assertLessEqual(sum(monomer.net_count(domain) * count for monomer, count in polymer.items()), 0)
+
+    def test_configuration(self):
+        test_cases = [
+            # (tbn, number of merges in a stable configuration)
+            ("a* b* \n a b \n a* \n b*", 1),
+            ("2[a* b*] \n a b", 1),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 5),
+            ("3[a* b*] \n 3[a] \n 3[b] \n inf[a b]", 3),
+        ]
+        for tbn_string, number_of_merges in test_cases:
+            with self.subTest(tbn_string=tbn_string):
+                tbn = Tbn.from_string(tbn_string)
+                # without a time limit, the local search stops after a fixed number of moves without an improvement, so
+                #  the result only depends on the seed
+                configuration = Heuristic(tbn, time_limit=infinity, seed=0).configuration()
+                self.assert_saturated(tbn, configuration)
+                self.assertEqual(number_of_merges, configuration.number_of_merges())
+
+    def test_unsupported(self):
+        with self.assertRaises(NotImplementedError):
+            Heuristic(Tbn.from_string("a* \n a"), Constraints.from_string("MAX POLYMERS 1"))
@@ -1,4 +1,5 @@
 import unittest
+import os
 import tempfile
 from source import lib
 
@@ -19,9 +20,21 @@ class TestLib(unittest.TestCase):
         self.assertEqual(2, configurations[1].number_of_polymers())
         self.assertEqual(2, configurations[2].number_of_polymers())
 
+    def test_get_stable_configs_streaming(self):
+        parsed_input = lib.get_input(self.tbn_filename)
+        configurations = lib.get_stable_configs(self.tbn_filename, streaming=True, parsed_input=parsed_input)
+        self.assertEqual(
+            sorted(map(str, lib.get_stable_configs(self.tbn_filename))), sorted(map(str, configurations))
+        )
+
     def test_get_tbn_from_filename(self):
         with self.subTest("opens a valid filename"):
             lib.get_tbn_from_filename(self.tbn_filename)
         with self.subTest("does not open an invalid filename"):
             with self.assertRaises(FileNotFoundError):
                 lib.get_tbn_from_filename("THERE_IS_NO_FILE_BY_THIS_NAME.txt")
+        with self.subTest("opens a compiled binary file"):
+            binary_filename = self.tbn_filename + ".tbnb"
+            tbn = lib.compile_tbn(self.tbn_filename, binary_filename)
+            self.assertEqual(tbn, lib.get_tbn_from_filename(binary_filename))
+            os.remove(binary_filename)
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+from source import lib
+from source.tbn import Tbn
+from source.solver import Solver, SolverMethod, SolverFormulation
+from source.metrics import Metrics
+from source.solver_adapters.constraint_programming import presolve_time
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string("a* b* \n a b \n a* \n b* \n a \n b")
+
+    def test_stable_config(self):
+        for method, solver_name in [
+            (SolverMethod.CONSTRAINT_PROGRAMMING, "CP-SAT"),
+            (SolverMethod.INTEGER_PROGRAMMING, "SCIP"),
+        ]:
+            with self.subTest(method=method):
+                metrics = Metrics()
+                configuration = Solver(method, metrics=metrics).stable_config(self.tbn)
+                self.assertEqual(3, configuration.number_of_merges())
+
+                phases = metrics.as_dict()["phases"]
+                for phase in ["presolve", "populate_model", "solve", "interpret_solution"]:
+                    self.assertIn(phase, phases)
+                    self.assertGreaterEqual(phases[phase]["wall_time"], 0)
+                    self.assertGreaterEqual(phases[phase]["cpu_time"], 0)
+                self.assertEqual(1, len(metrics.models()))
+                self.assertTrue(all(size > 0 for size in metrics.models()[0].values()))
+                [search] = metrics.searches()
+                self.assertEqual(solver_name, search["solver"])
+                self.assertEqual("OPTIMAL", search["status"])
+                self.assertGreaterEqual(search["wall_time"], 0)
+
+        metrics = Metrics()
+        Solver(metrics=metrics).stable_config(self.tbn)
+        [search] = metrics.searches()
+        for statistic in ["branches", "conflicts", "presolve_time", "best_bound"]:
+            self.assertIsNotNone(search[statistic])
+
+    def test_stable_configs(self):
+        for processes in [1, 2]:
+            with self.subTest(processes=processes):
+                metrics = Metrics()
+                solver = Solver(processes=processes, metrics=metrics)
+                configurations = list(solver.stable_configs(self.tbn))
+                self.assertEqual(
+                    len(list(Solver().stable_configs(self.tbn))), len(configurations)
+                )
+                self.assertIn("interpret_solution", metrics.as_dict()["phases"])
+                # the first search finds the optimum, and the others (one per cube in parallel) enumerate
+                self.assertEqual("OPTIMAL", metrics.searches()[0]["status"])
+                self.assertIsNotNone(metrics.searches()[0]["best_bound"])
+                self.assertTrue(all(search["best_bound"] is None for search in metrics.searches()[1:]))
+                if processes == 1:
+                    self.assertEqual(2, len(metrics.searches()))
+                else:
+                    self.assertLess(2, len(metrics.searches()))
+
+    def test_lib(self):
+        with tempfile.TemporaryDirectory() as directory:
+            tbn_filename = os.path.join(directory, "tbn.txt")
+            with open(tbn_filename, "w") as tbn_file:
+                tbn_file.write("a* b* \n a b \n a* \n b* \n a \n b")
+            metrics = Metrics()
+            lib.get_bound(tbn_filename, formulation=SolverFormulation.POLYMER_INTEGER_MATRIX, metrics=metrics)
+
+        as_dict = json.loads(metrics.to_json())
+        self.assertEqual(["parse", "presolve", "heuristic", "populate_model", "solve"], list(as_dict["phases"]))
+        self.assertEqual("GLOP", as_dict["searches"][0]["solver"])
+
+    def test_presolve_time(self):
+        solve_log = "\n".join([
+            "Starting CP-SAT solver v9.5.2237",
+            "Starting presolve at 0.25s",
+            "Presolve summary:",
+            "Starting to load the model at 1.50s",
+            "Starting sequential search at 1.75s",
+        ])
+        self.assertEqual(1.25, presolve_time(solve_log))
+        self.assertIsNone(presolve_time(""))
+
+
+if __name__ == '__main__':
+    unittest.main()
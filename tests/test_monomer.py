@@ -130,6 +130,15 @@ class TestMonomer(unittest.TestCase):
             legacy_monomer = SensingMonomer.from_string("a a:name a* b:name2")
             self.assertEqual({a: 2, a_star: 1, b: 1}, legacy_monomer.sensed_domain_multiset)
 
+        with self.subTest("repeated strings return the same monomer from the interned monomers"):
+            interned_monomers = {}
+            interned_monomer = Monomer.from_string("a b* >interned", interned_monomers=interned_monomers)
+            self.assertIs(interned_monomer, Monomer.from_string("a b* >interned", interned_monomers=interned_monomers))
+            self.assertIsInstance(
+                SensingMonomer.from_string("a b* >interned", interned_monomers=interned_monomers), SensingMonomer
+            )
+            self.assertIsNot(interned_monomer, Monomer.from_string("a b* >interned"))
+
     def test_name(self):
         tests = [
             (self.x, "X"),
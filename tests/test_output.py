@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from math import inf as infinity
+
+import numpy as np
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from source.tbn import Tbn
+from source.solver import Solver
+from source import output
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string("2[a* b* >OG] \n a b >OAB \n a >OA \n inf[b >OB]")
+        self.monomer_names = [monomer.name() for monomer in self.tbn.monomer_types()]
+        self.configurations = list(Solver().stable_configs(self.tbn))
+
+    def test_ndjson(self):
+        stream = io.StringIO()
+        with output.NdjsonWriter(self.tbn, 2.0, stream) as writer:
+            self.assertEqual(len(self.configurations), writer.write_all(self.configurations))
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(self.configurations) + 1, len(lines))
+        self.assertEqual([str(monomer) for monomer in self.tbn.monomer_types()], lines[0]["monomer_types"])
+
+        for k, (configuration, record) in enumerate(zip(self.configurations, lines[1:])):
+            self.assertEqual(k, record["index"])
+            self.assertEqual(output.INFINITE_COUNT, record["polymers"])
+            self.assertEqual(configuration.number_of_merges(), record["merges"])
+            # the count vectors add up to the tbn
+            monomer_counts = [0] * len(self.monomer_names)
+            for multiplicity, monomer_ids, counts in zip(
+                    record["multiplicities"], record["monomer_ids"], record["monomer_counts"]
+            ):
+                for monomer_id, count in zip(monomer_ids, counts):
+                    monomer_counts[monomer_id] += infinity if multiplicity == output.INFINITE_COUNT \
+                        else multiplicity * count
+            self.assertEqual([self.tbn.count(monomer) for monomer in self.tbn.monomer_types()], monomer_counts)
+
+    def test_npz(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "configurations.npz")
+            with output.get_writer("npz", self.tbn, 2.0, filename=filename) as writer:
+                writer.write_all(self.configurations)
+            with np.load(filename) as arrays:
+                self.assertEqual(
+                    [str(monomer) for monomer in self.tbn.monomer_types()], list(arrays["monomer_types"])
+                )
+                self.assertEqual(
+                    [configuration.number_of_merges() for configuration in self.configurations],
+                    list(arrays["merges"]),
+                )
+                self.assertEqual(len(self.configurations) + 1, len(arrays["polymer_indptr"]))
+                self.assertEqual(len(arrays["multiplicities"]), arrays["polymer_indptr"][-1])
+                self.assertEqual(len(arrays["monomer_ids"]), arrays["monomer_indptr"][-1])
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_arrow(self):
+        import pyarrow.ipc
+        import pyarrow.parquet
+        with tempfile.TemporaryDirectory() as directory:
+            for output_format in ["arrow", "parquet"]:
+                filename = os.path.join(directory, f"configurations.{output_format}")
+                with output.get_writer(output_format, self.tbn, 2.0, filename=filename) as writer:
+                    writer.write_all(self.configurations)
+                if output_format == "arrow":
+                    table = pyarrow.ipc.open_file(filename).read_all()
+                else:
+                    table = pyarrow.parquet.read_table(filename)
+                self.assertEqual(len(self.configurations), table.num_rows)
+                self.assertEqual(
+                    [configuration.number_of_merges() for configuration in self.configurations],
+                    table.column("merges").to_pylist(),
+                )
+
+    def test_text(self):
+        stream = io.StringIO()
+        with output.TextWriter(self.tbn, 2.0, stream, single=True) as writer:
+            writer.write(self.configurations[0])
+        self.assertEqual(f"Configuration: {self.configurations[0]}\n", stream.getvalue())
+
+    def test_invalid(self):
+        with self.assertRaises(AssertionError):
+            output.get_writer("csv", self.tbn, 2.0)
+        with self.assertRaises(AssertionError):
+            output.get_writer("npz", self.tbn, 2.0)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from source.tbn import Tbn
+from source.bounds import Bounds
+from source.polymer import Polymer
+from source.polymer_library import PolymerLibrary
+from source.constraints import Constraints
+from source.solver import Solver, SolverFormulation
+
+
+class TestPolymerLibrary(unittest.TestCase):
+    def setUp(self):
+        PolymerLibrary.clear_cache()
+        self.tbn = Tbn.from_string("2[a* b* >G] \n 2[a >A] \n 2[b >B] \n 2[a b >AB]")
+        self.bounds = Bounds(self.tbn, self.tbn.limiting_monomer_types())
+
+    def get_polymers(self, library: PolymerLibrary):
+        return set(library.polymer(p) for p in range(library.number_of_polymers()))
+
+    def test_for_tbn(self):
+        library = PolymerLibrary.for_tbn(self.tbn, self.bounds)
+        polymers = self.get_polymers(library)
+        monomers = {str(monomer): monomer for monomer in self.tbn.monomer_types()}
+        G, A, B, AB = monomers["G"], monomers["A"], monomers["B"], monomers["AB"]
+        self.assertIn(Polymer({G: 1, AB: 1}), polymers)
+        self.assertIn(Polymer({G: 1, A: 1, B: 1}), polymers)
+        self.assertIn(Polymer({G: 2, A: 2, B: 2}), polymers)
+        self.assertNotIn(Polymer({G: 1, A: 1}), polymers)  # not saturated
+        self.assertNotIn(Polymer({A: 1, B: 1}), polymers)  # no limiting monomer
+        for p in range(library.number_of_polymers()):
+            self.assertTrue(all(library.matrix()[:, p] <= 2))
+
+    def test_irreducible(self):
+        library = PolymerLibrary.for_tbn(self.tbn, self.bounds).irreducible()
+        monomers = {str(monomer): monomer for monomer in self.tbn.monomer_types()}
+        G, A, B, AB = monomers["G"], monomers["A"], monomers["B"], monomers["AB"]
+        self.assertEqual({Polymer({G: 1, AB: 1}), Polymer({G: 1, A: 1, B: 1})}, self.get_polymers(library))
+        # pruning during the search must not change the result
+        pruned_library = PolymerLibrary.for_tbn(self.tbn, self.bounds, irreducible=True)
+        self.assertEqual(self.get_polymers(library), self.get_polymers(pruned_library))
+
+    def test_cache_is_reused_with_smaller_bounds(self):
+        library = PolymerLibrary.for_tbn(self.tbn, self.bounds)
+        smaller_tbn = Tbn.from_string("G \n A \n B \n AB")
+        smaller_library = PolymerLibrary.for_tbn(
+            smaller_tbn, Bounds(smaller_tbn, smaller_tbn.limiting_monomer_types())
+        )
+        self.assertLess(smaller_library.number_of_polymers(), library.number_of_polymers())
+        self.assertTrue((smaller_library.matrix() <= 1).all())
+
+    def test_save_and_load(self):
+        library = PolymerLibrary.for_tbn(self.tbn, self.bounds)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "library.npz")
+            library.save(filename)
+            loaded_library = PolymerLibrary.load(filename, library.monomer_types())
+        self.assertEqual(self.get_polymers(library), self.get_polymers(loaded_library))
+        with self.assertRaises(AssertionError):
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "library.npz")
+                library.save(filename)
+                PolymerLibrary.load(filename, library.monomer_types()[1:])
+
+    def test_cache_is_bounded(self):
+        for k in range(PolymerLibrary.MAX_CACHED_LIBRARIES + 2):
+            tbn = Tbn.from_string(f"a* >CacheG{k} \n a >CacheA{k}")
+            PolymerLibrary.for_tbn(tbn, Bounds(tbn, tbn.limiting_monomer_types()))
+        self.assertEqual(PolymerLibrary.MAX_CACHED_LIBRARIES, PolymerLibrary.number_of_cached_libraries())
+
+    def test_library_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            library = PolymerLibrary.for_tbn(self.tbn, self.bounds, library_directory=directory)
+            filenames = os.listdir(directory)
+            self.assertEqual(1, len(filenames))
+
+            # a later run (with an empty cache) reads the saved library instead of enumerating it again
+            PolymerLibrary.clear_cache()
+            modification_time = os.path.getmtime(os.path.join(directory, filenames[0]))
+            loaded_library = PolymerLibrary.for_tbn(self.tbn, self.bounds, library_directory=directory)
+            self.assertEqual(self.get_polymers(library), self.get_polymers(loaded_library))
+            self.assertEqual(filenames, os.listdir(directory))
+            self.assertEqual(modification_time, os.path.getmtime(os.path.join(directory, filenames[0])))
+
+        with tempfile.TemporaryDirectory() as directory:
+            PolymerLibrary.clear_cache()
+            user_constraints = Constraints().with_library_directory(directory)
+            configuration = Solver().stable_config(
+                self.tbn, user_constraints=user_constraints, formulation=SolverFormulation.SET_PARTITIONING
+            )
+            self.assertEqual(2, configuration.number_of_merges())
+            self.assertEqual(1, len(os.listdir(directory)))
@@ -0,0 +1,124 @@
+import unittest
+from collections import Counter
+from math import inf as infinity
+
+from source.tbn import Tbn
+from source.polymer import Polymer
+from source.constraints import Constraints
+from source.presolve import SingletonPresolve, MonomerCompression
+from source.solver import Solver, SolverFormulation
+
+
+class TestSingletonPresolve(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string(
+            "2[a* b* >P] \n 3[a >Q] \n 4[b >R] \n 5[c >S] \n 2[c* >T] \n 2[d d* >U] \n inf[e >V]"
+        )
+
+    def test_singleton_types(self):
+        presolve = SingletonPresolve(self.tbn)
+        self.assertEqual(["U", "V"], sorted(monomer.name() for monomer in presolve.singleton_types()))
+        self.assertEqual(16, presolve.reduced_tbn().number_of_monomers())
+        self.assertEqual(
+            list(self.tbn.limiting_monomer_types()),
+            list(presolve.reduced_tbn().limiting_monomer_types())
+        )
+
+    def test_add_singletons(self):
+        presolve = SingletonPresolve(self.tbn)
+        configuration = presolve.singleton_configuration()
+        self.assertEqual(infinity, configuration.number_of_polymers())
+        self.assertEqual(0, configuration.number_of_merges())
+
+    def test_applies_to(self):
+        self.assertTrue(SingletonPresolve.applies_to(Constraints()))
+        self.assertTrue(SingletonPresolve.applies_to(Constraints.from_string("MAX MERGES 3")))
+        self.assertFalse(SingletonPresolve.applies_to(Constraints.from_string("MIN MERGES 3")))
+        self.assertFalse(SingletonPresolve.applies_to(Constraints.from_string("MAX POLYMERS 3")))
+        self.assertFalse(SingletonPresolve.applies_to(Constraints().with_unset_optimization_flag()))
+
+    def test_stable_configs_keep_forced_singletons(self):
+        tbn = Tbn.from_string("2[a* b*] \n 2[a] \n 2[b] \n c c* \n 2[e]")
+        presolve = SingletonPresolve(tbn)
+        self.assertEqual(2, len(presolve.singleton_types()))
+        solver = Solver()
+        for formulation in [
+            SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+            SolverFormulation.VARIABLE_BOND_WEIGHT,
+        ]:
+            with self.subTest(formulation=formulation):
+                configurations = list(solver.stable_configs(tbn, formulation=formulation))
+                self.assertEqual(1, len(configurations))
+                for monomer in presolve.singleton_types():
+                    self.assertEqual(
+                        tbn.count(monomer), dict(configurations[0].items()).get(Polymer({monomer: 1}), 0)
+                    )
+                self.assertEqual(4, configurations[0].number_of_merges())
+
+
+    def test_labelled_stable_configs_are_unchanged(self):
+        # the labelled formulations report solutions that differ only in the bonds of the forced singletons
+        tbn = Tbn.from_string("1[2(a) b 2(b*) c 2(c*)] \n 1[a a* c*] \n 1[b 2(b*) 2(c*)]")
+        self.assertTrue(SingletonPresolve(tbn).reduces())
+        solver = Solver()
+        for formulation in [
+            SolverFormulation.BOND_AWARE_NETWORK,
+            SolverFormulation.BOND_OBLIVIOUS_NETWORK,
+            SolverFormulation.POLYMER_BINARY_MATRIX,
+            SolverFormulation.MONOMER_ASSIGNMENT,
+        ]:
+            with self.subTest(formulation=formulation):
+                configurations = list(solver.stable_configs(tbn, formulation=formulation))
+                # without the presolve, which does not apply once the optimal number of polymers is fixed
+                number_of_polymers = configurations[0].number_of_polymers()
+                unpresolved_configurations = list(solver.stable_configs(
+                    tbn,
+                    Constraints().with_unset_optimization_flag().with_fixed_polymers(number_of_polymers),
+                    formulation=formulation,
+                ))
+                self.assertEqual(Counter(unpresolved_configurations), Counter(configurations))
+        self.assertEqual(8, len(list(solver.stable_configs(tbn, formulation=SolverFormulation.BOND_AWARE_NETWORK))))
+
+class TestMonomerCompression(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string("2[a* b* >J] \n 2[a >X3] \n a >Y3 \n 2[b >Z3] \n b c c* >W3 \n inf[b >V3]")
+
+    def test_compressed_tbn(self):
+        compression = MonomerCompression(self.tbn)
+        self.assertTrue(compression.reduces())
+        compressed_tbn = compression.compressed_tbn()
+        self.assertEqual(["J", "V3", "W3", "X3"], [str(monomer) for monomer in compressed_tbn.monomer_types()])
+        self.assertEqual(3, compressed_tbn.count(next(
+            monomer for monomer in compressed_tbn.monomer_types() if str(monomer) == "W3"
+        )))
+        self.assertFalse(MonomerCompression(compressed_tbn).reduces())
+
+    def test_expand_all(self):
+        compression = MonomerCompression(self.tbn)
+        compressed_configuration = Solver().stable_config(
+            compression.compressed_tbn(), formulation=SolverFormulation.POLYMER_UNBOUNDED_MATRIX
+        )
+        expanded_configurations = list(compression.expand_all(compressed_configuration))
+        self.assertEqual(len(set(expanded_configurations)), len(expanded_configurations))
+        self.assertIn(compression.expand(compressed_configuration), expanded_configurations)
+        for configuration in expanded_configurations:
+            self.assertEqual(self.tbn, configuration.flatten())
+
+    def test_stable_configs_are_unchanged(self):
+        solver = Solver()
+        for tbn_string in [
+            "2[a* >G3] \n 2[a >X4] \n a >Y4",
+            "3[a* a* >K3] \n 2[a >X5] \n 2[a >Y5] \n 3[a >Z5]",
+            "2[a* b* >H3] \n 2[a >X6] \n a >Y6 \n 2[b >Z6] \n b c c* >W6",
+        ]:
+            with self.subTest(tbn_string=tbn_string):
+                tbn = Tbn.from_string(tbn_string)
+                self.assertTrue(MonomerCompression(tbn).reduces())
+                expected_configurations = set(
+                    solver.stable_configs(tbn, formulation=SolverFormulation.BOND_AWARE_NETWORK)
+                )  # not compressed
+                configurations = list(
+                    solver.stable_configs(tbn, formulation=SolverFormulation.POLYMER_UNBOUNDED_MATRIX)
+                )
+                self.assertEqual(len(expected_configurations), len(configurations))
+                self.assertEqual(expected_configurations, set(configurations))
@@ -0,0 +1,95 @@
+import io
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+
+from source.tbn import Tbn
+from source.solver import Solver, SolverMethod, SolverFormulation
+from source.output import TextWriter
+from source import service
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_filename = os.path.join(self.directory.name, "service.sock")
+        self.service = service.Service(self.socket_filename, processes=1)
+        self.thread = threading.Thread(target=self.service.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.thread.join()
+        self.service.server_close()
+        self.directory.cleanup()
+
+    def submit(self, **kargs) -> str:
+        return "".join(service.submit(self.socket_filename, service.make_request(**kargs)))
+
+    def test_stable_configs(self):
+        tbn_text = "a* b* \n a b \n a* \n b* \n a \n b"
+        stream = io.StringIO()
+        with TextWriter(Tbn.from_string(tbn_text), 1.0, stream) as writer:
+            writer.write_all(Solver().stable_configs(Tbn.from_string(tbn_text)))
+        self.assertEqual(stream.getvalue(), self.submit(tbn_text=tbn_text))
+        self.assertEqual(1, self.service.number_of_cached_results())
+
+        # a repeated query is answered from the cache
+        self.assertEqual(stream.getvalue(), self.submit(tbn_text=tbn_text))
+        self.assertEqual(1, self.service.number_of_cached_results())
+
+    def test_ndjson(self):
+        lines = self.submit(tbn_text="a b \n a* \n b*", single=True, output_format="ndjson").splitlines()
+        self.assertEqual(["[a b]", "[a*]", "[b*]"], sorted(json.loads(lines[0])["monomer_types"]))
+        self.assertEqual(2, len(lines))
+        self.assertEqual(2, json.loads(lines[1])["merges"])
+
+    def test_error(self):
+        with self.assertRaises(AssertionError):
+            self.submit(
+                tbn_text="a* b* \n a b", solver_method=SolverMethod.HEURISTIC,
+                formulation=SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+            )
+        self.assertEqual(0, self.service.number_of_cached_results())
+        # the service still answers after an error
+        self.assertEqual("Configuration: {[a b], [a* b*]}\n", self.submit(tbn_text="a* b* \n a b", single=True))
+
+
+    def test_large_answers_are_not_cached(self):
+        maximum_length = service.MAX_CACHED_OUTPUT_LENGTH
+        service.MAX_CACHED_OUTPUT_LENGTH = 10
+        try:
+            self.assertEqual("Configuration: {[a b], [a* b*]}\n", self.submit(tbn_text="a* b* \n a b", single=True))
+        finally:
+            service.MAX_CACHED_OUTPUT_LENGTH = maximum_length
+        self.assertEqual(0, self.service.number_of_cached_results())
+
+    def test_worker_dies(self):
+        def kill_workers() -> None:
+            time.sleep(1)
+            for process in multiprocessing.active_children():
+                if "PoolWorker" in process.name:
+                    os.kill(process.pid, signal.SIGKILL)
+
+        killer = threading.Thread(target=kill_workers)
+        killer.start()
+        tic = time.monotonic()
+        with self.assertRaises(AssertionError):
+            # takes minutes to enumerate
+            self.submit(
+                tbn_text="10[a* b*] \n 10[a b] \n 10[a] \n 10[b] \n 10[a* b] \n 10[a b*]",
+                constraints_text="NO OPTIMIZE",
+                formulation=SolverFormulation.POLYMER_BINARY_MATRIX,
+            )
+        killer.join()
+        self.assertLess(time.monotonic() - tic, 30)
+        # the pool replaces the worker
+        self.assertEqual("Configuration: {[a b], [a* b*]}\n", self.submit(tbn_text="a* b* \n a b", single=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from source.tbn import Tbn
+from source.monomer import Monomer
+from source.constraints import Constraints
+from source.session import Session
+from source.solver import Solver, SolverMethod, SolverFormulation
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.tbn = Tbn.from_string("2[a* b* >SA] \n a b >SB \n 5[a >SC] \n 5[b >SD]")
+        self.monomers = {monomer.name(): monomer for monomer in self.tbn.monomer_types()}
+
+    def assert_matches_fresh_solve(self, session: Session, formulation: SolverFormulation, solver: Solver):
+        configuration = session.stable_config()
+        fresh_configuration = solver.stable_config(session.tbn(), formulation=formulation)
+        self.assertEqual(session.tbn(), configuration.flatten())
+        self.assertEqual(fresh_configuration.number_of_merges(), configuration.number_of_merges())
+
+    def test_edits(self):
+        for solver_method in [SolverMethod.CONSTRAINT_PROGRAMMING, SolverMethod.INTEGER_PROGRAMMING]:
+            for formulation in [
+                SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                SolverFormulation.POLYMER_MULTIPLICITY_MATRIX,
+                SolverFormulation.SET_PARTITIONING,
+                SolverFormulation.BOND_OBLIVIOUS_NETWORK,
+            ]:
+                with self.subTest(solver_method=solver_method, formulation=formulation):
+                    solver = Solver(method=solver_method)
+                    session = Session(self.tbn, solver_method=solver_method, formulation=formulation)
+                    self.assert_matches_fresh_solve(session, formulation, solver)
+
+                    session.set_count(self.monomers["SC"], 3)
+                    self.assert_matches_fresh_solve(session, formulation, solver)
+
+                    session.add_monomer(Monomer.from_string("a* >SE"), 2)
+                    self.assert_matches_fresh_solve(session, formulation, solver)
+
+                    session.remove_monomer(self.monomers["SB"])
+                    self.assert_matches_fresh_solve(session, formulation, solver)
+
+                    self.assertEqual(4, session.statistics["queries"])
+
+    def test_update_in_place(self):
+        session = Session(self.tbn)
+        session.stable_config()
+        # only the count of a non-limiting monomer type changes, and each polymer can hold at most two of them
+        session.set_count(self.monomers["SD"], 2)
+        configuration = session.stable_config()
+        self.assertEqual(1, session.statistics["models_built"])
+        self.assertEqual(1, session.statistics["models_updated_in_place"])
+        self.assertEqual(session.tbn(), configuration.flatten())
+        self.assertEqual(3, configuration.number_of_merges())
+
+        # a limiting monomer type changes count
+        session.set_count(self.monomers["SA"], 1)
+        session.stable_config()
+        self.assertEqual(2, session.statistics["models_built"])
+
+    def test_invalid_edits(self):
+        session = Session(self.tbn, user_constraints=Constraints())
+        with self.assertRaises(AssertionError):
+            session.add_monomer(self.monomers["SA"])
+        with self.assertRaises(AssertionError):
+            session.set_count(Monomer.from_string("c >SF"), 1)
+        session.set_count(self.monomers["SA"], 0)
+        self.assertEqual(0, session.tbn().count(self.monomers["SA"]))
+        with self.assertRaises(AssertionError):
+            session.remove_monomer(self.monomers["SA"])
+
+    def test_count_sweep(self):
+        counts = [1, 3, 0, 2, 5]
+        for processes in [1, 2]:
+            with self.subTest(processes=processes):
+                configurations = Solver().count_sweep(
+                    self.tbn, [self.monomers["SC"], self.monomers["SD"]], counts, processes=processes
+                )
+                self.assertEqual(len(counts), len(configurations))
+                for count, configuration in zip(counts, configurations):
+                    tbn = Tbn({
+                        monomer: count if monomer.name() in ["SC", "SD"] else self.tbn.count(monomer)
+                        for monomer in self.tbn.monomer_types()
+                        if count > 0 or monomer.name() not in ["SC", "SD"]
+                    })
+                    self.assertEqual(tbn, configuration.flatten())
+                    self.assertEqual(
+                        Solver().stable_config(tbn).number_of_merges(), configuration.number_of_merges()
+                    )
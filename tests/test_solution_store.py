@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from source.tbn import Tbn
+from source.solver import Solver, SolverFormulation
+from source.solution_store import SolutionStore
+
+
+class TestSolutionStore(unittest.TestCase):
+    def test_append_and_read(self):
+        rows = [[k, 2 * k, -k] for k in range(10)]
+        with tempfile.TemporaryDirectory() as directory:
+            with SolutionStore(3, directory=directory, chunk_size=4) as solution_store:
+                for row in rows[:5]:
+                    solution_store.append(row)
+                self.assertEqual(rows[4], solution_store[4].tolist())
+                for row in rows[5:]:
+                    solution_store.append(row)  # after reading from the chunk that is still being written
+
+                self.assertEqual(len(rows), len(solution_store))
+                self.assertEqual(rows, list(solution_store.rows()))
+                self.assertEqual(rows, [row.tolist() for row in solution_store])
+                self.assertEqual(rows[-1], solution_store[-1].tolist())
+                self.assertEqual(rows[2:7], list(solution_store.rows(2, 7)))
+                self.assertEqual(rows[1], solution_store[1].tolist())
+                with self.assertRaises(IndexError):
+                    solution_store[len(rows)]
+                self.assertEqual(1, len(os.listdir(directory)))
+            self.assertEqual([], os.listdir(directory))
+
+    def test_stable_configs_on_disk(self):
+        test_cases = [
+            ("a* b* \n a b \n a* \n b*", SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+        ]
+        for tbn_string, formulation in test_cases:
+            with self.subTest(tbn_string=tbn_string, formulation=formulation):
+                test_tbn = Tbn.from_string(tbn_string)
+                expected_configurations = list(Solver().stable_configs(test_tbn, formulation=formulation))
+                with tempfile.TemporaryDirectory() as directory:
+                    configurations = list(
+                        Solver(solution_directory=directory).stable_configs(test_tbn, formulation=formulation)
+                    )
+                    self.assertEqual([], os.listdir(directory))
+                self.assertEqual(expected_configurations, configurations)
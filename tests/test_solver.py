@@ -1,9 +1,13 @@
+import subprocess
+import sys
 import unittest
 from math import inf as infinity
+from collections import Counter
 
 from source.tbn import Tbn
-from source.solver import Solver, SolverMethod, SolverFormulation
-from source.constraints import Constraints
+from source.solver import Solver, SolverMethod, SolverFormulation, formulation_class
+from source.formulations.abstract import Formulation as AbstractFormulation
+from source.constraints import Constraints, SortStrategy
 
 
 class TestSolver(unittest.TestCase):
@@ -16,59 +20,95 @@ class TestSolver(unittest.TestCase):
             ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.BOND_AWARE_NETWORK),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.SET_PARTITIONING),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.COLUMN_GENERATION),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.cp_solver, SolverFormulation.HILBERT_BASIS),
 
             ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.BOND_AWARE_NETWORK),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.SET_PARTITIONING),
+            ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.COLUMN_GENERATION),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("a* b* \n a b \n a* \n b*", 3, 1, self.ip_solver, SolverFormulation.HILBERT_BASIS),
 
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.BOND_AWARE_NETWORK),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.SET_PARTITIONING),
+            ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.COLUMN_GENERATION),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.HILBERT_BASIS),
 
             ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.BOND_AWARE_NETWORK),
             ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.SET_PARTITIONING),
+            ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.COLUMN_GENERATION),
             ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("2[a* b*] \n a b", 2, 1, self.ip_solver, SolverFormulation.HILBERT_BASIS),
 
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.SET_PARTITIONING),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.COLUMN_GENERATION),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.cp_solver, SolverFormulation.HILBERT_BASIS),
 
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.SET_PARTITIONING),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.COLUMN_GENERATION),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5, self.ip_solver, SolverFormulation.HILBERT_BASIS),
 
             ("inf[a* b*] \n 2[a b]", infinity, 2, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("inf[a* b*] \n 2[a b]", infinity, 2, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("inf[a* b*] \n 2[a b]", infinity, 2, self.cp_solver, SolverFormulation.SET_PARTITIONING),
+            ("inf[a* b*] \n 2[a b]", infinity, 2, self.cp_solver, SolverFormulation.COLUMN_GENERATION),
             ("inf[a* b*] \n 2[a b]", infinity, 2, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
 
             ("inf[a* b*] \n 2[a b]", infinity, 2, self.ip_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("inf[a* b*] \n 2[a b]", infinity, 2, self.ip_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("inf[a* b*] \n 2[a b]", infinity, 2, self.ip_solver, SolverFormulation.SET_PARTITIONING),
+            ("inf[a* b*] \n 2[a b]", infinity, 2, self.ip_solver, SolverFormulation.COLUMN_GENERATION),
             ("inf[a* b*] \n 2[a b]", infinity, 2, self.ip_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
 
             ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.cp_solver, SolverFormulation.SET_PARTITIONING),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.cp_solver, SolverFormulation.COLUMN_GENERATION),
             ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
 
             ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.ip_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.ip_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.ip_solver, SolverFormulation.SET_PARTITIONING),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.ip_solver, SolverFormulation.COLUMN_GENERATION),
             ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4, self.ip_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
         ]
         for tbn_string, number_of_polymers, number_of_merges, solver, formulation in test_cases:
@@ -114,43 +154,72 @@ class TestSolver(unittest.TestCase):
                 self.assertEqual(number_of_polymers, configuration.number_of_polymers())
                 self.assertEqual(number_of_merges, configuration.number_of_merges())
 
+    def test_stable_config_column_generation_infeasible_branch(self):
+        # branching on this network creates nodes whose restricted master problem is infeasible
+        test_tbn = Tbn.from_string("3[c a* c*] \n 3[c b* a*] \n 4[b b c] \n 1[b b] \n 3[c c* c]")
+        for solver in [self.cp_solver, self.ip_solver]:
+            with self.subTest(solver=solver):
+                expected_configuration = solver.stable_config(
+                    test_tbn, formulation=SolverFormulation.POLYMER_UNBOUNDED_MATRIX
+                )
+                configuration = solver.stable_config(test_tbn, formulation=SolverFormulation.COLUMN_GENERATION)
+                self.assertEqual(test_tbn, configuration.flatten())
+                self.assertEqual(3, expected_configuration.number_of_merges())
+                self.assertEqual(expected_configuration.number_of_merges(), configuration.number_of_merges())
+
     def test_stable_configs(self):
         test_cases = [
             ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.BOND_AWARE_NETWORK),
             ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.SET_PARTITIONING),
             ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("a* b* \n a b \n a* \n b*", 1, 1, self.cp_solver, SolverFormulation.HILBERT_BASIS),
 
             ("a a \n a* a*", 2, 1, self.cp_solver, SolverFormulation.BOND_AWARE_NETWORK),
             ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.SET_PARTITIONING),
             ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("a a \n a* a*", 1, 1, self.cp_solver, SolverFormulation.HILBERT_BASIS),
 
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.BOND_AWARE_NETWORK),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("2[a* b*] \n a b", 2, 1, self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("2[a* b*] \n a b", 1, 1, self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("2[a* b*] \n a b", 1, 1, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("2[a* b*] \n a b", 1, 1, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("2[a* b*] \n a b", 1, 1, self.cp_solver, SolverFormulation.SET_PARTITIONING),
             ("2[a* b*] \n a b", 1, 1, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("2[a* b*] \n a b", 1, 1, self.cp_solver, SolverFormulation.HILBERT_BASIS),
 
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 4, 5, self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 4, 5, self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 4, 5, self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 3, 5, self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 3, 5, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 3, 5, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 3, 5, self.cp_solver, SolverFormulation.SET_PARTITIONING),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 3, 5, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 3, 5, self.cp_solver, SolverFormulation.HILBERT_BASIS),
 
             ("inf[a* b*] \n 2[a b]", 1, 2, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("inf[a* b*] \n 2[a b]", 1, 2, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("inf[a* b*] \n 2[a b]", 1, 2, self.cp_solver, SolverFormulation.SET_PARTITIONING),
             ("inf[a* b*] \n 2[a b]", 1, 2, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
 
             ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", 2, 4, self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", 2, 4, self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", 2, 4, self.cp_solver, SolverFormulation.SET_PARTITIONING),
             ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", 2, 4, self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
         ]
         for tbn_string, number_of_configs, number_of_merges, solver, formulation in test_cases:
@@ -188,6 +257,104 @@ class TestSolver(unittest.TestCase):
                 for configuration in configurations:
                     self.assertEqual(energy, configuration.energy(weight))
 
+    def test_stable_config_iterative(self):
+        test_cases = [
+            ("a* b* \n a b \n a* \n b*", 3, 1),
+            ("2[a* b*] \n a b", 2, 1),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4),
+            ("20[a* b*] \n 10[a b] \n 10[a]", 20, 20),
+        ]
+        iterative_constraints = Constraints().with_iterative_flag()
+        for tbn_string, number_of_polymers, number_of_merges in test_cases:
+            for solver in [self.cp_solver, self.ip_solver]:
+                for formulation in [
+                        SolverFormulation.POLYMER_INTEGER_MATRIX,
+                        SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                ]:
+                    if formulation == SolverFormulation.POLYMER_INTEGER_MATRIX and number_of_polymers == infinity:
+                        continue
+                    with self.subTest(tbn_string=tbn_string, solver=solver, formulation=formulation):
+                        test_tbn = Tbn.from_string(tbn_string)
+                        configuration = solver.stable_config(test_tbn, iterative_constraints, formulation=formulation)
+                        self.assertEqual(number_of_polymers, configuration.number_of_polymers())
+                        self.assertEqual(number_of_merges, configuration.number_of_merges())
+
+    def test_stable_config_sort_strategies(self):
+        test_cases = [
+            ("a* b* \n a b \n a* \n b*", 3, 1),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5),
+            ("inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]", infinity, 4),
+        ]
+        for tbn_string, number_of_polymers, number_of_merges in test_cases:
+            for sort_strategy in SortStrategy:
+                for solver in [self.cp_solver, self.ip_solver]:
+                    for formulation in [
+                            SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                            SolverFormulation.POLYMER_MULTIPLICITY_MATRIX,
+                    ]:
+                        with self.subTest(
+                                tbn_string=tbn_string, sort_strategy=sort_strategy, solver=solver,
+                                formulation=formulation
+                        ):
+                            test_tbn = Tbn.from_string(tbn_string)
+                            configuration = solver.stable_config(
+                                test_tbn, Constraints().with_sort_strategy(sort_strategy), formulation=formulation
+                            )
+                            self.assertEqual(number_of_polymers, configuration.number_of_polymers())
+                            self.assertEqual(number_of_merges, configuration.number_of_merges())
+
+    def test_stable_configs_lex_sort_strategy(self):
+        # the LEX strategy is a complete ordering, so it must enumerate exactly the same configurations as CHAIN
+        test_cases = [
+            "a* b* \n a b \n a* \n b*",
+            "6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)",
+            "3[a* b*] \n 2[a b] \n 2[a] \n b",
+        ]
+        for tbn_string in test_cases:
+            for formulation in [
+                    SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                    SolverFormulation.POLYMER_MULTIPLICITY_MATRIX,
+            ]:
+                with self.subTest(tbn_string=tbn_string, formulation=formulation):
+                    test_tbn = Tbn.from_string(tbn_string)
+                    constraints = Constraints().with_unset_optimization_flag()
+                    chain_configurations = list(self.cp_solver.stable_configs(
+                        test_tbn, constraints.with_sort_strategy(SortStrategy.CHAIN), formulation=formulation
+                    ))
+                    lex_configurations = list(self.cp_solver.stable_configs(
+                        test_tbn, constraints.with_sort_strategy(SortStrategy.LEX), formulation=formulation
+                    ))
+                    self.assertEqual(len(chain_configurations), len(lex_configurations))
+                    self.assertEqual(set(chain_configurations), set(lex_configurations))
+
+    def test_stable_configs_in_parallel(self):
+        # the cubes partition the search space, so the configurations are found exactly as often as in one process
+        test_cases = [
+            "a* b* \n a b \n a* \n b*",
+            "6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)",
+            "inf[2(a*) 2(b*)] \n 2[3(a) 3(b)]",
+        ]
+        parallel_solver = Solver(processes=2)
+        for tbn_string in test_cases:
+            for formulation in [
+                    SolverFormulation.POLYMER_BINARY_MATRIX,
+                    SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                    SolverFormulation.SET_PARTITIONING,
+            ]:
+                if formulation == SolverFormulation.POLYMER_BINARY_MATRIX and "inf" in tbn_string:
+                    continue
+                for constraints in [Constraints(), Constraints().with_unset_optimization_flag()]:
+                    with self.subTest(tbn_string=tbn_string, formulation=formulation, constraints=constraints):
+                        test_tbn = Tbn.from_string(tbn_string)
+                        configurations = list(self.cp_solver.stable_configs(
+                            test_tbn, constraints, formulation=formulation
+                        ))
+                        parallel_configurations = list(parallel_solver.stable_configs(
+                            test_tbn, constraints, formulation=formulation
+                        ))
+                        self.assertEqual(Counter(configurations), Counter(parallel_configurations))
+
     def test_configs_with_number_of_polymers(self):
         test_cases = [
             # second argument is a list of number of configurations expected for specific numbers of polymers:
@@ -195,22 +362,31 @@ class TestSolver(unittest.TestCase):
 
             ("a* b* \n a b \n a* \n b*", [ 1, 4, 1, 0], self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("a* b* \n a b \n a* \n b*", [ 1, 4, 1, 0], self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", [ 1, 3, 1, 0], self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("a* b* \n a b \n a* \n b*", [ 1, 4, 1, 0], self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             # recall that POLYMER_UNBOUNDED_MATRIX does not allow spurious binding of polymers without limiting monomers
             ("a* b* \n a b \n a* \n b*", [ 1, 3, 1, 0], self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("a* b* \n a b \n a* \n b*", [ 1, 3, 1, 0], self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("a* b* \n a b \n a* \n b*", [ 1, 3, 1, 0], self.cp_solver, SolverFormulation.SET_PARTITIONING),
             # here VARIABLE_BOND_WEIGHT does not require saturation, hence more configurations
             ("a* b* \n a b \n a* \n b*", [ 1, 3, 3, 1], self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
 
             ("2[a* b*] \n a b", [ 1, 2, 0, 0], self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("2[a* b*] \n a b", [ 1, 2, 0, 0], self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("2[a* b*] \n a b", [ 1, 2, 0, 0], self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("2[a* b*] \n a b", [ 1, 1, 0, 0], self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("2[a* b*] \n a b", [ 1, 1, 0, 0], self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("2[a* b*] \n a b", [ 1, 1, 0, 0], self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("2[a* b*] \n a b", [ 1, 1, 0, 0], self.cp_solver, SolverFormulation.SET_PARTITIONING),
             ("2[a* b*] \n a b", [ 1, 1, 1, 0], self.cp_solver, SolverFormulation.VARIABLE_BOND_WEIGHT),
 
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", [ 1, 4, 0, 0], self.cp_solver, SolverFormulation.BOND_OBLIVIOUS_NETWORK),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", [ 1, 4, 0, 0], self.cp_solver, SolverFormulation.POLYMER_BINARY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", [ 1, 4, 0, 0], self.cp_solver, SolverFormulation.MONOMER_ASSIGNMENT),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", [ 1, 3, 0, 0], self.cp_solver, SolverFormulation.POLYMER_INTEGER_MATRIX),
             ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", [ 1, 3, 0, 0], self.cp_solver, SolverFormulation.POLYMER_UNBOUNDED_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", [ 1, 3, 0, 0], self.cp_solver, SolverFormulation.POLYMER_MULTIPLICITY_MATRIX),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", [ 1, 3, 0, 0], self.cp_solver, SolverFormulation.SET_PARTITIONING),
         ]
         for tbn_string, number_of_configs_with_polymer_count, solver, formulation in test_cases:
             with self.subTest(tbn_string=tbn_string, solver=solver, formulation=formulation):
@@ -228,3 +404,85 @@ class TestSolver(unittest.TestCase):
                     self.assertEqual(number_of_configs, len(configurations))
                     for configuration in configurations:
                         self.assertEqual(polymer_count, configuration.number_of_polymers())
+
+    def test_bound(self):
+        test_cases = [
+            # (tbn, formulation, bond weight, lower bound on the merges / energy from the relaxation)
+            ("a* b* \n a b \n a* \n b*", SolverFormulation.POLYMER_UNBOUNDED_MATRIX, None, 1),
+            ("a* b* \n a b \n a* \n b*", SolverFormulation.SET_PARTITIONING, None, 1),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", SolverFormulation.POLYMER_UNBOUNDED_MATRIX, None, 4),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", SolverFormulation.MONOMER_ASSIGNMENT, None, 4),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", SolverFormulation.SET_PARTITIONING, None, 5),
+            ("inf[a* b*] \n 2[a b]", SolverFormulation.POLYMER_MULTIPLICITY_MATRIX, None, 2),
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", SolverFormulation.VARIABLE_BOND_WEIGHT, 1.0, 4.0),
+        ]
+        for tbn_string, formulation, bond_weight, expected_bound in test_cases:
+            with self.subTest(tbn_string=tbn_string, formulation=formulation):
+                test_tbn = Tbn.from_string(tbn_string)
+                incumbent = self.cp_solver.stable_config(
+                    test_tbn, formulation=formulation, bond_weighting_factor=bond_weight
+                )
+                bound = self.cp_solver.bound(
+                    test_tbn, formulation=formulation, bond_weighting_factor=bond_weight, incumbent=incumbent
+                )
+                if bond_weight is None:
+                    self.assertEqual(expected_bound, bound.min_merges())
+                    self.assertEqual(test_tbn.number_of_monomers() - expected_bound, bound.max_polymers())
+                else:
+                    self.assertAlmostEqual(expected_bound, bound.min_energy())
+                self.assertGreaterEqual(bound.gap(), 0)
+
+        with self.assertRaises(NotImplementedError):
+            self.cp_solver.bound(Tbn.from_string("a* b* \n a b"), formulation=SolverFormulation.COLUMN_GENERATION)
+
+    def test_stable_config_with_hint(self):
+        heuristic_solver = Solver(SolverMethod.HEURISTIC, time_limit=infinity)
+        test_cases = [
+            ("6(a*) \n 2[3(a*)] \n a \n 5(a) \n 2(a) \n 4(a)", 2, 5),
+            ("3[a* b*] \n 3[a] \n 3[b] \n inf[a b]", infinity, 3),
+        ]
+        for tbn_string, number_of_polymers, number_of_merges in test_cases:
+            test_tbn = Tbn.from_string(tbn_string)
+            hint = heuristic_solver.stable_config(test_tbn)
+            for solver in [self.cp_solver, self.ip_solver]:
+                for formulation in [
+                    SolverFormulation.POLYMER_INTEGER_MATRIX,
+                    SolverFormulation.POLYMER_UNBOUNDED_MATRIX,
+                    SolverFormulation.POLYMER_MULTIPLICITY_MATRIX,
+                    SolverFormulation.SET_PARTITIONING,
+                ]:
+                    if formulation == SolverFormulation.POLYMER_INTEGER_MATRIX and number_of_polymers == infinity:
+                        continue
+                    with self.subTest(tbn_string=tbn_string, solver=solver, formulation=formulation):
+                        configuration = solver.stable_config(test_tbn, formulation=formulation, hint=hint)
+                        self.assertEqual(number_of_polymers, configuration.number_of_polymers())
+                        self.assertEqual(number_of_merges, configuration.number_of_merges())
+
+        # formulations without hint support solve without it
+        test_tbn = Tbn.from_string("2[a* b*] \n a b")
+        hint = heuristic_solver.stable_config(test_tbn)
+        for formulation in [SolverFormulation.BOND_OBLIVIOUS_NETWORK, SolverFormulation.COLUMN_GENERATION]:
+            with self.subTest(formulation=formulation):
+                with self.assertWarns(UserWarning):
+                    configuration = self.cp_solver.stable_config(test_tbn, formulation=formulation, hint=hint)
+                self.assertEqual(1, configuration.number_of_merges())
+
+    def test_lazy_imports(self):
+        for formulation in SolverFormulation:
+            with self.subTest(formulation=formulation):
+                self.assertTrue(issubclass(formulation_class(formulation), AbstractFormulation))
+
+        # each backend is only imported once it is used
+        script = (
+            "import sys\n"
+            "from source.tbn import Tbn\n"
+            "from source.solver import Solver, SolverMethod\n"
+            "tbn = Tbn.from_string('a b \\n a* \\n b*')\n"
+            "print('ortools.sat.python.cp_model' in sys.modules, 'ortools.linear_solver.pywraplp' in sys.modules)\n"
+            "Solver(SolverMethod.INTEGER_PROGRAMMING).stable_config(tbn)\n"
+            "print('ortools.sat.python.cp_model' in sys.modules, 'ortools.linear_solver.pywraplp' in sys.modules)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script], stdout=subprocess.PIPE, check=True, universal_newlines=True
+        ).stdout
+        self.assertEqual("False False\nFalse True\n", output)
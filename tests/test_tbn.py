@@ -124,6 +124,74 @@ class TestTbn(unittest.TestCase):
             })
             self.assertEqual(multiset_tbn, Tbn.from_string(multiset_text))
 
+        with self.subTest("parsing errors report the line number"):
+            with self.assertRaisesRegex(AssertionError, "^line 3: "):
+                Tbn.from_string("a b \n\n 2[a** b] \n a*")
+            with self.assertRaisesRegex(AssertionError, "^line 2: "):
+                Tbn.from_string("a b >line_number_x \n a* >line_number_x")
+
+    def test_from_lines(self):
+        lines = iter(["2[a b*]", "", "a* b 2(c) >from_lines_x", "inf[ c* ]"])
+        expected_tbn = Tbn({
+            Monomer.from_string("a b*"): 2,
+            Monomer.from_string("a* b c c", "from_lines_x"): 1,
+            Monomer.from_string("c*"): infinity,
+        })
+        self.assertEqual(expected_tbn, Tbn.from_lines(lines))
+
+        # repeated lines are interned, but only for the length of one parse, so the second does not reuse the first's
+        first_tbn = Tbn.from_lines(["a b* >interned", "a b* >interned"])
+        second_tbn = Tbn.from_lines(["a b* >interned"])
+        [first_monomer] = first_tbn.monomer_types()
+        [second_monomer] = second_tbn.monomer_types()
+        self.assertEqual(2, first_tbn.count(first_monomer))
+        self.assertEqual(first_monomer, second_monomer)
+        self.assertIsNot(first_monomer, second_monomer)
+
+    def test_from_arrays(self):
+        expected_tbn = Tbn.from_string("2[a b* >arrays_x] \n inf[3(a*) b] \n a b*")
+        domain_names = ["a", "a*", "b", "b*"]
+        count_matrix = [
+            [1, 0, 0, 1],
+            [0, 3, 1, 0],
+            [1, 0, 0, 1],
+        ]
+        with self.subTest("dense matrix, combining identical monomer types"):
+            tbn = Tbn.from_arrays(domain_names, ["arrays_x", None, None], count_matrix, [2, infinity, 1])
+            self.assertEqual(expected_tbn, tbn)
+
+        with self.subTest("CSR matrix"):
+            data, indices, indptr = [1, 1, 3, 1, 1, 1], [0, 3, 1, 2, 0, 3], [0, 2, 4, 6]
+            tbn = Tbn.from_arrays(domain_names, ["arrays_x", None, None], (data, indices, indptr), [2, infinity, 1])
+            self.assertEqual(expected_tbn, tbn)
+
+        bad_arguments = [
+            (domain_names, None, count_matrix[:2], [2, infinity, 1]),
+            (domain_names, ["arrays_x"], count_matrix, [2, infinity, 1]),
+            (domain_names, None, count_matrix, [2, 0, 1]),
+            (domain_names, None, count_matrix, [2, 1.5, 1]),
+            (domain_names, None, [[1, 0, 0, 1], [0, -3, 1, 0], [1, 0, 0, 1]], [2, infinity, 1]),
+            (domain_names, None, [[1, 0, 0, 1], [0, 0, 0, 0], [1, 0, 0, 1]], [2, infinity, 1]),
+            (["a", "a", "b", "b*"], None, count_matrix, [2, infinity, 1]),
+            (domain_names, None, ([1, 1], [0, 4], [0, 1, 2, 2]), [2, infinity, 1]),
+        ]
+        for arguments in bad_arguments:
+            with self.subTest("invalid arrays", arguments=arguments):
+                with self.assertRaises(AssertionError):
+                    Tbn.from_arrays(*arguments)
+
+    def test_to_arrays(self):
+        tbn = Tbn.from_string("2[a b* >to_arrays_x] \n inf[3(a*) b] \n c")
+        domain_names, monomer_names, count_matrix, monomer_counts = tbn.to_arrays()
+        self.assertEqual(["a", "a*", "b", "b*", "c"], domain_names)
+        self.assertEqual((3, 5), count_matrix.shape)
+        self.assertEqual(tbn, Tbn.from_arrays(domain_names, monomer_names, count_matrix, monomer_counts))
+        self.assertIn("to_arrays_x", monomer_names)
+        self.assertIn(infinity, monomer_counts)
+
+        domain_names, monomer_names, count_matrix, monomer_counts = tbn.to_arrays(sparse=True)
+        self.assertEqual(tbn, Tbn.from_arrays(domain_names, monomer_names, count_matrix, monomer_counts))
+
     def test_monomer_types(self):
         tests = [
             ({}, []),
@@ -0,0 +1,40 @@
+import unittest
+import os
+import tempfile
+
+from source.tbn import Tbn
+from source import tbn_binary
+
+
+class TestTbnBinary(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.binary_filename = os.path.join(self.directory.name, "tbn.tbnb")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        tests = [
+            "a b c* >binary_x \n 2[3(a*) b*] \n inf[a:legacy c] \n 4[ c* c ]",
+            "a",
+            "inf[a a a*] \n b* >binary_y",
+        ]
+        for tbn_string in tests:
+            with self.subTest(tbn_string=tbn_string):
+                tbn = Tbn.from_string(tbn_string)
+                tbn_binary.write_tbn_binary(tbn, self.binary_filename)
+                self.assertTrue(tbn_binary.is_tbn_binary(self.binary_filename))
+                read_tbn = tbn_binary.read_tbn_binary(self.binary_filename)
+                self.assertEqual(tbn, read_tbn)
+                self.assertEqual(
+                    [monomer.name() for monomer in tbn.monomer_types()],
+                    [monomer.name() for monomer in read_tbn.monomer_types()],
+                )
+
+    def test_not_binary(self):
+        with open(self.binary_filename, "w") as text_file:
+            text_file.write("a b \n a* b*")
+        self.assertFalse(tbn_binary.is_tbn_binary(self.binary_filename))
+        with self.assertRaises(AssertionError):
+            tbn_binary.read_tbn_binary(self.binary_filename)